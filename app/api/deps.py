@@ -3,7 +3,7 @@ from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.db.session import get_session
-from app.core.security import authenticate_user
+from app.core.security import authenticate_user, credentials_cache
 
 security = HTTPBasic()
 
@@ -15,6 +15,9 @@ async def get_current_user(
     """
     Valida credenciais de usuário usando Basic Auth.
     
+    A comparação é feita em tempo constante e credenciais já verificadas
+    são servidas do `credentials_cache`.
+    
     Args:
         credentials: Credenciais HTTP Basic
         session: Sessão do banco de dados
@@ -27,6 +30,9 @@ async def get_current_user(
     """
     username = credentials.username
     password = credentials.password
+    cache_key = credentials_cache.key_for(f"{username}\x00{password}")
+    if credentials_cache.get(cache_key) is not None:
+        return username
     valid = await authenticate_user(username, password, session)
     if not valid:
         raise HTTPException(
@@ -34,4 +40,5 @@ async def get_current_user(
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Basic"},
         )
+    credentials_cache.put(cache_key, username)
     return username
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.core.security import get_current_user
+from app.queue.redis_backend import redis_queue
+from app.schemas.dead_letter_schema import DeadLetterPage, DeadLetterReplayResponse
+from app.utils.logger import logger
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(get_current_user)])
+
+MAX_DLQ_PAGE_SIZE = 1000
+MAX_REPLAY = 10000
+
+
+@router.get("/dlq", response_model=DeadLetterPage)
+async def list_dead_letters(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_DLQ_PAGE_SIZE),
+):
+    """
+    Lista as tarefas que esgotaram as retentativas do worker (requer autenticação).
+
+    Cada item traz o payload original com o número de tentativas, o último
+    erro e o momento (epoch) em que foi para a dead-letter queue.
+    """
+    total, items = await redis_queue.dead_letters(offset, limit)
+    return DeadLetterPage(total=total, delayed=await redis_queue.delayed_size(), items=items)
+
+
+@router.post("/dlq/replay", response_model=DeadLetterReplayResponse)
+async def replay_dead_letters(
+    limit: int = Query(MAX_REPLAY, ge=1, le=MAX_REPLAY, description="Máximo de tarefas reenviadas"),
+    user: str = Depends(get_current_user),
+):
+    """
+    Reenvia à fila as tarefas mais antigas da dead-letter queue (requer autenticação).
+
+    As tentativas são zeradas; inscrições que já não estiverem pendentes são
+    ignoradas pelo worker.
+    """
+    replayed = await redis_queue.replay_dead(limit)
+    logger.info("Dead letters replayed", count=replayed, user=user)
+    return DeadLetterReplayResponse(replayed=replayed, remaining=await redis_queue.dead_size())
@@ -1,16 +1,22 @@
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status
 from typing import List
 from uuid import UUID
+from sqlalchemy import insert, update
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select
 from app.db.session import get_session
 from app.models.age_group import AgeGroup
 from app.schemas.age_group_schema import AgeGroupUpdate
 from app.core.security import get_current_user
+from app.cache.age_group_cache import age_group_cache
+from app.utils.http_cache import conditional_response
 
 router = APIRouter(prefix="/age-groups", tags=["Age Groups"])
 
+# Faixas etárias mudam raramente e são públicas: CDNs podem servir a cópia
+# por alguns segundos e revalidar com If-None-Match depois disso.
+AGE_GROUP_CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=60"
+
 
 @router.post("/", response_model=AgeGroup, status_code=status.HTTP_201_CREATED)
 async def create_age_group(
@@ -19,31 +25,36 @@ async def create_age_group(
     user: str = Depends(get_current_user)
 ) -> AgeGroup:
     """Cria uma nova faixa etária (requer autenticação)."""
-    session.add(age_group)
+    # INSERT ... RETURNING: a linha gravada (com defaults do servidor) volta
+    # na mesma ida ao banco, sem refresh depois do commit.
+    result = await session.exec(insert(AgeGroup).values(**age_group.model_dump()).returning(AgeGroup))
+    created = result.scalar_one()
     await session.commit()
-    await session.refresh(age_group)
-    return age_group
+    await age_group_cache.invalidate(created.id)
+    return created
 
 
 @router.get("/", response_model=List[AgeGroup])
 async def list_age_groups(
+    request: Request,
     session: AsyncSession = Depends(get_session)
-) -> List[AgeGroup]:
-    """Lista todas as faixas etárias disponíveis."""
-    result = await session.exec(select(AgeGroup))
-    return result.all()
+) -> Response:
+    """Lista todas as faixas etárias disponíveis (resposta pré-serializada com ETag)."""
+    body, etag = await age_group_cache.list_response(session)
+    return conditional_response(request, body, AGE_GROUP_CACHE_CONTROL, etag)
 
 
 @router.get("/{age_group_id}", response_model=AgeGroup)
 async def get_age_group(
     age_group_id: UUID,
+    request: Request,
     session: AsyncSession = Depends(get_session)
-) -> AgeGroup:
-    """Busca uma faixa etária específica por ID."""
-    age_group = await session.get(AgeGroup, age_group_id)
+) -> Response:
+    """Busca uma faixa etária específica por ID (com ETag)."""
+    age_group = await age_group_cache.get(session, age_group_id)
     if not age_group:
         raise HTTPException(status_code=404, detail="Age group not found")
-    return age_group
+    return conditional_response(request, age_group.model_dump_json().encode(), AGE_GROUP_CACHE_CONTROL)
 
 
 @router.delete("/{age_group_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -58,6 +69,7 @@ async def delete_age_group(
         raise HTTPException(status_code=404, detail="Age group not found")
     await session.delete(age_group)
     await session.commit()
+    await age_group_cache.invalidate(age_group_id)
 
 
 @router.put("/{age_group_id}", response_model=AgeGroup)
@@ -68,13 +80,19 @@ async def update_age_group(
     user: str = Depends(get_current_user)
 ) -> AgeGroup:
     """Atualiza uma faixa etária existente (requer autenticação)."""
-    age_group = await session.get(AgeGroup, age_group_id)
+    update_data = age_group_update.model_dump(exclude_unset=True)
+    if not update_data:
+        age_group = await age_group_cache.get(session, age_group_id)
+        if not age_group:
+            raise HTTPException(status_code=404, detail="Age group not found")
+        return age_group
+    # UPDATE ... RETURNING: sem SELECT antes nem refresh depois.
+    result = await session.exec(
+        update(AgeGroup).where(AgeGroup.id == age_group_id).values(**update_data).returning(AgeGroup)
+    )
+    age_group = result.scalar_one_or_none()
     if not age_group:
         raise HTTPException(status_code=404, detail="Age group not found")
-    update_data = age_group_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(age_group, key, value)
-    session.add(age_group)
     await session.commit()
-    await session.refresh(age_group)
+    await age_group_cache.invalidate(age_group_id)
     return age_group
\ No newline at end of file
@@ -1,56 +1,331 @@
 
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List, Optional
+import json
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Optional
 from uuid import UUID
+from pydantic import TypeAdapter
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import select
+from sqlmodel.sql.expression import SelectOfScalar
 
 from app.db.session import get_session
 from app.models.enrollment import Enrollment, EnrollmentStatus
 from app.models.age_group import AgeGroup
-from app.schemas.enrollment_schema import EnrollmentCreate, EnrollmentRead, EnrollmentBase
-from app.services.enrollment_services import create_enrollment as create_enrollment_service
-from app.queue.redis_backend import redis_queue
+from app.schemas.enrollment_schema import (
+    EnrollmentCreate,
+    EnrollmentRead,
+    EnrollmentBase,
+    EnrollmentPage,
+    EnrollmentRow,
+    EnrollmentRowPage,
+    BulkEnrollmentResponse,
+    BulkStatusUpdate,
+    BulkStatusUpdateResponse,
+    EnrollmentFilters,
+    EnrollmentSort,
+)
+from app.services.enrollment_services import (
+    DUPLICATE_ENROLLMENT_DETAIL,
+    create_enrollment as create_enrollment_service,
+    create_enrollments_bulk,
+    filter_enrollments,
+    order_enrollments,
+    update_status_in_bulk,
+)
+from app.schemas.stats_schema import EnrollmentStatsResponse
+from app.services.stats_services import (
+    apply_stats_deltas,
+    get_enrollment_stats,
+    status_change_deltas,
+)
+from app.cache.idempotency import idempotency_store, request_fingerprint
+from app.core.config import settings
 from app.core.security import get_current_user
+from app.utils.http_cache import conditional_response
+from app.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter(prefix="/enrollments", tags=["Enrollments"])
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_CHUNK_SIZE = 500
+# O status muda assim que o worker processa a inscrição: caches podem guardar
+# a resposta, mas precisam revalidar sempre (304 quando nada mudou).
+ENROLLMENT_CACHE_CONTROL = "private, no-cache"
+
+# Caminho rápido (FAST_JSON_RESPONSES): lê só as colunas de EnrollmentRead como
+# tuplas e serializa com adapters pré-compilados, sem instanciar models nem
+# passar pelo jsonable_encoder.
+ENROLLMENT_READ_COLUMNS = tuple(
+    getattr(Enrollment, name).label(name) for name in EnrollmentRow.__annotations__
+)
+_enrollment_row_adapter = TypeAdapter(EnrollmentRow)
+_enrollment_row_page_adapter = TypeAdapter(EnrollmentRowPage)
+
 
 @router.post("/", response_model=EnrollmentRead, status_code=status.HTTP_201_CREATED)
 async def create_enrollment(
     enrollment: EnrollmentCreate,
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Chave única do cliente; repetições recebem a resposta original",
+    ),
     session: AsyncSession = Depends(get_session),
     user: str = Depends(get_current_user)
-) -> EnrollmentRead:
-    """Cria uma nova inscrição com validação de faixa etária (requer autenticação)."""
-    enrollment_created = await create_enrollment_service(enrollment, session)
-    await redis_queue.enqueue({"enrollment_id": str(enrollment_created.id)})
-    return enrollment_created
+):
+    """
+    Cria uma nova inscrição com validação de faixa etária (requer autenticação).
 
+    O job de processamento é gravado no outbox na mesma transação e enviado à
+    fila pelo relay. Com o header `Idempotency-Key`, retentativas do cliente
+    recebem a resposta gravada no Redis sem nova gravação no banco.
+    """
+    async def create() -> tuple[int, str]:
+        enrollment_created = await create_enrollment_service(enrollment, session)
+        return status.HTTP_201_CREATED, enrollment_created.model_dump_json()
 
-@router.get("/", response_model=List[Enrollment])
-async def list_enrollments(
+    if idempotency_key is None:
+        _, body = await create()
+        return Response(content=body, status_code=status.HTTP_201_CREATED, media_type="application/json")
+    return await idempotency_store.execute(
+        idempotency_store.key_for(user, "POST /enrollments/", idempotency_key),
+        request_fingerprint(enrollment.model_dump_json()),
+        create,
+    )
+
+
+async def _read_bulk_items(request: Request) -> list:
+    """
+    Lê o corpo de POST /enrollments/bulk como array JSON ou NDJSON.
+
+    Linhas NDJSON malformadas viram itens inválidos (string crua) para que
+    a falha seja reportada individualmente.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type:
+        items = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                items.append(line.decode(errors="replace"))
+        return items
+    try:
+        items = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="JSON inválido")
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="O corpo deve ser um array JSON ou NDJSON",
+        )
+    return items
+
+
+@router.post("/bulk", response_model=BulkEnrollmentResponse)
+async def create_enrollments_in_bulk(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    user: str = Depends(get_current_user)
+) -> BulkEnrollmentResponse:
+    """
+    Cria inscrições em lote a partir de um array JSON ou NDJSON (requer autenticação).
+
+    Cada item é validado isoladamente; a resposta traz o resultado de cada
+    posição e apenas os itens válidos são gravados e enviados ao outbox.
+    """
+    items = await _read_bulk_items(request)
+    if len(items) > settings.ENROLLMENT_BULK_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo de {settings.ENROLLMENT_BULK_MAX} inscrições por requisição",
+        )
+    results = await create_enrollments_bulk(items, session)
+    created = sum(1 for result in results if result.success)
+    return BulkEnrollmentResponse(
+        created=created,
+        failed=len(results) - created,
+        results=results,
+    )
+
+
+@router.patch("/status", response_model=BulkStatusUpdateResponse)
+async def update_status_in_bulk_endpoint(
+    update_in: BulkStatusUpdate,
+    session: AsyncSession = Depends(get_session),
+    user: str = Depends(get_current_user)
+) -> BulkStatusUpdateResponse:
+    """
+    Muda o status de várias inscrições por lista de IDs ou filtro (requer autenticação).
+
+    A alteração é feita no banco em lotes de `ENROLLMENT_STATUS_CHUNK`, cada
+    um em sua própria transação; inscrições em processamento pelo worker são
+    puladas e aparecem em `not_updated` quando selecionadas por ID.
+    """
+    if update_in.ids is not None and len(update_in.ids) > settings.ENROLLMENT_BULK_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo de {settings.ENROLLMENT_BULK_MAX} IDs por requisição",
+        )
+    return await update_status_in_bulk(update_in, session, settings.ENROLLMENT_STATUS_CHUNK)
+
+
+async def _stream_enrollments(
+    stmt: SelectOfScalar[Any],
+    session: AsyncSession,
+    fast: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Lê as inscrições com cursor do lado do servidor e gera linhas NDJSON.
+
+    A sessão é fechada ao final porque o corpo é enviado depois que a
+    dependência `get_session` já foi finalizada.
+    """
+    try:
+        stmt = stmt.execution_options(yield_per=STREAM_CHUNK_SIZE)
+        if fast:
+            result = await session.stream(stmt)
+            async for partition in result.partitions():
+                yield b"".join(
+                    _enrollment_row_adapter.dump_json(row._asdict()) + b"\n"
+                    for row in partition
+                )
+            return
+
+        result = await session.stream_scalars(stmt)
+        async for partition in result.partitions():
+            yield "".join(
+                EnrollmentRead.model_validate(enrollment).model_dump_json() + "\n"
+                for enrollment in partition
+            ).encode()
+            session.expunge_all()
+    finally:
+        await session.close()
+
+
+def _enrollment_filters(
     status_filter: Optional[EnrollmentStatus] = None,
+    age_group_id: Optional[UUID] = None,
+    min_age: Optional[int] = Query(None, ge=0, le=120, description="Idade mínima inclusiva"),
+    max_age: Optional[int] = Query(None, ge=0, le=120, description="Idade máxima inclusiva"),
+    name_prefix: Optional[str] = Query(None, min_length=1, max_length=100, description="Início do nome"),
+    email_prefix: Optional[str] = Query(None, min_length=1, max_length=100, description="Início do email"),
+    created_after: Optional[datetime] = Query(None, description="Criadas a partir deste momento (inclusivo)"),
+    created_before: Optional[datetime] = Query(None, description="Criadas antes deste momento (exclusivo)"),
+) -> EnrollmentFilters:
+    return EnrollmentFilters(
+        status=status_filter,
+        age_group_id=age_group_id,
+        min_age=min_age,
+        max_age=max_age,
+        name_prefix=name_prefix,
+        email_prefix=email_prefix,
+        created_after=created_after,
+        created_before=created_before,
+    )
+
+
+def _encode_page_cursor(sort: EnrollmentSort, last: dict[str, Any]) -> str:
+    values = {"id": str(last["id"])}
+    if sort is not EnrollmentSort.id:
+        values.update(sort=sort.value, value=last[sort.field])
+    return encode_cursor(values)
+
+
+def _decode_page_cursor(after: str, sort: EnrollmentSort) -> tuple[Any, UUID]:
+    """Lê (valor da chave, ID) do cursor, que só vale para a ordenação que o gerou."""
+    values = decode_cursor(after)
+    try:
+        if values.get("sort", EnrollmentSort.id.value) != sort.value:
+            raise ValueError(sort)
+        last_id = UUID(values["id"])
+        if sort is EnrollmentSort.id:
+            return None, last_id
+        raw = values["value"]
+        return (datetime.fromisoformat(raw) if sort.field == "created_at" else int(raw)), last_id
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+
+
+@router.get("/", response_model=EnrollmentPage)
+async def list_enrollments(
+    filters: EnrollmentFilters = Depends(_enrollment_filters),
+    sort: EnrollmentSort = Query(EnrollmentSort.id, description="Ordenação; '-' para decrescente"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Tamanho da página"),
+    after: Optional[str] = Query(None, description="Cursor `next_cursor` da página anterior"),
+    stream: bool = Query(False, description="Transmite todas as inscrições restantes em NDJSON"),
     session: AsyncSession = Depends(get_session)
-) -> List[Enrollment]:
-    """Lista todas as inscrições com filtro opcional por status."""
-    stmt = select(Enrollment)
-    if status_filter:
-        stmt = stmt.where(Enrollment.status == status_filter)
-    result = await session.exec(stmt)
-    return result.all()
+):
+    """
+    Lista inscrições com filtros e paginação por cursor (keyset).
+
+    Os filtros são combinados com AND e cada um usa um índice; a ordenação é
+    `sort` desempatada pelo ID, e o cursor guarda os dois valores do último
+    item. Com `stream=true` a resposta é NDJSON e percorre todas as
+    inscrições a partir do cursor, sem carregar o resultado inteiro em memória.
+    """
+    fast = settings.FAST_JSON_RESPONSES
+    stmt = select(*ENROLLMENT_READ_COLUMNS) if fast else select(Enrollment)
+    stmt = filter_enrollments(stmt, filters)
+    stmt = order_enrollments(stmt, sort, _decode_page_cursor(after, sort) if after else None)
+
+    if stream:
+        return StreamingResponse(
+            _stream_enrollments(stmt, session, fast),
+            media_type="application/x-ndjson",
+        )
+
+    result = await session.exec(stmt.limit(limit + 1))
+    if fast:
+        rows = [row._asdict() for row in result]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_page_cursor(sort, rows[-1])
+        body = _enrollment_row_page_adapter.dump_json({"items": rows, "next_cursor": next_cursor})
+        return Response(content=body, media_type="application/json")
+
+    items = result.all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = _encode_page_cursor(sort, items[-1].model_dump(include={"id", sort.field}))
+    return EnrollmentPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/stats", response_model=EnrollmentStatsResponse)
+async def enrollment_stats(
+    session: AsyncSession = Depends(get_session)
+) -> EnrollmentStatsResponse:
+    """
+    Retorna a contagem de inscrições por faixa etária e status.
+    
+    Lê a tabela de contadores mantida a cada escrita, sem varrer `enrollments`.
+    """
+    return await get_enrollment_stats(session)
 
 
 @router.get("/{enrollment_id}", response_model=Enrollment)
 async def get_enrollment(
     enrollment_id: UUID,
+    request: Request,
     session: AsyncSession = Depends(get_session)
-) -> Enrollment:
-    """Busca uma inscrição específica por ID."""
+) -> Response:
+    """Busca uma inscrição específica por ID (com ETag)."""
     enrollment = await session.get(Enrollment, enrollment_id)
     if not enrollment:
         raise HTTPException(status_code=404, detail="Enrollment not found")
-    return enrollment
+    return conditional_response(request, enrollment.model_dump_json().encode(), ENROLLMENT_CACHE_CONTROL)
 
 
 @router.patch("/{enrollment_id}/status", response_model=Enrollment)
@@ -61,13 +336,22 @@ async def update_enrollment_status(
     user: str = Depends(get_current_user)
 ) -> Enrollment:
     """Atualiza apenas o status de uma inscrição (requer autenticação)."""
-    enrollment = await session.get(Enrollment, enrollment_id)
+    # Os contadores precisam do status anterior, que o RETURNING não devolve:
+    # uma única leitura com lock substitui o get + refresh e impede que o
+    # worker processe a linha entre a leitura e o UPDATE.
+    result = await session.exec(
+        select(Enrollment).where(Enrollment.id == enrollment_id).with_for_update()
+    )
+    enrollment = result.first()
     if not enrollment:
         raise HTTPException(status_code=404, detail="Enrollment not found")
+    if enrollment.status == new_status:
+        return enrollment
+    await apply_stats_deltas(
+        session, status_change_deltas([(enrollment.age_group_id, enrollment.status, new_status)])
+    )
     enrollment.status = new_status
-    session.add(enrollment)
     await session.commit()
-    await session.refresh(enrollment)
     return enrollment
 
 
@@ -78,10 +362,15 @@ async def delete_enrollment(
     user: str = Depends(get_current_user)
 ) -> None:
     """Remove uma inscrição (requer autenticação)."""
-    enrollment = await session.get(Enrollment, enrollment_id)
-    if not enrollment:
+    result = await session.exec(
+        delete(Enrollment)
+        .where(Enrollment.id == enrollment_id)
+        .returning(Enrollment.age_group_id, Enrollment.status)
+    )
+    deleted = result.one_or_none()
+    if not deleted:
         raise HTTPException(status_code=404, detail="Enrollment not found")
-    await session.delete(enrollment)
+    await apply_stats_deltas(session, {(deleted.age_group_id, deleted.status): -1})
     await session.commit()
 
 
@@ -93,13 +382,19 @@ async def update_enrollment(
     user: str = Depends(get_current_user)
 ) -> Enrollment:
     """Atualiza completamente uma inscrição (requer autenticação)."""
-    enrollment = await session.get(Enrollment, enrollment_id)
-    if not enrollment:
-        raise HTTPException(status_code=404, detail="Enrollment not found")
-    update_data = enrollment_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(enrollment, key, value)
-    session.add(enrollment)
-    await session.commit()
-    await session.refresh(enrollment)
-    return enrollment
\ No newline at end of file
+    # UPDATE ... RETURNING: sem SELECT antes nem refresh depois.
+    try:
+        result = await session.exec(
+            update(Enrollment)
+            .where(Enrollment.id == enrollment_id)
+            .values(**enrollment_update.model_dump(exclude_unset=True))
+            .returning(Enrollment)
+        )
+        enrollment = result.scalar_one_or_none()
+        if not enrollment:
+            raise HTTPException(status_code=404, detail="Enrollment not found")
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=DUPLICATE_ENROLLMENT_DETAIL)
+    return enrollment
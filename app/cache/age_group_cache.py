@@ -0,0 +1,257 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+from uuid import UUID
+
+from pydantic import TypeAdapter
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.age_group import AgeGroup
+from app.queue.redis_client import create_redis_client, get_redis
+from app.schemas.age_group_schema import AgeGroupRead
+from app.utils.http_cache import make_etag
+from app.utils.logger import logger
+
+CACHE_TTL = float(os.getenv("AGE_GROUP_CACHE_TTL", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("AGE_GROUP_CACHE_MAX_ENTRIES", "1024"))
+INVALIDATION_CHANNEL = os.getenv("AGE_GROUP_CACHE_CHANNEL", "age_group_cache:invalidate")
+INVALIDATE_ALL = "*"
+
+_age_group_list_adapter = TypeAdapter(list[AgeGroupRead])
+
+
+@dataclass
+class _ListEntry:
+    """Lista completa em cache, já serializada para resposta HTTP."""
+    expires_at: float
+    items: list[AgeGroupRead]
+    body: bytes
+    etag: str
+
+
+class AgeGroupCache:
+    """
+    Cache read-through em memória para faixas etárias.
+
+    Guarda cópias imutáveis (`AgeGroupRead`) com TTL e limite de tamanho
+    (LRU). Escritas invalidam o cache local e publicam a invalidação no
+    Redis para que os demais processos da API descartem suas cópias.
+    """
+
+    def __init__(
+        self,
+        ttl: float = CACHE_TTL,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        url: Optional[str] = None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.url = url
+        self._entries: OrderedDict[UUID, tuple[float, AgeGroupRead]] = OrderedDict()
+        self._all: Optional[_ListEntry] = None
+        self._generation = 0
+        self._listener: Optional[asyncio.Task] = None
+
+    def _store(self, age_group: AgeGroupRead, expires_at: float) -> None:
+        """Guarda uma faixa etária respeitando o limite de entradas."""
+        self._entries[age_group.id] = (expires_at, age_group)
+        self._entries.move_to_end(age_group.id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _lookup(self, age_group_id: UUID, now: float) -> Optional[AgeGroupRead]:
+        """Retorna a entrada em cache se ainda estiver válida."""
+        entry = self._entries.get(age_group_id)
+        if entry is None:
+            return None
+        expires_at, age_group = entry
+        if expires_at <= now:
+            del self._entries[age_group_id]
+            return None
+        self._entries.move_to_end(age_group_id)
+        return age_group
+
+    async def get_many(
+        self,
+        session: AsyncSession,
+        age_group_ids: Iterable[UUID],
+    ) -> dict[UUID, AgeGroupRead]:
+        """
+        Busca várias faixas etárias, consultando o banco apenas para as ausentes.
+
+        Args:
+            session: Sessão do banco de dados usada em caso de cache miss
+            age_group_ids: IDs das faixas etárias
+
+        Returns:
+            dict: Faixas etárias encontradas indexadas por ID
+        """
+        now = time.monotonic()
+        found: dict[UUID, AgeGroupRead] = {}
+        missing: set[UUID] = set()
+        for age_group_id in age_group_ids:
+            cached = self._lookup(age_group_id, now)
+            if cached is None:
+                missing.add(age_group_id)
+            else:
+                found[age_group_id] = cached
+        if not missing:
+            return found
+
+        generation = self._generation
+        result = await session.exec(select(AgeGroup).where(AgeGroup.id.in_(missing)))
+        loaded = [AgeGroupRead.model_validate(age_group) for age_group in result.all()]
+        # Uma invalidação durante a consulta pode tornar o resultado obsoleto.
+        store = generation == self._generation
+        expires_at = time.monotonic() + self.ttl
+        for age_group in loaded:
+            found[age_group.id] = age_group
+            if store:
+                self._store(age_group, expires_at)
+        return found
+
+    async def get(self, session: AsyncSession, age_group_id: UUID) -> Optional[AgeGroupRead]:
+        """
+        Busca uma faixa etária pelo ID usando o cache.
+
+        Args:
+            session: Sessão do banco de dados usada em caso de cache miss
+            age_group_id: ID da faixa etária
+
+        Returns:
+            AgeGroupRead | None: Faixa etária ou None se não existir
+        """
+        found = await self.get_many(session, [age_group_id])
+        return found.get(age_group_id)
+
+    async def _list_entry(self, session: AsyncSession) -> _ListEntry:
+        """Retorna a lista completa em cache, recarregando-a se expirada."""
+        if self._all is not None and self._all.expires_at > time.monotonic():
+            return self._all
+
+        generation = self._generation
+        result = await session.exec(select(AgeGroup))
+        age_groups = [AgeGroupRead.model_validate(age_group) for age_group in result.all()]
+        body = _age_group_list_adapter.dump_json(age_groups)
+        expires_at = time.monotonic() + self.ttl
+        entry = _ListEntry(expires_at=expires_at, items=age_groups, body=body, etag=make_etag(body))
+        if generation == self._generation:
+            self._all = entry
+            for age_group in age_groups:
+                self._store(age_group, expires_at)
+        return entry
+
+    async def list_all(self, session: AsyncSession) -> list[AgeGroupRead]:
+        """
+        Lista todas as faixas etárias usando o cache.
+
+        Args:
+            session: Sessão do banco de dados usada em caso de cache miss
+
+        Returns:
+            list[AgeGroupRead]: Todas as faixas etárias
+        """
+        return (await self._list_entry(session)).items
+
+    async def list_response(self, session: AsyncSession) -> tuple[bytes, str]:
+        """
+        Retorna a lista completa pré-serializada em JSON e seu ETag.
+
+        O corpo só é recalculado quando o cache é invalidado ou expira.
+
+        Args:
+            session: Sessão do banco de dados usada em caso de cache miss
+
+        Returns:
+            tuple[bytes, str]: Corpo JSON e ETag
+        """
+        entry = await self._list_entry(session)
+        return entry.body, entry.etag
+
+    def invalidate_local(self, age_group_id: Optional[UUID] = None) -> None:
+        """
+        Descarta entradas do cache deste processo.
+
+        Args:
+            age_group_id: ID a descartar; None descarta o cache inteiro
+        """
+        self._generation += 1
+        self._all = None
+        if age_group_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(age_group_id, None)
+
+    async def _publish(self, message: str) -> None:
+        """Publica uma mensagem de invalidação no canal Redis."""
+        await get_redis(self.url).publish(INVALIDATION_CHANNEL, message)
+
+    async def invalidate(self, age_group_id: Optional[UUID] = None) -> None:
+        """
+        Invalida o cache local e avisa os demais processos via Redis pub/sub.
+
+        Falhas de publicação são apenas registradas: o TTL limita o tempo
+        em que outros processos podem servir uma cópia antiga.
+
+        Args:
+            age_group_id: ID alterado; None invalida todas as faixas etárias
+        """
+        self.invalidate_local(age_group_id)
+        try:
+            await self._publish(str(age_group_id) if age_group_id else INVALIDATE_ALL)
+        except Exception as e:
+            logger.warning("Age group cache invalidation publish failed", error=str(e))
+
+    async def _listen(self) -> None:
+        """Assina o canal de invalidação e reconecta com backoff em caso de falha."""
+        backoff = 0.5
+        while True:
+            # Conexão dedicada, sem timeout de leitura: o canal fica ocioso por longos períodos.
+            client = create_redis_client(self.url, max_connections=1, socket_timeout=None)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Mensagens podem ter sido perdidas enquanto desconectado.
+                self.invalidate_local()
+                backoff = 0.5
+                async for message in pubsub.listen():
+                    data = message.get("data")
+                    if data == INVALIDATE_ALL:
+                        self.invalidate_local()
+                        continue
+                    try:
+                        self.invalidate_local(UUID(data))
+                    except (TypeError, ValueError):
+                        self.invalidate_local()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Age group cache listener error", error=str(e))
+                self.invalidate_local()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                await pubsub.aclose()
+                await client.aclose(close_connection_pool=True)
+
+    def start_listener(self) -> None:
+        """Inicia a tarefa de escuta de invalidações no loop atual."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop_listener(self) -> None:
+        """Encerra a tarefa de escuta."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+age_group_cache = AgeGroupCache()
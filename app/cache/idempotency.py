@@ -0,0 +1,231 @@
+import asyncio
+import hashlib
+import json
+import os
+import secrets
+import time
+from dataclasses import asdict, dataclass
+from typing import Awaitable, Callable, Optional
+
+import redis.asyncio as redis
+from fastapi import HTTPException, Response, status
+
+from app.queue.redis_client import get_redis
+from app.utils.logger import logger
+
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_LOCK_TTL = float(os.getenv("IDEMPOTENCY_LOCK_TTL", "10"))
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", "60"))
+IDEMPOTENCY_POLL_INTERVAL = 0.05
+KEY_PREFIX = "idempotency"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# Remove o lock apenas se ainda pertencer a quem o criou.
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Renova o lock apenas se ainda pertencer a quem o criou.
+EXTEND_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+@dataclass
+class StoredResponse:
+    """Resposta gravada para uma Idempotency-Key."""
+    fingerprint: str
+    status_code: int
+    body: str
+    media_type: str = "application/json"
+
+
+def request_fingerprint(payload: str) -> str:
+    """Gera a impressão digital do corpo da requisição (JSON canônico)."""
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Guarda no Redis a primeira resposta de cada Idempotency-Key.
+
+    Repetições com a mesma chave recebem a resposta gravada sem executar o
+    handler. Um lock curto (SET NX) garante que requisições concorrentes com
+    a mesma chave executem o handler uma única vez; as demais aguardam a
+    resposta gravada. Enquanto o handler executa, o lock é renovado a cada
+    terço do seu TTL, para que handlers mais lentos que `lock_ttl` não
+    liberem a chave para uma segunda execução.
+    """
+
+    def __init__(
+        self,
+        ttl: int = IDEMPOTENCY_TTL,
+        lock_ttl: float = IDEMPOTENCY_LOCK_TTL,
+        wait_timeout: float = IDEMPOTENCY_WAIT_TIMEOUT,
+        url: Optional[str] = None,
+    ):
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.url = url
+
+    def _redis(self) -> redis.Redis:
+        return get_redis(self.url)
+
+    @staticmethod
+    def key_for(user: str, route: str, idempotency_key: str) -> str:
+        """
+        Monta a chave Redis escopada por usuário e rota.
+
+        Args:
+            user: Usuário autenticado
+            route: Método e rota, ex: "POST /enrollments/"
+            idempotency_key: Valor do header Idempotency-Key
+
+        Returns:
+            str: Chave Redis da resposta gravada
+        """
+        digest = hashlib.sha256(f"{user}\x00{route}\x00{idempotency_key}".encode()).hexdigest()
+        return f"{KEY_PREFIX}:{digest}"
+
+    async def _load(self, key: str) -> Optional[StoredResponse]:
+        raw = await self._redis().get(key)
+        return StoredResponse(**json.loads(raw)) if raw else None
+
+    async def _save(self, key: str, stored: StoredResponse) -> None:
+        await self._redis().set(key, json.dumps(asdict(stored)), ex=self.ttl)
+
+    async def _save_quietly(self, key: str, stored: StoredResponse) -> None:
+        """Grava a resposta; falhas só são registradas, pois a escrita já ocorreu."""
+        try:
+            await self._save(key, stored)
+        except Exception as e:
+            logger.warning("Idempotency response not stored", error=str(e))
+
+    async def _try_lock(self, key: str, token: str) -> bool:
+        return bool(await self._redis().set(f"{key}:lock", token, nx=True, px=int(self.lock_ttl * 1000)))
+
+    async def _extend_lock(self, key: str, token: str) -> bool:
+        return bool(await self._redis().eval(
+            EXTEND_LOCK_SCRIPT, 1, f"{key}:lock", token, int(self.lock_ttl * 1000)
+        ))
+
+    async def _unlock(self, key: str, token: str) -> None:
+        await self._redis().eval(RELEASE_LOCK_SCRIPT, 1, f"{key}:lock", token)
+
+    async def _keep_lock(self, key: str, token: str) -> None:
+        """Renova o lock até ser cancelada; para se o lock foi perdido."""
+        while True:
+            await asyncio.sleep(self.lock_ttl / 3)
+            try:
+                if not await self._extend_lock(key, token):
+                    logger.warning("Idempotency lock lost while handler was running")
+                    return
+            except Exception as e:
+                logger.warning("Idempotency lock renewal failed", error=str(e))
+
+    def _replay(self, stored: StoredResponse, fingerprint: str) -> Response:
+        """Devolve a resposta gravada, recusando corpos diferentes para a mesma chave."""
+        if stored.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key já utilizada com outro corpo de requisição",
+            )
+        return Response(
+            content=stored.body,
+            status_code=stored.status_code,
+            media_type=stored.media_type,
+            headers={REPLAYED_HEADER: "true"},
+        )
+
+    async def _wait_for_response(self, key: str, token: str, fingerprint: str) -> Optional[Response]:
+        """
+        Aguarda a requisição concorrente terminar.
+
+        Espera enquanto o lock existir (o dono o renova até terminar), até
+        `wait_timeout`; se o lock expirar sem resposta gravada, o dono caiu e
+        esta requisição assume.
+
+        Returns:
+            Response | None: Resposta gravada, ou None se o lock foi obtido
+            (a requisição anterior falhou sem gravar resposta)
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(IDEMPOTENCY_POLL_INTERVAL)
+            stored = await self._load(key)
+            if stored is not None:
+                return self._replay(stored, fingerprint)
+            if await self._try_lock(key, token):
+                return None
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Requisição com a mesma Idempotency-Key ainda em processamento",
+        )
+
+    async def execute(
+        self,
+        key: str,
+        fingerprint: str,
+        handler: Callable[[], Awaitable[tuple[int, str]]],
+    ) -> Response:
+        """
+        Executa o handler uma única vez por chave e grava a resposta.
+
+        Respostas 2xx e erros 4xx (`HTTPException`) são gravados; erros 5xx
+        liberam o lock sem gravar, permitindo que o cliente tente de novo.
+        Se o Redis estiver indisponível o handler é executado normalmente.
+
+        Args:
+            key: Chave retornada por `key_for`
+            fingerprint: Impressão digital do corpo da requisição
+            handler: Corrotina que retorna (status HTTP, corpo JSON)
+
+        Returns:
+            Response: Resposta do handler ou a resposta gravada
+        """
+        token = secrets.token_hex(16)
+        try:
+            stored = await self._load(key)
+            if stored is not None:
+                return self._replay(stored, fingerprint)
+            if not await self._try_lock(key, token):
+                replayed = await self._wait_for_response(key, token, fingerprint)
+                if replayed is not None:
+                    return replayed
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.warning("Idempotency store unavailable", error=str(e))
+            status_code, body = await handler()
+            return Response(content=body, status_code=status_code, media_type="application/json")
+
+        heartbeat = asyncio.create_task(self._keep_lock(key, token))
+        try:
+            try:
+                status_code, body = await handler()
+            except HTTPException as e:
+                if e.status_code < 500:
+                    await self._save_quietly(key, StoredResponse(
+                        fingerprint=fingerprint,
+                        status_code=e.status_code,
+                        body=json.dumps({"detail": e.detail}),
+                    ))
+                raise
+            await self._save_quietly(key, StoredResponse(fingerprint=fingerprint, status_code=status_code, body=body))
+            return Response(content=body, status_code=status_code, media_type="application/json")
+        finally:
+            heartbeat.cancel()
+            try:
+                await self._unlock(key, token)
+            except Exception as e:
+                logger.warning("Idempotency lock release failed", error=str(e))
+
+
+idempotency_store = IdempotencyStore()
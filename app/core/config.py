@@ -15,6 +15,60 @@ class Settings(BaseSettings):
     API_USERNAME: str = Field(default="admin", alias="API_USERNAME")
     API_PASSWORD: str = Field(default="secret", alias="API_PASSWORD")
     LOG_LEVEL: str = Field(default="INFO", alias="LOG_LEVEL")
+    JWT_BACKEND: str = Field(
+        default="jose",
+        alias="JWT_BACKEND",
+        description="Biblioteca de verificação de JWT: 'jose' ou 'pyjwt' (mais rápida, opcional)"
+    )
+    AUTH_CACHE_SIZE: int = Field(default=10000, alias="AUTH_CACHE_SIZE", description="Credenciais verificadas mantidas em cache")
+    AUTH_CACHE_TTL: float = Field(default=300, alias="AUTH_CACHE_TTL", description="Segundos que uma verificação fica em cache")
+    ENROLLMENT_BULK_MAX: int = Field(
+        default=1000,
+        alias="ENROLLMENT_BULK_MAX",
+        description="Número máximo de inscrições aceitas por requisição em POST /enrollments/bulk"
+    )
+    ENROLLMENT_STATUS_CHUNK: int = Field(
+        default=500,
+        alias="ENROLLMENT_STATUS_CHUNK",
+        description="Inscrições alteradas por transação em PATCH /enrollments/status"
+    )
+    ENROLLMENT_STATS_SHARDS: int = Field(
+        default=8,
+        alias="ENROLLMENT_STATS_SHARDS",
+        description="Linhas por contador de enrollment_stats, para espalhar escritas concorrentes"
+    )
+    FAST_JSON_RESPONSES: bool = Field(
+        default=False,
+        alias="FAST_JSON_RESPONSES",
+        description="Serializa listagens direto das tuplas do banco, sem instanciar models"
+    )
+    PROFILING_ENABLED: bool = Field(
+        default=False,
+        alias="PROFILING_ENABLED",
+        description="Mede as fases de cada requisição e registra as lentas (desligado não instala nenhum hook)"
+    )
+    PROFILING_SLOW_MS: float = Field(default=500, alias="PROFILING_SLOW_MS", description="Requisições a partir deste tempo são registradas com o detalhamento")
+    PROFILING_SAMPLE_RATE: int = Field(
+        default=0,
+        alias="PROFILING_SAMPLE_RATE",
+        description="Roda 1 em cada N requisições sob cProfile e grava o perfil das lentas (0 desliga)"
+    )
+    PROFILING_DIR: str = Field(default="profiles", alias="PROFILING_DIR", description="Diretório dos perfis gravados")
+
+    DB_ECHO: bool = Field(default=False, alias="DB_ECHO", description="Loga todo SQL executado")
+    DB_POOL_SIZE: int = Field(default=10, alias="DB_POOL_SIZE", description="Conexões mantidas no pool da API")
+    DB_MAX_OVERFLOW: int = Field(default=10, alias="DB_MAX_OVERFLOW", description="Conexões extras temporárias da API")
+    DB_POOL_TIMEOUT: float = Field(default=30, alias="DB_POOL_TIMEOUT", description="Segundos de espera por uma conexão livre")
+    DB_POOL_RECYCLE: int = Field(default=1800, alias="DB_POOL_RECYCLE", description="Idade máxima de uma conexão em segundos")
+    DB_POOL_PRE_PING: bool = Field(default=True, alias="DB_POOL_PRE_PING", description="Testa a conexão antes de usá-la")
+    DB_STATEMENT_CACHE_SIZE: int = Field(
+        default=100,
+        alias="DB_STATEMENT_CACHE_SIZE",
+        description="Cache de prepared statements do asyncpg (0 para PgBouncer em modo transaction)"
+    )
+    WORKER_DB_POOL_SIZE: int = Field(default=5, alias="WORKER_DB_POOL_SIZE", description="Conexões mantidas no pool do worker")
+    WORKER_DB_MAX_OVERFLOW: int = Field(default=0, alias="WORKER_DB_MAX_OVERFLOW", description="Conexões extras temporárias do worker")
+    WORKER_DB_POOL_TIMEOUT: float = Field(default=60, alias="WORKER_DB_POOL_TIMEOUT", description="Segundos de espera por uma conexão livre no worker")
 
     def model_post_init(self, __context):
         """Inicialização pós-validação do modelo."""
@@ -1,4 +1,11 @@
 
+import hashlib
+import hmac
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
 from app.core.config import settings
 from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime, timedelta, UTC
@@ -6,6 +13,13 @@ from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from app.schemas.token_schema import TokenData
+from app.utils.logger import logger
+from app.utils.profiling import span
+
+try:
+    import jwt as pyjwt  # PyJWT, backend opcional mais rápido
+except ImportError:  # pragma: no cover - depende do ambiente
+    pyjwt = None
 
 SECRET_KEY = "supersecretkey"
 ALGORITHM = "HS256"
@@ -14,6 +28,82 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token")
 
 
+class VerifiedCache:
+    """
+    Cache LRU com TTL de credenciais já verificadas.
+
+    As chaves são HMACs com uma chave aleatória do processo, então nem o
+    token nem a senha ficam guardados em claro. Cada entrada expira no
+    menor valor entre o TTL configurado e a expiração informada.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._key = secrets.token_bytes(32)
+        self._entries: OrderedDict[bytes, tuple[float, str]] = OrderedDict()
+
+    def key_for(self, secret: str) -> bytes:
+        """Deriva a chave de cache de um token ou credencial."""
+        return hmac.new(self._key, secret.encode(), hashlib.sha256).digest()
+
+    def get(self, key: bytes) -> Optional[str]:
+        """Retorna o usuário verificado ou None se ausente ou expirado."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, username = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return username
+
+    def put(self, key: bytes, username: str, expires_at: Optional[float] = None) -> None:
+        """Guarda uma verificação bem-sucedida."""
+        if self.max_entries <= 0:
+            return
+        deadline = time.time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        self._entries[key] = (deadline, username)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Descarta todas as entradas."""
+        self._entries.clear()
+
+
+token_cache = VerifiedCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL)
+credentials_cache = VerifiedCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL)
+
+if settings.JWT_BACKEND == "pyjwt" and pyjwt is None:
+    logger.warning("JWT_BACKEND=pyjwt requested but PyJWT is not installed, using python-jose")
+
+
+def decode_token(token: str) -> dict[str, Any]:
+    """
+    Verifica assinatura e expiração de um JWT com o backend configurado.
+
+    Args:
+        token: Token JWT
+
+    Returns:
+        dict: Claims do token
+
+    Raises:
+        JWTError: Se o token for inválido ou expirado
+    """
+    if settings.JWT_BACKEND == "pyjwt" and pyjwt is not None:
+        try:
+            return pyjwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except pyjwt.PyJWTError as e:
+            raise JWTError(str(e))
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
 async def authenticate_user(username: str, password: str, session: AsyncSession) -> bool:
     """
     Autentica um usuário verificando as credenciais contra as configurações.
@@ -26,9 +116,9 @@ async def authenticate_user(username: str, password: str, session: AsyncSession)
     Returns:
         bool: True se as credenciais são válidas, False caso contrário
     """
-    if username == settings.API_USERNAME and password == settings.API_PASSWORD:
-        return True
-    return False
+    username_ok = hmac.compare_digest(username.encode(), settings.API_USERNAME.encode())
+    password_ok = hmac.compare_digest(password.encode(), settings.API_PASSWORD.encode())
+    return username_ok and password_ok
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
@@ -53,6 +143,9 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     """
     Valida o token JWT e retorna o usuário atual.
     
+    Tokens já verificados são servidos do `token_cache` até o menor valor
+    entre o TTL do cache e o `exp` do token.
+    
     Args:
         token: Token JWT fornecido no header Authorization
         
@@ -62,19 +155,27 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     Raises:
         HTTPException: Se o token for inválido ou expirado
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+    with span("auth"):
+        cache_key = token_cache.key_for(token)
+        cached_username = token_cache.get(cache_key)
+        if cached_username is not None:
+            return cached_username
+
+        credentials_exception = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+        try:
+            payload = decode_token(token)
+            username: str = payload.get("sub")
+            if username is None:
+                raise credentials_exception
+            token_data = TokenData(username=username)
+        except JWTError:
+            raise credentials_exception
+        if username != settings.API_USERNAME:
             raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
-        raise credentials_exception
-    if username != settings.API_USERNAME:
-        raise credentials_exception
-    return username
+        exp = payload.get("exp")
+        token_cache.put(cache_key, username, float(exp) if isinstance(exp, (int, float)) else None)
+        return username
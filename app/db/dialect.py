@@ -0,0 +1,54 @@
+from sqlalchemy import DateTime
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.dml import Insert
+from sqlalchemy.sql.functions import FunctionElement
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+_DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def dialect_insert(session: AsyncSession, table) -> Insert:
+    """
+    Cria um INSERT do dialeto da sessão, com suporte a `ON CONFLICT`.
+
+    Args:
+        session: Sessão cujo engine define o dialeto
+        table: Model ou tabela alvo
+
+    Returns:
+        Insert: Instrução com `on_conflict_do_nothing` / `on_conflict_do_update`
+
+    Raises:
+        NotImplementedError: Se o banco não for PostgreSQL nem SQLite
+    """
+    name = session.bind.dialect.name
+    try:
+        return _DIALECT_INSERTS[name](table)
+    except KeyError:
+        raise NotImplementedError(f"ON CONFLICT não suportado para o dialeto {name}")
+
+
+class utcnow(FunctionElement):
+    """
+    Momento atual como default do servidor (`server_default=utcnow()`).
+
+    No SQLite gera o texto no mesmo formato (microssegundos) que o SQLAlchemy
+    usa nos parâmetros, para que comparações e cursores sobre a coluna
+    funcionem; `CURRENT_TIMESTAMP` teria só segundos.
+    """
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw) -> str:
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "sqlite")
+def _utcnow_sqlite(element, compiler, **kw) -> str:
+    return "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
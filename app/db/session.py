@@ -1,19 +1,134 @@
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, AsyncGenerator
+
 from sqlmodel import SQLModel
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.utils.metrics import DB_POOL_WAIT
+
+
+@dataclass
+class PoolWaitStats:
+    """Estatísticas acumuladas de espera por conexões do pool."""
+    checkouts: int = 0
+    timeouts: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    last_wait_seconds: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.total_wait_seconds += seconds
+        self.last_wait_seconds = seconds
+        if seconds > self.max_wait_seconds:
+            self.max_wait_seconds = seconds
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    Pool assíncrono que mede quanto tempo cada checkout espera por uma conexão.
+
+    A espera é acumulada em `wait_stats` (exposta por `pool_status`) e no
+    histograma `db_pool_wait_seconds`.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def recreate(self) -> "InstrumentedAsyncPool":
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_stats.record(waited)
+            DB_POOL_WAIT.observe(waited)
+
+
+def build_engine(profile: str = "api") -> AsyncEngine:
+    """
+    Cria o engine assíncrono com o perfil de pool da API ou do worker.
+
+    Args:
+        profile: "api" ou "worker"
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True,
-    connect_args={
+    Returns:
+        AsyncEngine: Engine configurado a partir de `Settings`
+    """
+    url = make_url(settings.DATABASE_URL)
+    if url.get_backend_name() != "postgresql":
+        return create_async_engine(url, echo=settings.DB_ECHO)
+
+    if profile == "worker":
+        pool_size = settings.WORKER_DB_POOL_SIZE
+        max_overflow = settings.WORKER_DB_MAX_OVERFLOW
+        pool_timeout = settings.WORKER_DB_POOL_TIMEOUT
+    else:
+        pool_size = settings.DB_POOL_SIZE
+        max_overflow = settings.DB_MAX_OVERFLOW
+        pool_timeout = settings.DB_POOL_TIMEOUT
+
+    connect_args: dict[str, Any] = {
         "server_settings": {
             "timezone": "UTC",
+            "application_name": f"crud-fastapi-{profile}",
         }
     }
-)
+    if url.get_driver_name() == "asyncpg":
+        connect_args["statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        poolclass=InstrumentedAsyncPool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+
+
+def pool_status(db_engine: AsyncEngine) -> dict[str, Any]:
+    """
+    Retorna o estado atual do pool de conexões de um engine.
+
+    Args:
+        db_engine: Engine a inspecionar
+
+    Returns:
+        dict: Tamanho, conexões em uso, overflow e estatísticas de espera
+    """
+    pool = db_engine.pool
+    status: dict[str, Any] = {"pool_class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            status[name] = method()
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        status.update(asdict(wait_stats))
+    return status
+
+
+engine = build_engine("api")
 
 AsyncSessionLocal = sessionmaker(
     bind=engine,
@@ -21,12 +136,11 @@ AsyncSessionLocal = sessionmaker(
     expire_on_commit=False,
 )
 
-from typing import AsyncGenerator
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependência do FastAPI para fornecer uma sessão de banco de dados.
-    
+
     Yields:
         AsyncSession: Sessão de banco configurada que é automaticamente fechada
     """
@@ -37,12 +151,14 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
 async def init_db() -> None:
     """
     Inicializa o banco de dados criando todas as tabelas definidas nos models.
-    
+
     Note:
         Em produção, prefira usar migrações com Alembic ao invés desta função.
     """
     async with engine.begin() as conn:
         from app.models import age_group
         from app.models import enrollment
+        from app.models import enrollment_stats
+        from app.models import outbox
 
         await conn.run_sync(SQLModel.metadata.create_all)
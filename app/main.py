@@ -1,11 +1,20 @@
 import os
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Response
 
-from app.db.session import engine, init_db
+from sqlalchemy import text
+
+from app.db.session import engine, init_db, pool_status
 from app.api.routers.age_groups import router as age_groups_router
 from app.api.routers.enrollments import router as enrollments_router
+from app.api.routers.admin import router as admin_router
 from app.utils.logger import configure_logging, logger
+from app.cache.age_group_cache import age_group_cache
+from app.queue.redis_backend import redis_queue
+from app.queue.redis_client import ping_redis
+from app.utils.metrics import PrometheusMiddleware, instrument_engine, render_metrics, update_pool_gauges
+from app.core.config import settings
+from app.utils.profiling import install_profiling
 
 
 def create_app() -> FastAPI:
@@ -31,8 +40,12 @@ def create_app() -> FastAPI:
         if os.getenv("INIT_DB", "false").lower() == "true":
             logger.info("Initializing database schema")
             await init_db()
+        await redis_queue.connect()
+        age_group_cache.start_listener()
         yield
         logger.info("Application shutdown")
+        await age_group_cache.stop_listener()
+        await redis_queue.close()
 
     app = FastAPI(
         title="Event Enrollment API",
@@ -42,6 +55,16 @@ def create_app() -> FastAPI:
         redoc_url="/redoc",
         lifespan=lifespan,
     )
+    app.add_middleware(PrometheusMiddleware)
+    instrument_engine(engine)
+    if settings.PROFILING_ENABLED:
+        install_profiling(
+            app,
+            engine,
+            slow_ms=settings.PROFILING_SLOW_MS,
+            sample_rate=settings.PROFILING_SAMPLE_RATE,
+            profile_dir=settings.PROFILING_DIR,
+        )
 
     @app.post("/token", response_model=Token, tags=["auth"])
     async def login_for_access_token(
@@ -65,6 +88,7 @@ def create_app() -> FastAPI:
 
     app.include_router(age_groups_router)
     app.include_router(enrollments_router)
+    app.include_router(admin_router)
 
     @app.get("/", tags=["root"])
     async def root():
@@ -77,14 +101,28 @@ def create_app() -> FastAPI:
 
     @app.get("/api/v1/health", tags=["health"])
     async def health_check():
-        """Health check que verifica conectividade com banco de dados."""
+        """Health check que verifica conectividade com banco de dados e Redis."""
         try:
             async with engine.connect() as conn:
-                await conn.execute("SELECT 1")
-            return {"status": "ok"}
+                await conn.execute(text("SELECT 1"))
         except Exception as e:
             logger.error("Health check failed", error=str(e))
             return {"status": "error", "detail": str(e)}
+        # Redis fora do ar degrada a API (jobs aguardam no outbox), mas não a derruba.
+        redis_ok = await ping_redis()
+        return {"status": "ok" if redis_ok else "degraded", "redis": "ok" if redis_ok else "unavailable"}
+
+    @app.get("/api/v1/health/db-pool", tags=["health"])
+    async def db_pool_status():
+        """Estado atual do pool de conexões: em uso, overflow e tempo de espera."""
+        return pool_status(engine)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Métricas no formato Prometheus."""
+        update_pool_gauges(pool_status(engine))
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
 
     return app
 
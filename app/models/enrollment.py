@@ -1,9 +1,13 @@
+from datetime import datetime
 from typing import Optional, TYPE_CHECKING
 from uuid import UUID, uuid4
 from enum import Enum
 
+from sqlalchemy import DateTime, Index, UniqueConstraint, func, text
 from sqlmodel import SQLModel, Field, Relationship
 
+from app.db.dialect import utcnow
+
 if TYPE_CHECKING:
     from app.models.age_group import AgeGroup
 
@@ -23,6 +27,30 @@ class Enrollment(SQLModel, table=True):
     e a idade do inscrito deve estar dentro dos limites da faixa.
     """
     __tablename__ = "enrollments"
+    # Mantidos em sincronia com migrations/versions.
+    __table_args__ = (
+        UniqueConstraint("email", "age_group_id", name="uq_enrollments_email_age_group"),
+        # Filtro por status com paginação keyset por ID (GET /enrollments/?status_filter=...).
+        Index("ix_enrollments_status_id", "status", "id"),
+        # Filtros de GET /enrollments/ com paginação keyset: (coluna, id).
+        Index("ix_enrollments_age_group_id_id", "age_group_id", "id"),
+        Index("ix_enrollments_created_at_id", "created_at", "id"),
+        Index("ix_enrollments_age_id", "age", "id"),
+        # Filtro por igualdade + sort=created_at/age (varridos ao contrário no '-').
+        Index("ix_enrollments_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_enrollments_status_age_id", "status", "age", "id"),
+        Index("ix_enrollments_age_group_id_created_at_id", "age_group_id", "created_at", "id"),
+        Index("ix_enrollments_age_group_id_age_id", "age_group_id", "age", "id"),
+        # Contagem por status de uma faixa etária na reconciliação de enrollment_stats.
+        Index("ix_enrollments_age_group_status", "age_group_id", "status"),
+        # Índice parcial pequeno para as inscrições ainda não processadas pelo worker.
+        Index(
+            "ix_enrollments_pending",
+            "id",
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     name: str = Field(..., description="Nome completo do inscrito")
@@ -30,5 +58,31 @@ class Enrollment(SQLModel, table=True):
     age: int = Field(..., ge=0, le=120, description="Idade atual")
     age_group_id: UUID = Field(..., foreign_key="age_groups.id", description="ID da faixa etária")
     status: EnrollmentStatus = Field(default=EnrollmentStatus.pending, description="Status da inscrição")
+    processed_at: Optional[datetime] = Field(
+        default=None,
+        sa_type=DateTime(timezone=True),
+        description="Momento em que o worker processou a inscrição",
+    )
+    created_at: Optional[datetime] = Field(
+        default=None,
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"server_default": utcnow(), "nullable": False},
+        description="Momento da criação (default do banco, devolvido pelo RETURNING)",
+    )
+
+    age_group: Optional["AgeGroup"] = Relationship(back_populates="enrollments")
+
 
-    age_group: Optional["AgeGroup"] = Relationship(back_populates="enrollments")
\ No newline at end of file
+# Busca por prefixo (LIKE 'abc%') sem diferenciar maiúsculas. No PostgreSQL o
+# operator class text_pattern_ops permite usar o índice com qualquer collation;
+# no SQLite (testes) o índice de expressão é criado, mas o LIKE não o usa.
+Index(
+    "ix_enrollments_name_prefix",
+    func.lower(Enrollment.name).label("name_lower"),
+    postgresql_ops={"name_lower": "text_pattern_ops"},
+)
+Index(
+    "ix_enrollments_email_prefix",
+    func.lower(Enrollment.email).label("email_lower"),
+    postgresql_ops={"email_lower": "text_pattern_ops"},
+)
@@ -0,0 +1,24 @@
+from uuid import UUID
+
+from sqlmodel import SQLModel, Field
+
+from app.models.enrollment import EnrollmentStatus
+
+
+class EnrollmentStats(SQLModel, table=True):
+    """
+    Contadores de inscrições por faixa etária e status.
+    
+    Mantidos incrementalmente na mesma transação de cada escrita em
+    `enrollments` e reconstruídos periodicamente por `worker.stats_reconciler`.
+    Cada contador é dividido em `ENROLLMENT_STATS_SHARDS` linhas (`shard`),
+    somadas na leitura, para que escritas concorrentes no mesmo contador não
+    disputem a mesma linha.
+    Sem FK para `age_groups`: linhas zeradas de faixas removidas são inofensivas.
+    """
+    __tablename__ = "enrollment_stats"
+
+    age_group_id: UUID = Field(primary_key=True, description="ID da faixa etária")
+    status: EnrollmentStatus = Field(primary_key=True, description="Status das inscrições contadas")
+    shard: int = Field(default=0, primary_key=True, description="Parte do contador (somadas na leitura)")
+    total: int = Field(default=0, description="Número de inscrições")
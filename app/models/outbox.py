@@ -0,0 +1,29 @@
+from datetime import datetime, UTC
+from typing import Any
+
+from sqlalchemy import JSON, BigInteger, DateTime, Integer
+from sqlmodel import SQLModel, Field
+
+
+class OutboxMessage(SQLModel, table=True):
+    """
+    Tarefa aguardando envio para a fila Redis (transactional outbox).
+    
+    Gravada na mesma transação da inscrição, de modo que a inscrição e seu
+    job existem ou deixam de existir juntos. O relay (`worker.outbox_relay`)
+    envia as mensagens em lote para o Redis e as remove.
+    """
+    __tablename__ = "outbox"
+
+    id: int | None = Field(
+        default=None,
+        primary_key=True,
+        # SQLite só autoincrementa INTEGER PRIMARY KEY.
+        sa_type=BigInteger().with_variant(Integer, "sqlite"),
+    )
+    payload: dict[str, Any] = Field(sa_type=JSON, description="Tarefa a enfileirar")
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC),
+        sa_type=DateTime(timezone=True),
+        description="Momento em que a mensagem foi gravada",
+    )
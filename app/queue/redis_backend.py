@@ -1,68 +1,1108 @@
 import json
 import os
+import random
+import socket
 import asyncio
-from typing import Any, Optional
+import time
+from typing import Any, Optional, Union
+from uuid import uuid4
 import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import ResponseError
+
+from app.queue.redis_client import DEFAULT_REDIS_URL, close_redis, get_redis
+from app.utils.metrics import REDIS_ENQUEUE_DURATION
 
-DEFAULT_REDIS_URL = "redis://localhost:6379/0"
 QUEUE_KEY = os.getenv("ENROLLMENT_QUEUE_KEY", "enrollment_queue")
+RELIABLE_QUEUE = os.getenv("ENROLLMENT_QUEUE_RELIABLE", "false").lower() == "true"
+HEARTBEAT_TTL = int(os.getenv("ENROLLMENT_QUEUE_HEARTBEAT_TTL", "30"))
+RECEIPT_FIELD = "_receipt"
+ENQUEUED_AT_FIELD = "enqueued_at"
+QUEUE_BACKEND = os.getenv("ENROLLMENT_QUEUE_BACKEND", "list")
+STREAM_KEY = os.getenv("ENROLLMENT_STREAM_KEY", f"{QUEUE_KEY}:stream")
+STREAM_GROUP = os.getenv("ENROLLMENT_STREAM_GROUP", "enrollment_workers")
+STREAM_CLAIM_IDLE_MS = int(os.getenv("ENROLLMENT_STREAM_CLAIM_IDLE_MS", "60000"))
+
+# Lanes de prioridade: tarefas sem lane são interativas (QUEUE_KEY); a lane
+# bulk é dividida em uma lista por partição (faixa etária).
+LANE_FIELD = "lane"
+PARTITION_FIELD = "partition"
+LANE_INTERACTIVE = "interactive"
+LANE_BULK = "bulk"
+LANES = (LANE_INTERACTIVE, LANE_BULK)
+# Partição das tarefas bulk enfileiradas sem partição (mesmo valor usado no Lua).
+DEFAULT_PARTITION = "default"
+# Pesos do round-robin: a cada ciclo saem até N tarefas interativas para M bulk.
+INTERACTIVE_WEIGHT = max(1, int(os.getenv("ENROLLMENT_QUEUE_INTERACTIVE_WEIGHT", "4")))
+BULK_WEIGHT = max(1, int(os.getenv("ENROLLMENT_QUEUE_BULK_WEIGHT", "1")))
+BULK_PARTITION_PREFIX = f"{QUEUE_KEY}:bulk:p:"
+BULK_RING_KEY = f"{QUEUE_KEY}:bulk:ring"
+BULK_PARTITIONS_KEY = f"{QUEUE_KEY}:bulk:partitions"
+# Retentativas: tarefas que falham voltam à fila após um backoff exponencial
+# (ZSET de tarefas atrasadas) e vão para a dead-letter queue após N falhas.
+ATTEMPTS_FIELD = "attempts"
+LAST_ERROR_FIELD = "last_error"
+FAILED_AT_FIELD = "failed_at"
+DELAYED_KEY = f"{QUEUE_KEY}:delayed"
+DEAD_KEY = f"{QUEUE_KEY}:dead"
+MAX_ATTEMPTS = int(os.getenv("ENROLLMENT_RETRY_MAX_ATTEMPTS", "8"))
+RETRY_BASE_DELAY = float(os.getenv("ENROLLMENT_RETRY_BASE_DELAY", "2"))
+RETRY_MAX_DELAY = float(os.getenv("ENROLLMENT_RETRY_MAX_DELAY", "600"))
+PROMOTE_BATCH = 500
+MAX_ERROR_LENGTH = 500
+# Itens por chamada do script de push (limite de argumentos do unpack no Lua).
+PUSH_CHUNK = 1000
+
+# Empilha itens na lista de uma partição bulk e, se a partição estava
+# inativa, a registra no anel usado pelo round-robin.
+PUSH_BULK_SCRIPT = """
+redis.call('LPUSH', KEYS[1], unpack(ARGV, 2))
+if redis.call('SADD', KEYS[3], ARGV[1]) == 1 then
+    redis.call('RPUSH', KEYS[2], ARGV[1])
+end
+return #ARGV - 1
+"""
+
+# Retira até ARGV[1] itens alternando ARGV[2] interativos e ARGV[3] bulk por
+# ciclo; dentro da lane bulk cada item vem da próxima partição do anel.
+# Com ARGV[5] == '1' os itens vão para a lista de processamento (KEYS[4]).
+# As listas das partições são derivadas de ARGV[4] (requer Redis sem cluster).
+WEIGHTED_POP_SCRIPT = """
+local reliable = ARGV[5] == '1'
+local function pop(key)
+    if reliable then
+        return redis.call('LMOVE', key, KEYS[4], 'RIGHT', 'LEFT')
+    end
+    return redis.call('RPOP', key)
+end
+local function pop_bulk()
+    while true do
+        local partition = redis.call('LMOVE', KEYS[2], KEYS[2], 'LEFT', 'RIGHT')
+        if not partition then
+            return false
+        end
+        local item = pop(ARGV[4] .. partition)
+        if item then
+            return item
+        end
+        redis.call('LREM', KEYS[2], 0, partition)
+        redis.call('SREM', KEYS[3], partition)
+    end
+end
+local items = {}
+local max_items = tonumber(ARGV[1])
+local interactive_open, bulk_open = true, true
+while #items < max_items and (interactive_open or bulk_open) do
+    for _ = 1, tonumber(ARGV[2]) do
+        if #items >= max_items or not interactive_open then
+            break
+        end
+        local item = pop(KEYS[1])
+        if item then
+            items[#items + 1] = item
+        else
+            interactive_open = false
+        end
+    end
+    for _ = 1, tonumber(ARGV[3]) do
+        if #items >= max_items or not bulk_open then
+            break
+        end
+        local item = pop_bulk()
+        if item then
+            items[#items + 1] = item
+        else
+            bulk_open = false
+        end
+    end
+end
+return items
+"""
+
+# Devolve um item cru para a ponta de consumo da sua lane.
+ROUTE_LUA = """
+local function route(item, interactive, ring, partitions, prefix)
+    local ok, job = pcall(cjson.decode, item)
+    if ok and type(job) == 'table' and job['lane'] == 'bulk' then
+        local partition = job['partition']
+        if partition == nil or partition == cjson.null then
+            partition = 'default'
+        end
+        partition = tostring(partition)
+        redis.call('RPUSH', prefix .. partition, item)
+        if redis.call('SADD', partitions, partition) == 1 then
+            redis.call('RPUSH', ring, partition)
+        end
+    else
+        redis.call('RPUSH', interactive, item)
+    end
+end
+"""
+
+# Remove os recibos (ARGV[2..]) da lista de processamento e os devolve às lanes.
+NACK_SCRIPT = ROUTE_LUA + """
+for i = 2, #ARGV do
+    redis.call('LREM', KEYS[1], 1, ARGV[i])
+    route(ARGV[i], KEYS[2], KEYS[3], KEYS[4], ARGV[1])
+end
+return #ARGV - 1
+"""
+
+# Se o heartbeat do consumidor (KEYS[5]) expirou, devolve todos os itens da
+# sua lista de processamento para a ponta de consumo das lanes, preservando a
+# ordem original, e o remove do conjunto de consumidores (KEYS[6]). A checagem
+# e a devolução são atômicas: um heartbeat renovado no meio não perde tarefas.
+# Retorna -1 se o consumidor ainda está vivo.
+REQUEUE_SCRIPT = ROUTE_LUA + """
+if redis.call('EXISTS', KEYS[5]) == 1 then
+    return -1
+end
+local moved = 0
+while true do
+    local item = redis.call('LPOP', KEYS[1])
+    if not item then
+        break
+    end
+    route(item, KEYS[2], KEYS[3], KEYS[4], ARGV[1])
+    moved = moved + 1
+end
+redis.call('SREM', KEYS[6], ARGV[2])
+return moved
+"""
+
+# Envia um item à lane de origem no backend de listas (KEYS[2..4], ARGV[3]).
+LIST_PUSH_LUA = ROUTE_LUA + """
+local function push(item)
+    route(item, KEYS[2], KEYS[3], KEYS[4], ARGV[3])
+end
+"""
+
+# Envia um item ao stream da sua lane (KEYS[2] interativo, KEYS[3] bulk).
+STREAM_PUSH_LUA = """
+local function push(item)
+    local ok, job = pcall(cjson.decode, item)
+    local stream = KEYS[2]
+    if ok and type(job) == 'table' and job['lane'] == 'bulk' then
+        stream = KEYS[3]
+    end
+    redis.call('XADD', stream, '*', 'data', item)
+end
+"""
+
+# Move para as lanes até ARGV[1] tarefas atrasadas (KEYS[1]) já vencidas em ARGV[2].
+PROMOTE_LUA = """
+local items = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[2], 'LIMIT', 0, tonumber(ARGV[1]))
+for _, item in ipairs(items) do
+    redis.call('ZREM', KEYS[1], item)
+    push(item)
+end
+return #items
+"""
+
+# Devolve às lanes até ARGV[1] tarefas da dead-letter queue (KEYS[1]), das mais
+# antigas para as mais novas, zerando as tentativas.
+REPLAY_LUA = """
+local replayed = 0
+for _ = 1, tonumber(ARGV[1]) do
+    local item = redis.call('RPOP', KEYS[1])
+    if not item then
+        break
+    end
+    local ok, job = pcall(cjson.decode, item)
+    if ok and type(job) == 'table' then
+        job['attempts'] = nil
+        job['last_error'] = nil
+        job['failed_at'] = nil
+        job['enqueued_at'] = tonumber(ARGV[2])
+        item = cjson.encode(job)
+    end
+    push(item)
+    replayed = replayed + 1
+end
+return replayed
+"""
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    Calcula a espera antes da próxima tentativa (backoff exponencial com jitter).
+
+    Args:
+        attempts: Falhas acumuladas da tarefa (a partir de 1)
+
+    Returns:
+        float: Segundos até a tarefa voltar à fila
+    """
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _serialize(payload: dict[str, Any]) -> str:
+    """Serializa a tarefa, registrando o momento do enfileiramento original."""
+    if ENQUEUED_AT_FIELD not in payload:
+        payload = {**payload, ENQUEUED_AT_FIELD: time.time()}
+    return json.dumps(payload)
+
+
+def with_lane(payload: dict[str, Any], lane: Optional[str], partition: Optional[Any] = None) -> dict[str, Any]:
+    """
+    Marca a tarefa com a lane e a partição em que deve ser enfileirada.
+
+    Args:
+        payload: Dados da tarefa
+        lane: `LANE_INTERACTIVE` ou `LANE_BULK` (None mantém a lane da tarefa)
+        partition: Chave de partição da lane bulk, ex: ID da faixa etária
+
+    Returns:
+        dict: Cópia da tarefa com os campos de lane
+    """
+    if lane is None:
+        return payload
+    _check_lane(lane)
+    payload = {**payload, LANE_FIELD: lane}
+    if lane == LANE_BULK:
+        payload[PARTITION_FIELD] = str(partition) if partition is not None else DEFAULT_PARTITION
+    else:
+        payload.pop(PARTITION_FIELD, None)
+    return payload
+
+
+def lane_of(payload: dict[str, Any]) -> tuple[str, Optional[str]]:
+    """Retorna (lane, partição) da tarefa; tarefas sem lane são interativas."""
+    if isinstance(payload, dict) and payload.get(LANE_FIELD) == LANE_BULK:
+        partition = payload.get(PARTITION_FIELD)
+        return LANE_BULK, str(partition) if partition is not None else DEFAULT_PARTITION
+    return LANE_INTERACTIVE, None
+
+
+def _check_lane(lane: str) -> None:
+    if lane not in LANES:
+        raise ValueError(f"Lane inválida: {lane}")
+
+
+class _RetryMixin:
+    """
+    Retentativas com backoff e dead-letter queue, comuns aos dois backends.
+
+    Tarefas que falham vão para o ZSET `DELAYED_KEY` com score igual ao
+    momento da próxima tentativa; `promote_delayed` as devolve às lanes de
+    origem. Após `max_attempts` falhas a tarefa vai para a lista `DEAD_KEY`,
+    de onde pode ser inspecionada e reenviada com `replay_dead`.
+    """
+
+    max_attempts: int = MAX_ATTEMPTS
+    _client: Optional[redis.Redis]
+
+    def _route_keys(self) -> list[str]:
+        """Chaves usadas pelos scripts para devolver tarefas às lanes."""
+        raise NotImplementedError
+
+    def _route_args(self) -> list[Any]:
+        """Argumentos extras dos scripts de roteamento."""
+        return []
+
+    def _release(self, pipe: Pipeline, jobs: list[dict[str, Any]]):
+        """Adiciona ao pipeline a remoção das tarefas da área de processamento."""
+        raise NotImplementedError
+
+    async def retry(self, failures: list[tuple[dict[str, Any], str]]) -> tuple[int, int]:
+        """
+        Reagenda tarefas que falharam ou as envia à dead-letter queue.
+
+        O reagendamento e a remoção da área de processamento acontecem na
+        mesma transação (MULTI/EXEC).
+
+        Args:
+            failures: Pares (tarefa retornada por `dequeue_batch`, mensagem de erro)
+
+        Returns:
+            tuple[int, int]: Tarefas reagendadas e tarefas enviadas à DLQ
+        """
+        failures = [(job, error) for job, error in failures if isinstance(job, dict)]
+        if not failures:
+            return 0, 0
+        await self.connect()
+        now = time.time()
+        retried = dead = 0
+        async with self._client.pipeline(transaction=True) as pipe:
+            for job, error in failures:
+                payload = {key: value for key, value in job.items() if key != RECEIPT_FIELD}
+                attempts = int(payload.get(ATTEMPTS_FIELD) or 0) + 1
+                payload[ATTEMPTS_FIELD] = attempts
+                payload[LAST_ERROR_FIELD] = error[:MAX_ERROR_LENGTH]
+                if attempts >= self.max_attempts:
+                    payload[FAILED_AT_FIELD] = now
+                    pipe.lpush(DEAD_KEY, json.dumps(payload))
+                    dead += 1
+                else:
+                    pipe.zadd(DELAYED_KEY, {json.dumps(payload): now + retry_delay(attempts)})
+                    retried += 1
+            self._release(pipe, [job for job, _ in failures])
+            await pipe.execute()
+        return retried, dead
+
+    async def promote_delayed(self, limit: int = PROMOTE_BATCH) -> int:
+        """
+        Devolve às lanes as tarefas atrasadas cujo backoff já venceu.
+
+        Args:
+            limit: Número máximo de tarefas movidas por chamada
+
+        Returns:
+            int: Tarefas devolvidas à fila
+        """
+        await self.connect()
+        return await self._promote(
+            keys=[DELAYED_KEY, *self._route_keys()],
+            args=[limit, time.time(), *self._route_args()],
+        )
+
+    async def delayed_size(self) -> int:
+        """Retorna o número de tarefas aguardando nova tentativa."""
+        await self.connect()
+        return await self._client.zcard(DELAYED_KEY)
+
+    async def dead_size(self) -> int:
+        """Retorna o número de tarefas na dead-letter queue."""
+        await self.connect()
+        return await self._client.llen(DEAD_KEY)
+
+    async def dead_letters(self, offset: int = 0, limit: int = 100) -> tuple[int, list[Any]]:
+        """
+        Lista tarefas da dead-letter queue, das mais recentes para as mais antigas.
 
+        Args:
+            offset: Posição inicial
+            limit: Número máximo de tarefas
+
+        Returns:
+            tuple[int, list]: Total na DLQ e as tarefas da página
+        """
+        await self.connect()
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.llen(DEAD_KEY)
+            pipe.lrange(DEAD_KEY, offset, offset + limit - 1)
+            total, items = await pipe.execute()
+        return total, [json.loads(item) for item in items]
+
+    async def replay_dead(self, limit: int) -> int:
+        """
+        Reenvia às lanes as tarefas mais antigas da dead-letter queue.
+
+        As tentativas são zeradas e `enqueued_at` passa a ser o momento do
+        reenvio.
 
-class RedisQueue:
+        Args:
+            limit: Número máximo de tarefas reenviadas
+
+        Returns:
+            int: Tarefas reenviadas
+        """
+        await self.connect()
+        return await self._replay(
+            keys=[DEAD_KEY, *self._route_keys()],
+            args=[limit, time.time(), *self._route_args()],
+        )
+
+
+class RedisQueue(_RetryMixin):
     """
     Cliente Redis assíncrono para gerenciamento de filas de tarefas.
-    
+
     Permite enfileirar e desenfileirar tarefas para processamento
     em background workers.
+
+    As tarefas são divididas em lanes: a interativa (`QUEUE_KEY`) recebe as
+    inscrições individuais e a bulk recebe importações em lote, com uma lista
+    por partição (faixa etária). `dequeue_batch` alterna entre as lanes por
+    round-robin ponderado (`ENROLLMENT_QUEUE_INTERACTIVE_WEIGHT` /
+    `ENROLLMENT_QUEUE_BULK_WEIGHT`) e entre as partições bulk uma a uma, então
+    uma importação grande não atrasa inscrições em tempo real nem as
+    importações de outras faixas etárias.
+
+    No modo confiável (`ENROLLMENT_QUEUE_RELIABLE=true`) cada tarefa é movida
+    atomicamente para uma lista de processamento do consumidor e só é
+    removida após `ack`. Listas de consumidores sem heartbeat são devolvidas
+    às lanes de origem por `requeue_orphans`.
     """
-    
-    def __init__(self, url: Optional[str] = None):
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        reliable: bool = RELIABLE_QUEUE,
+        consumer: Optional[str] = None,
+        interactive_weight: int = INTERACTIVE_WEIGHT,
+        bulk_weight: int = BULK_WEIGHT,
+    ):
         self.url = url or os.getenv("REDIS_URL", DEFAULT_REDIS_URL)
+        self.reliable = reliable
+        self.consumer = consumer or os.getenv(
+            "ENROLLMENT_WORKER_ID", f"{socket.gethostname()}:{os.getpid()}"
+        )
+        self.interactive_weight = max(1, interactive_weight)
+        self.bulk_weight = max(1, bulk_weight)
         self._client: Optional[redis.Redis] = None
+        self._push_bulk = None
+        self._weighted_pop = None
+        self._nack = None
+        self._requeue = None
+        self._promote = None
+        self._replay = None
 
-    async def connect(self):
-        """Estabelece conexão com o Redis se ainda não conectado."""
+    @property
+    def processing_key(self) -> str:
+        """Lista de processamento deste consumidor."""
+        return f"{QUEUE_KEY}:processing:{self.consumer}"
+
+    @staticmethod
+    def _heartbeat_key(consumer: str) -> str:
+        return f"{QUEUE_KEY}:heartbeat:{consumer}"
+
+    @property
+    def _consumers_key(self) -> str:
+        return f"{QUEUE_KEY}:consumers"
+
+    @staticmethod
+    def partition_key(partition: str) -> str:
+        """Lista da lane bulk para a partição."""
+        return f"{BULK_PARTITION_PREFIX}{partition}"
+
+    def _ensure_client(self) -> redis.Redis:
+        """Obtém o cliente do pool compartilhado e registra os scripts Lua."""
         if self._client is None:
-            self._client = redis.from_url(self.url, decode_responses=True)
+            self._client = get_redis(self.url)
+            self._push_bulk = self._client.register_script(PUSH_BULK_SCRIPT)
+            self._weighted_pop = self._client.register_script(WEIGHTED_POP_SCRIPT)
+            self._nack = self._client.register_script(NACK_SCRIPT)
+            self._requeue = self._client.register_script(REQUEUE_SCRIPT)
+            self._promote = self._client.register_script(LIST_PUSH_LUA + PROMOTE_LUA)
+            self._replay = self._client.register_script(LIST_PUSH_LUA + REPLAY_LUA)
+        return self._client
 
-    async def enqueue(self, payload: dict[str, Any]):
+    async def connect(self):
+        """Prepara o cliente Redis (as conexões são abertas sob demanda pelo pool)."""
+        self._ensure_client()
+
+    def pipeline(self, transaction: bool = False) -> Pipeline:
+        """
+        Cria um pipeline para enviar vários comandos em um único round trip.
+
+        Uso:
+            async with redis_queue.pipeline() as pipe:
+                pipe.llen(QUEUE_KEY)
+                pipe.llen(redis_queue.processing_key)
+                queued, processing = await pipe.execute()
+
+        Args:
+            transaction: Envolve os comandos em MULTI/EXEC
+        """
+        return self._ensure_client().pipeline(transaction=transaction)
+
+    async def close(self):
+        """Libera o cliente e fecha o pool compartilhado (shutdown do processo)."""
+        self._client = None
+        self._push_bulk = None
+        self._weighted_pop = None
+        self._nack = None
+        self._requeue = None
+        self._promote = None
+        self._replay = None
+        await close_redis()
+
+    def _route_keys(self) -> list[str]:
+        return [QUEUE_KEY, BULK_RING_KEY, BULK_PARTITIONS_KEY]
+
+    def _route_args(self) -> list[Any]:
+        return [BULK_PARTITION_PREFIX]
+
+    def _release(self, pipe: Pipeline, jobs: list[dict[str, Any]]):
+        for job in jobs:
+            if isinstance(job, dict) and RECEIPT_FIELD in job:
+                pipe.lrem(self.processing_key, 1, job[RECEIPT_FIELD])
+
+    async def _push(self, pipe: Pipeline, lane: str, partition: Optional[str], items: list[str]):
+        """Adiciona ao pipeline o push dos itens na lane (e partição) indicada."""
+        if lane == LANE_INTERACTIVE:
+            pipe.lpush(QUEUE_KEY, *items)
+            return
+        for start in range(0, len(items), PUSH_CHUNK):
+            await self._push_bulk(
+                keys=[self.partition_key(partition), BULK_RING_KEY, BULK_PARTITIONS_KEY],
+                args=[partition, *items[start:start + PUSH_CHUNK]],
+                client=pipe,
+            )
+
+    async def enqueue(
+        self,
+        payload: dict[str, Any],
+        lane: Optional[str] = None,
+        partition: Optional[Any] = None,
+    ):
         """
         Adiciona uma tarefa à fila.
-        
+
         Args:
             payload: Dados da tarefa a ser processada
+            lane: Lane de prioridade (padrão: a lane gravada na tarefa, ou a interativa)
+            partition: Chave de partição da lane bulk, ex: ID da faixa etária
         """
+        payload = with_lane(payload, lane, partition)
         await self.connect()
-        await self._client.lpush(QUEUE_KEY, json.dumps(payload))
+        with REDIS_ENQUEUE_DURATION.labels("enqueue").time():
+            async with self._client.pipeline(transaction=False) as pipe:
+                await self._push(pipe, *lane_of(payload), [_serialize(payload)])
+                await pipe.execute()
+
+    async def enqueue_many(
+        self,
+        payloads: list[dict[str, Any]],
+        lane: Optional[str] = None,
+        partition: Optional[Any] = None,
+    ):
+        """
+        Adiciona várias tarefas à fila em um único round trip.
+
+        As tarefas são agrupadas por lane e partição: um LPUSH para a lane
+        interativa e uma chamada do script de push por partição bulk.
+
+        Args:
+            payloads: Lista de tarefas a serem processadas
+            lane: Lane de todas as tarefas (padrão: a lane gravada em cada tarefa)
+            partition: Partição bulk de todas as tarefas
+        """
+        if not payloads:
+            return
+        groups: dict[tuple[str, Optional[str]], list[str]] = {}
+        for payload in payloads:
+            payload = with_lane(payload, lane, partition)
+            groups.setdefault(lane_of(payload), []).append(_serialize(payload))
+        await self.connect()
+        with REDIS_ENQUEUE_DURATION.labels("enqueue_many").time():
+            async with self._client.pipeline(transaction=False) as pipe:
+                for (group_lane, group_partition), items in groups.items():
+                    await self._push(pipe, group_lane, group_partition, items)
+                await pipe.execute()
+
+    def _decode(self, items: list[str]) -> list[dict[str, Any]]:
+        """Converte itens crus em tarefas, guardando o item original como recibo."""
+        jobs: list[dict[str, Any]] = []
+        for raw in items:
+            job = json.loads(raw)
+            if self.reliable and isinstance(job, dict):
+                job[RECEIPT_FIELD] = raw
+            jobs.append(job)
+        return jobs
 
-    async def dequeue_batch(self, max_items: int) -> list[dict[str, Any]]:
+    async def _pop(self, max_items: int) -> list[str]:
+        """Remove até `max_items` itens das lanes em um único round trip."""
+        return await self._weighted_pop(
+            keys=[QUEUE_KEY, BULK_RING_KEY, BULK_PARTITIONS_KEY, self.processing_key],
+            args=[
+                max_items,
+                self.interactive_weight,
+                self.bulk_weight,
+                BULK_PARTITION_PREFIX,
+                "1" if self.reliable else "0",
+            ],
+        )
+
+    async def dequeue_batch(self, max_items: int, timeout: float = 0) -> list[dict[str, Any]]:
         """
         Remove múltiplas tarefas da fila para processamento em lote.
-        
+
+        Com as duas lanes ocupadas, cada lote tem ao menos
+        `interactive_weight / (interactive_weight + bulk_weight)` de tarefas
+        interativas. Com a fila vazia a espera bloqueante é feita na lane
+        interativa; tarefas bulk que chegarem durante a espera são retiradas
+        na chamada seguinte (em até `timeout` segundos).
+
         Args:
             max_items: Número máximo de itens a remover
-            
+            timeout: Segundos para aguardar bloqueado quando a fila estiver
+                vazia (0 retorna imediatamente)
+
         Returns:
             Lista de tarefas para processamento
         """
         await self.connect()
-        items: list[dict[str, Any]] = []
-        for _ in range(max_items):
-            data = await self._client.rpop(QUEUE_KEY)
-            if not data:
-                break
-            items.append(json.loads(data))
-        return items
+        items = await self._pop(max_items)
+        if items or timeout <= 0:
+            return self._decode(items)
+
+        if self.reliable:
+            first = await self._client.blmove(QUEUE_KEY, self.processing_key, timeout, "RIGHT", "LEFT")
+        else:
+            popped = await self._client.brpop(QUEUE_KEY, timeout=timeout)
+            first = popped[1] if popped else None
+        if first is None:
+            return []
+        items = [first]
+        if max_items > 1:
+            items.extend(await self._pop(max_items - 1))
+        return self._decode(items)
 
-    async def size(self) -> int:
+    async def ack(self, jobs: list[dict[str, Any]]):
+        """
+        Confirma tarefas processadas, removendo-as da lista de processamento.
+
+        Sem efeito fora do modo confiável.
+
+        Args:
+            jobs: Tarefas retornadas por `dequeue_batch`
+        """
+        if not any(isinstance(job, dict) and RECEIPT_FIELD in job for job in jobs):
+            return
+        await self.connect()
+        async with self._client.pipeline(transaction=False) as pipe:
+            self._release(pipe, jobs)
+            await pipe.execute()
+
+    async def nack(self, jobs: list[dict[str, Any]]):
+        """
+        Devolve tarefas não processadas para a ponta de consumo das suas lanes.
+
+        Args:
+            jobs: Tarefas retornadas por `dequeue_batch`
+        """
+        receipts = [job[RECEIPT_FIELD] for job in jobs if isinstance(job, dict) and RECEIPT_FIELD in job]
+        if not receipts:
+            return
+        await self.connect()
+        await self._nack(
+            keys=[self.processing_key, QUEUE_KEY, BULK_RING_KEY, BULK_PARTITIONS_KEY],
+            args=[BULK_PARTITION_PREFIX, *receipts],
+        )
+
+    async def heartbeat(self):
+        """Registra o consumidor e renova seu heartbeat (modo confiável)."""
+        if not self.reliable:
+            return
+        await self.connect()
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.sadd(self._consumers_key, self.consumer)
+            pipe.set(self._heartbeat_key(self.consumer), "1", ex=HEARTBEAT_TTL)
+            await pipe.execute()
+
+    async def requeue_orphans(self) -> int:
+        """
+        Devolve às lanes de origem as tarefas de consumidores cujo heartbeat expirou.
+
+        Returns:
+            Quantidade de tarefas devolvidas
+        """
+        if not self.reliable:
+            return 0
+        await self.connect()
+        requeued = 0
+        for consumer in await self._client.smembers(self._consumers_key):
+            if consumer == self.consumer:
+                continue
+            moved = await self._requeue(
+                keys=[
+                    f"{QUEUE_KEY}:processing:{consumer}",
+                    QUEUE_KEY,
+                    BULK_RING_KEY,
+                    BULK_PARTITIONS_KEY,
+                    self._heartbeat_key(consumer),
+                    self._consumers_key,
+                ],
+                args=[BULK_PARTITION_PREFIX, consumer],
+            )
+            requeued += max(0, moved)
+        return requeued
+
+    async def partition_sizes(self) -> dict[str, int]:
+        """
+        Retorna o número de itens de cada partição ativa da lane bulk.
+
+        Returns:
+            dict: Partição -> tarefas pendentes
+        """
+        await self.connect()
+        partitions = sorted(await self._client.smembers(BULK_PARTITIONS_KEY))
+        if not partitions:
+            return {}
+        async with self._client.pipeline(transaction=False) as pipe:
+            for partition in partitions:
+                pipe.llen(self.partition_key(partition))
+            sizes = await pipe.execute()
+        return dict(zip(partitions, sizes))
+
+    async def lane_sizes(self) -> dict[str, int]:
+        """
+        Retorna o número de itens em cada lane.
+
+        Returns:
+            dict: Lane -> tarefas pendentes
+        """
+        await self.connect()
+        interactive = await self._client.llen(QUEUE_KEY)
+        partitions = await self.partition_sizes()
+        return {LANE_INTERACTIVE: interactive, LANE_BULK: sum(partitions.values())}
+
+    async def size(self, lane: Optional[str] = None) -> int:
         """
         Retorna o número de itens na fila.
-        
+
+        Args:
+            lane: Lane a medir (padrão: todas)
+
         Returns:
             Quantidade de tarefas pendentes
         """
+        if lane is None:
+            return sum((await self.lane_sizes()).values())
+        _check_lane(lane)
+        if lane == LANE_INTERACTIVE:
+            await self.connect()
+            return await self._client.llen(QUEUE_KEY)
+        return sum((await self.partition_sizes()).values())
+
+
+class RedisStreamQueue(_RetryMixin):
+    """
+    Fila de tarefas baseada em Redis Streams com consumer groups.
+
+    Cada worker lê com XREADGROUP usando um nome de consumidor único, então
+    várias réplicas dividem as mensagens sem duplicação. Mensagens ficam na
+    lista de pendentes (PEL) do consumidor até o XACK; mensagens paradas há
+    mais de `ENROLLMENT_STREAM_CLAIM_IDLE_MS` são reassumidas com XAUTOCLAIM
+    pelo próprio `dequeue_batch`, que as entrega no mesmo lote.
+
+    Cada lane tem seu stream (`<stream>` e `<stream>:bulk`) e os lotes são
+    divididos entre eles pelos mesmos pesos do backend de listas. A partição
+    das tarefas bulk é preservada, mas não há round-robin entre partições.
+    """
+
+    reliable = True
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        stream: str = STREAM_KEY,
+        group: str = STREAM_GROUP,
+        consumer: Optional[str] = None,
+        claim_idle_ms: int = STREAM_CLAIM_IDLE_MS,
+        interactive_weight: int = INTERACTIVE_WEIGHT,
+        bulk_weight: int = BULK_WEIGHT,
+    ):
+        self.url = url or os.getenv("REDIS_URL", DEFAULT_REDIS_URL)
+        self.stream = stream
+        self.streams = {LANE_INTERACTIVE: stream, LANE_BULK: f"{stream}:bulk"}
+        self.group = group
+        self.consumer = consumer or os.getenv(
+            "ENROLLMENT_WORKER_ID", f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        )
+        self.claim_idle_ms = claim_idle_ms
+        self.interactive_weight = max(1, interactive_weight)
+        self.bulk_weight = max(1, bulk_weight)
+        self._client: Optional[redis.Redis] = None
+        self._promote = None
+        self._replay = None
+        self._group_ready = False
+        self._claim_due = False
+
+    def _ensure_client(self) -> redis.Redis:
+        """Obtém o cliente do pool compartilhado e registra os scripts Lua."""
+        if self._client is None:
+            self._client = get_redis(self.url)
+            self._promote = self._client.register_script(STREAM_PUSH_LUA + PROMOTE_LUA)
+            self._replay = self._client.register_script(STREAM_PUSH_LUA + REPLAY_LUA)
+        return self._client
+
+    async def connect(self):
+        """Prepara o cliente Redis (as conexões são abertas sob demanda pelo pool)."""
+        self._ensure_client()
+
+    def pipeline(self, transaction: bool = False) -> Pipeline:
+        """
+        Cria um pipeline para enviar vários comandos em um único round trip.
+
+        Args:
+            transaction: Envolve os comandos em MULTI/EXEC
+        """
+        return self._ensure_client().pipeline(transaction=transaction)
+
+    async def close(self):
+        """Libera o cliente e fecha o pool compartilhado (shutdown do processo)."""
+        self._client = None
+        self._promote = None
+        self._replay = None
+        self._group_ready = False
+        await close_redis()
+
+    async def _ensure_group(self):
+        """Cria os streams das lanes e o consumer group se ainda não existirem."""
         await self.connect()
-        return await self._client.llen(QUEUE_KEY)
+        if self._group_ready:
+            return
+        for stream in self.streams.values():
+            try:
+                await self._client.xgroup_create(stream, self.group, id="0", mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+        self._group_ready = True
+
+    def _stream_for(self, payload: dict[str, Any]) -> str:
+        return self.streams[lane_of(payload)[0]]
+
+    async def enqueue(
+        self,
+        payload: dict[str, Any],
+        lane: Optional[str] = None,
+        partition: Optional[Any] = None,
+    ):
+        """
+        Adiciona uma tarefa ao stream da sua lane.
+
+        Args:
+            payload: Dados da tarefa a ser processada
+            lane: Lane de prioridade (padrão: a lane gravada na tarefa, ou a interativa)
+            partition: Chave de partição da lane bulk, ex: ID da faixa etária
+        """
+        payload = with_lane(payload, lane, partition)
+        await self.connect()
+        with REDIS_ENQUEUE_DURATION.labels("enqueue").time():
+            await self._client.xadd(self._stream_for(payload), {"data": _serialize(payload)})
+
+    async def enqueue_many(
+        self,
+        payloads: list[dict[str, Any]],
+        lane: Optional[str] = None,
+        partition: Optional[Any] = None,
+    ):
+        """
+        Adiciona várias tarefas aos streams em um único pipeline.
+
+        Args:
+            payloads: Lista de tarefas a serem processadas
+            lane: Lane de todas as tarefas (padrão: a lane gravada em cada tarefa)
+            partition: Partição bulk de todas as tarefas
+        """
+        if not payloads:
+            return
+        await self.connect()
+        with REDIS_ENQUEUE_DURATION.labels("enqueue_many").time():
+            async with self._client.pipeline(transaction=False) as pipe:
+                for payload in payloads:
+                    payload = with_lane(payload, lane, partition)
+                    pipe.xadd(self._stream_for(payload), {"data": _serialize(payload)})
+                await pipe.execute()
+
+    @staticmethod
+    def _decode(entries: list[tuple[str, dict[str, str]]]) -> list[dict[str, Any]]:
+        """Converte entradas do stream em tarefas com o ID da mensagem como recibo."""
+        jobs: list[dict[str, Any]] = []
+        for message_id, fields in entries:
+            if not fields or "data" not in fields:
+                continue
+            job = json.loads(fields["data"])
+            if isinstance(job, dict):
+                job[RECEIPT_FIELD] = message_id
+            jobs.append(job)
+        return jobs
+
+    def _decode_response(self, response: list) -> list[dict[str, Any]]:
+        """Junta as entradas de uma resposta XREADGROUP com um ou mais streams."""
+        return [job for _, entries in response or [] for job in self._decode(entries)]
+
+    def interactive_share(self, max_items: int) -> int:
+        """Vagas do lote reservadas à lane interativa quando as duas têm tarefas."""
+        share = max_items * self.interactive_weight // (self.interactive_weight + self.bulk_weight)
+        return min(max_items, max(1, share))
+
+    async def _read_lanes(self, max_items: int) -> list[dict[str, Any]]:
+        """Lê das duas lanes sem bloquear, completando o lote com a lane que tiver sobra."""
+        interactive, bulk = self.streams[LANE_INTERACTIVE], self.streams[LANE_BULK]
+        share = self.interactive_share(max_items)
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.xreadgroup(self.group, self.consumer, {interactive: ">"}, count=share)
+            if max_items > share:
+                pipe.xreadgroup(self.group, self.consumer, {bulk: ">"}, count=max_items - share)
+            responses = await pipe.execute()
+        interactive_jobs = self._decode_response(responses[0])
+        bulk_jobs = self._decode_response(responses[1]) if len(responses) > 1 else []
+        missing = max_items - len(interactive_jobs) - len(bulk_jobs)
+        if missing > 0 and len(interactive_jobs) == share:
+            response = await self._client.xreadgroup(self.group, self.consumer, {interactive: ">"}, count=missing)
+            interactive_jobs.extend(self._decode_response(response))
+        elif missing > 0 and len(bulk_jobs) == max_items - share:
+            response = await self._client.xreadgroup(self.group, self.consumer, {bulk: ">"}, count=missing)
+            bulk_jobs.extend(self._decode_response(response))
+        return interactive_jobs + bulk_jobs
+
+    async def dequeue_batch(self, max_items: int, timeout: float = 0) -> list[dict[str, Any]]:
+        """
+        Lê novas mensagens para este consumidor, entregando antes as reassumidas.
+
+        Depois de `requeue_orphans` a chamada começa com XAUTOCLAIM das
+        mensagens paradas em outros consumidores, que são devolvidas direto
+        no lote; enquanto o XAUTOCLAIM encher o lote, as chamadas seguintes
+        continuam reassumindo.
+
+        Args:
+            max_items: Número máximo de mensagens
+            timeout: Segundos para aguardar bloqueado (0 retorna imediatamente)
+
+        Returns:
+            Lista de tarefas para processamento
+        """
+        await self._ensure_group()
+        jobs: list[dict[str, Any]] = []
+        if self._claim_due:
+            jobs = await self._claim(max_items)
+            self._claim_due = len(jobs) >= max_items
+        if len(jobs) < max_items:
+            jobs.extend(await self._read_lanes(max_items - len(jobs)))
+        if jobs or timeout <= 0:
+            return jobs
+
+        # Aguarda a primeira mensagem de qualquer lane e completa o lote sem bloquear.
+        response = await self._client.xreadgroup(
+            self.group,
+            self.consumer,
+            {stream: ">" for stream in self.streams.values()},
+            count=1,
+            block=int(timeout * 1000),
+        )
+        jobs = self._decode_response(response)
+        if jobs and max_items > len(jobs):
+            jobs.extend(await self._read_lanes(max_items - len(jobs)))
+        return jobs
+
+    def _route_keys(self) -> list[str]:
+        return [self.streams[LANE_INTERACTIVE], self.streams[LANE_BULK]]
+
+    def _release(self, pipe: Pipeline, jobs: list[dict[str, Any]]):
+        for stream, ids in self._ids_by_stream(jobs).items():
+            pipe.xack(stream, self.group, *ids)
+            pipe.xdel(stream, *ids)
+
+    def _ids_by_stream(self, jobs: list[dict[str, Any]]) -> dict[str, list[str]]:
+        ids: dict[str, list[str]] = {}
+        for job in jobs:
+            if isinstance(job, dict) and RECEIPT_FIELD in job:
+                ids.setdefault(self._stream_for(job), []).append(job[RECEIPT_FIELD])
+        return ids
+
+    async def ack(self, jobs: list[dict[str, Any]]):
+        """
+        Confirma (XACK) e remove dos streams as mensagens processadas.
+
+        Args:
+            jobs: Tarefas retornadas por `dequeue_batch`
+        """
+        if not self._ids_by_stream(jobs):
+            return
+        await self.connect()
+        async with self._client.pipeline(transaction=False) as pipe:
+            self._release(pipe, jobs)
+            await pipe.execute()
+
+    async def nack(self, jobs: list[dict[str, Any]]):
+        """
+        Republica as tarefas nos streams das suas lanes e confirma as mensagens originais.
+
+        Args:
+            jobs: Tarefas retornadas por `dequeue_batch`
+        """
+        pending = [job for job in jobs if isinstance(job, dict) and RECEIPT_FIELD in job]
+        if not pending:
+            return
+        await self.connect()
+        async with self._client.pipeline(transaction=True) as pipe:
+            for job in pending:
+                payload = {key: value for key, value in job.items() if key != RECEIPT_FIELD}
+                pipe.xadd(self._stream_for(job), {"data": json.dumps(payload)})
+            self._release(pipe, pending)
+            await pipe.execute()
+
+    async def heartbeat(self):
+        """Sem efeito: o tempo ocioso na PEL já indica consumidores mortos."""
+        return None
+
+    async def requeue_orphans(self) -> int:
+        """
+        Agenda a retomada das mensagens paradas em outros consumidores.
+
+        O XAUTOCLAIM acontece no próximo `dequeue_batch`, que entrega as
+        mensagens reassumidas no próprio lote (começando pela lane
+        interativa); assim nenhuma mensagem fica reassumida só na memória do
+        processo. Também remove do group os consumidores ociosos.
+
+        Returns:
+            Sempre 0: as mensagens são contadas ao serem entregues
+        """
+        await self._ensure_group()
+        for stream in self.streams.values():
+            await self._remove_idle_consumers(stream)
+        self._claim_due = True
+        return 0
+
+    async def _claim(self, max_items: int) -> list[dict[str, Any]]:
+        """Reassume com XAUTOCLAIM até `max_items` mensagens paradas, lane interativa primeiro."""
+        jobs: list[dict[str, Any]] = []
+        for stream in self.streams.values():
+            if len(jobs) >= max_items:
+                break
+            response = await self._client.xautoclaim(
+                stream, self.group, self.consumer, self.claim_idle_ms, start_id="0-0", count=max_items - len(jobs)
+            )
+            jobs.extend(self._decode(response[1]))
+        return jobs
+
+    async def _remove_idle_consumers(self, stream: str):
+        """Remove do group consumidores sem pendências e ociosos há muito tempo."""
+        for info in await self._client.xinfo_consumers(stream, self.group):
+            if info["name"] == self.consumer or info["pending"]:
+                continue
+            if info["idle"] > self.claim_idle_ms * 10:
+                await self._client.xgroup_delconsumer(stream, self.group, info["name"])
+
+    async def lane_sizes(self) -> dict[str, int]:
+        """
+        Retorna o número de mensagens ainda não confirmadas em cada lane.
+
+        Returns:
+            dict: Lane -> tarefas pendentes
+        """
+        await self.connect()
+        async with self._client.pipeline(transaction=False) as pipe:
+            for stream in self.streams.values():
+                pipe.xlen(stream)
+            sizes = await pipe.execute()
+        return dict(zip(self.streams, sizes))
+
+    async def size(self, lane: Optional[str] = None) -> int:
+        """
+        Retorna o número de mensagens ainda não confirmadas nos streams.
+
+        Args:
+            lane: Lane a medir (padrão: todas)
+
+        Returns:
+            Quantidade de tarefas pendentes
+        """
+        if lane is None:
+            return sum((await self.lane_sizes()).values())
+        _check_lane(lane)
+        await self.connect()
+        return await self._client.xlen(self.streams[lane])
+
+
+def create_queue() -> Union[RedisQueue, RedisStreamQueue]:
+    """
+    Cria o backend de fila configurado em `ENROLLMENT_QUEUE_BACKEND`.
+
+    Returns:
+        RedisQueue para "list" (padrão) ou RedisStreamQueue para "stream"
+    """
+    if QUEUE_BACKEND == "stream":
+        return RedisStreamQueue()
+    if QUEUE_BACKEND != "list":
+        raise ValueError(f"ENROLLMENT_QUEUE_BACKEND inválido: {QUEUE_BACKEND}")
+    return RedisQueue()
 
 
-redis_queue = RedisQueue()
+redis_queue = create_queue()
@@ -0,0 +1,105 @@
+import os
+from typing import Any, Optional
+
+import redis.asyncio as redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError
+
+DEFAULT_REDIS_URL = "redis://localhost:6379/0"
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+# Tempo máximo esperando uma conexão livre do pool antes de falhar.
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "2"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "2"))
+# Deve ser maior que o bloqueio das leituras do worker (ENROLLMENT_WORKER_IDLE_BACKOFF).
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "10"))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+REDIS_RETRIES = int(os.getenv("REDIS_RETRIES", "3"))
+REDIS_RETRY_BACKOFF_BASE = float(os.getenv("REDIS_RETRY_BACKOFF_BASE", "0.05"))
+REDIS_RETRY_BACKOFF_CAP = float(os.getenv("REDIS_RETRY_BACKOFF_CAP", "1"))
+
+_clients: dict[str, redis.Redis] = {}
+
+
+def redis_url() -> str:
+    """URL do Redis configurada em `REDIS_URL`."""
+    return os.getenv("REDIS_URL", DEFAULT_REDIS_URL)
+
+
+def create_redis_client(url: Optional[str] = None, **overrides: Any) -> redis.Redis:
+    """
+    Cria um cliente Redis com pool limitado, keepalive e retry com backoff.
+
+    Apenas `ConnectionError` é repetido (ex: conexão do pool que caiu, detectada
+    pelo health check antes do envio); timeouts sobem para o chamador, pois
+    o servidor pode já ter executado o comando.
+
+    O `BlockingConnectionPool` faz requisições em rajada aguardarem até
+    `REDIS_POOL_TIMEOUT` por uma conexão livre, em vez de abrir sockets
+    novos sem limite ou falhar com "Too many connections".
+
+    Args:
+        url: URL do Redis (padrão: `REDIS_URL`)
+        **overrides: Parâmetros de conexão a substituir (ex: `socket_timeout=None`
+            para conexões pub/sub que ficam ociosas)
+
+    Returns:
+        redis.Redis: Cliente com pool próprio
+    """
+    options: dict[str, Any] = {
+        "max_connections": REDIS_MAX_CONNECTIONS,
+        "timeout": REDIS_POOL_TIMEOUT,
+        "decode_responses": True,
+        "socket_connect_timeout": REDIS_CONNECT_TIMEOUT,
+        "socket_timeout": REDIS_SOCKET_TIMEOUT,
+        "socket_keepalive": True,
+        "health_check_interval": REDIS_HEALTH_CHECK_INTERVAL,
+        # Só erros de conexão são repetidos: após um timeout o comando pode já
+        # ter rodado no servidor, e repetir LPUSH/RPOP/scripts da fila
+        # duplicaria ou perderia tarefas.
+        "retry": Retry(
+            ExponentialBackoff(cap=REDIS_RETRY_BACKOFF_CAP, base=REDIS_RETRY_BACKOFF_BASE),
+            REDIS_RETRIES,
+            supported_errors=(ConnectionError,),
+        ),
+        "retry_on_error": [ConnectionError],
+        "retry_on_timeout": False,
+    }
+    options.update(overrides)
+    pool = redis.BlockingConnectionPool.from_url(url or redis_url(), **options)
+    return redis.Redis(connection_pool=pool)
+
+
+def get_redis(url: Optional[str] = None) -> redis.Redis:
+    """
+    Retorna o cliente compartilhado do processo para a URL.
+
+    Fila, cache de faixas etárias e idempotência usam o mesmo pool.
+
+    Args:
+        url: URL do Redis (padrão: `REDIS_URL`)
+
+    Returns:
+        redis.Redis: Cliente compartilhado
+    """
+    url = url or redis_url()
+    client = _clients.get(url)
+    if client is None:
+        client = _clients[url] = create_redis_client(url)
+    return client
+
+
+async def close_redis() -> None:
+    """Fecha os clientes compartilhados e desconecta seus pools."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose(close_connection_pool=True)
+
+
+async def ping_redis(url: Optional[str] = None) -> bool:
+    """Verifica se o Redis responde, usando o pool compartilhado."""
+    try:
+        return bool(await get_redis(url).ping())
+    except Exception:
+        return False
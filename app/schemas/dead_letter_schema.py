@@ -0,0 +1,17 @@
+from typing import Any, Dict, List
+from pydantic import BaseModel, Field
+
+
+class DeadLetterPage(BaseModel):
+    """Schema de resposta de GET /admin/dlq."""
+    total: int = Field(..., description="Tarefas na dead-letter queue")
+    delayed: int = Field(..., description="Tarefas aguardando nova tentativa")
+    items: List[Dict[str, Any]] = Field(
+        ..., description="Tarefas com `attempts`, `last_error` e `failed_at`, das mais recentes para as mais antigas"
+    )
+
+
+class DeadLetterReplayResponse(BaseModel):
+    """Schema de resposta de POST /admin/dlq/replay."""
+    replayed: int
+    remaining: int
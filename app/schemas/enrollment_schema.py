@@ -1,6 +1,9 @@
-from typing import Optional
+from datetime import datetime
+from enum import Enum
+from typing import Dict, List, Optional
 from uuid import UUID
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+from typing_extensions import TypedDict
 from app.models.enrollment import EnrollmentStatus
 
 
@@ -23,8 +26,110 @@ class EnrollmentRead(EnrollmentBase):
     id: UUID
     age_group_id: UUID
     status: EnrollmentStatus
+    created_at: datetime
 
 
 class EnrollmentUpdateStatus(BaseModel):
     """Schema para atualização do status de inscrições."""
-    status: EnrollmentStatus = Field(..., description="Novo status da inscrição")
\ No newline at end of file
+    status: EnrollmentStatus = Field(..., description="Novo status da inscrição")
+
+
+class EnrollmentSort(str, Enum):
+    """Ordenações de GET /enrollments/ (prefixo '-' para decrescente), sempre desempatadas por ID."""
+    id = "id"
+    created_at = "created_at"
+    created_at_desc = "-created_at"
+    age = "age"
+    age_desc = "-age"
+
+    @property
+    def field(self) -> str:
+        return self.value.lstrip("-")
+
+    @property
+    def descending(self) -> bool:
+        return self.value.startswith("-")
+
+
+class EnrollmentFilters(BaseModel):
+    """Filtros de busca de GET /enrollments/; todos opcionais e combinados com AND."""
+    status: Optional[EnrollmentStatus] = None
+    age_group_id: Optional[UUID] = None
+    min_age: Optional[int] = Field(None, ge=0, le=120, description="Idade mínima inclusiva")
+    max_age: Optional[int] = Field(None, ge=0, le=120, description="Idade máxima inclusiva")
+    name_prefix: Optional[str] = Field(None, min_length=1, max_length=100, description="Início do nome (sem diferenciar maiúsculas)")
+    email_prefix: Optional[str] = Field(None, min_length=1, max_length=100, description="Início do email (sem diferenciar maiúsculas)")
+    created_after: Optional[datetime] = Field(None, description="Criadas a partir deste momento (inclusivo)")
+    created_before: Optional[datetime] = Field(None, description="Criadas antes deste momento (exclusivo)")
+
+
+class EnrollmentStatusFilter(BaseModel):
+    """Critérios de seleção das inscrições em PATCH /enrollments/status."""
+    age_group_id: Optional[UUID] = Field(None, description="ID da faixa etária")
+    status: Optional[EnrollmentStatus] = Field(None, description="Status atual")
+    min_age: Optional[int] = Field(None, ge=0, le=120, description="Idade mínima inclusiva")
+    max_age: Optional[int] = Field(None, ge=0, le=120, description="Idade máxima inclusiva")
+
+
+class BulkStatusUpdate(BaseModel):
+    """Schema de PATCH /enrollments/status: lista de IDs ou filtro, nunca os dois."""
+    status: EnrollmentStatus = Field(..., description="Novo status das inscrições")
+    ids: Optional[List[UUID]] = Field(None, min_length=1, description="IDs das inscrições")
+    filter: Optional[EnrollmentStatusFilter] = Field(None, description="Critérios de seleção")
+
+    @model_validator(mode="after")
+    def _check_selection(self) -> "BulkStatusUpdate":
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Informe 'ids' ou 'filter'")
+        # Um filtro vazio alteraria todas as inscrições.
+        if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+            raise ValueError("'filter' deve ter ao menos um critério")
+        return self
+
+
+class BulkStatusUpdateResponse(BaseModel):
+    """Schema de resposta de PATCH /enrollments/status."""
+    updated: int = Field(..., description="Inscrições que mudaram de status")
+    by_previous_status: Dict[EnrollmentStatus, int] = Field(..., description="Inscrições alteradas por status anterior")
+    not_updated: Optional[List[UUID]] = Field(
+        None,
+        description="IDs pedidos que não mudaram (inexistentes, já no status ou em processamento)",
+    )
+
+
+class EnrollmentPage(BaseModel):
+    """Schema para uma página de inscrições com cursor para a próxima página."""
+    items: List[EnrollmentRead]
+    next_cursor: Optional[str] = Field(None, description="Cursor opaco da próxima página (None na última)")
+
+
+class EnrollmentRow(TypedDict):
+    """Inscrição como dicionário simples, usada na serialização rápida de listagens."""
+    name: str
+    email: str
+    age: int
+    id: UUID
+    age_group_id: UUID
+    status: EnrollmentStatus
+    created_at: datetime
+
+
+class EnrollmentRowPage(TypedDict):
+    """Página de `EnrollmentRow`, com o mesmo formato JSON de `EnrollmentPage`."""
+    items: List[EnrollmentRow]
+    next_cursor: Optional[str]
+
+
+class BulkEnrollmentItemResult(BaseModel):
+    """Resultado individual de um item em POST /enrollments/bulk."""
+    index: int = Field(..., description="Posição do item na requisição")
+    success: bool
+    id: Optional[UUID] = Field(None, description="ID da inscrição criada")
+    error: Optional[str] = Field(None, description="Motivo da falha")
+
+
+class BulkEnrollmentResponse(BaseModel):
+    """Schema de resposta da criação em lote de inscrições."""
+    created: int
+    failed: int
+    results: List[BulkEnrollmentItemResult]
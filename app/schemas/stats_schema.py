@@ -0,0 +1,18 @@
+from typing import Dict, List
+from uuid import UUID
+from pydantic import BaseModel, Field
+from app.models.enrollment import EnrollmentStatus
+
+
+class AgeGroupEnrollmentStats(BaseModel):
+    """Contagem de inscrições de uma faixa etária por status."""
+    age_group_id: UUID
+    counts: Dict[EnrollmentStatus, int] = Field(..., description="Inscrições por status")
+    total: int
+
+
+class EnrollmentStatsResponse(BaseModel):
+    """Schema de resposta de GET /enrollments/stats."""
+    by_age_group: List[AgeGroupEnrollmentStats]
+    by_status: Dict[EnrollmentStatus, int]
+    total: int
@@ -1,9 +1,11 @@
 from typing import List
-from sqlmodel import select
+from uuid import uuid4
+from sqlalchemy import insert
 from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException, status
 
 from app.models.age_group import AgeGroup
+from app.cache.age_group_cache import age_group_cache
 from app.schemas.age_group_schema import AgeGroupCreate, AgeGroupRead
 
 
@@ -30,10 +32,12 @@ async def create_age_group(
             detail="min_age não pode ser maior que max_age",
         )
 
-    new_age_group = AgeGroup(**age_group_in.model_dump())
-    session.add(new_age_group)
+    result = await session.exec(
+        insert(AgeGroup).values(id=uuid4(), **age_group_in.model_dump()).returning(AgeGroup)
+    )
+    new_age_group = result.scalar_one()
     await session.commit()
-    await session.refresh(new_age_group)
+    await age_group_cache.invalidate(new_age_group.id)
     return AgeGroupRead.model_validate(new_age_group)
 
 
@@ -49,9 +53,7 @@ async def get_age_groups(
     Returns:
         List[AgeGroupRead]: Lista de todas as faixas etárias
     """
-    result = await session.exec(select(AgeGroup))
-    age_groups = result.all()
-    return [AgeGroupRead.model_validate(ag) for ag in age_groups]
+    return await age_group_cache.list_all(session)
 
 
 async def delete_age_group(
@@ -73,4 +75,5 @@ async def delete_age_group(
         return False
     await session.delete(age_group)
     await session.commit()
+    await age_group_cache.invalidate(age_group.id)
     return True
\ No newline at end of file
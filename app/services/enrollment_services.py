@@ -1,10 +1,35 @@
+from collections import Counter
+from typing import Any, Optional
+from uuid import UUID, uuid4
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException, status
 
-from app.models.enrollment import Enrollment
-from app.models.age_group import AgeGroup
-from app.schemas.enrollment_schema import EnrollmentCreate, EnrollmentRead
+from app.db.dialect import dialect_insert
+from app.models.enrollment import Enrollment, EnrollmentStatus
+from app.cache.age_group_cache import age_group_cache
+from app.queue.redis_backend import LANE_BULK, with_lane
+from app.services.outbox_services import add_to_outbox
+from app.services.stats_services import apply_stats_deltas, status_change_deltas
+from app.schemas.age_group_schema import AgeGroupRead
+from app.schemas.enrollment_schema import (
+    EnrollmentCreate,
+    EnrollmentRead,
+    BulkEnrollmentItemResult,
+    BulkStatusUpdate,
+    BulkStatusUpdateResponse,
+    EnrollmentFilters,
+    EnrollmentSort,
+)
+
+DUPLICATE_ENROLLMENT_DETAIL = "Email já inscrito nesta faixa etária"
+LIKE_ESCAPE = "\\"
+# Colunas devolvidas pelo RETURNING das escritas, no formato de EnrollmentRead.
+ENROLLMENT_RETURNING = tuple(getattr(Enrollment, name) for name in EnrollmentRead.model_fields)
 
 
 async def create_enrollment(
@@ -14,6 +39,8 @@ async def create_enrollment(
     """
     Cria uma nova inscrição validando a faixa etária e a idade do inscrito.
     
+    O job de processamento é gravado no outbox na mesma transação.
+    
     Args:
         enrollment_in: Dados da inscrição a ser criada
         session: Sessão do banco de dados
@@ -22,9 +49,10 @@ async def create_enrollment(
         EnrollmentRead: Inscrição criada com status pendente
         
     Raises:
-        HTTPException: Se a faixa etária não existir ou idade for inválida
+        HTTPException: Se a faixa etária não existir, a idade for inválida (400)
+            ou o email já estiver inscrito na faixa etária (409)
     """
-    age_group = await session.get(AgeGroup, enrollment_in.age_group_id)
+    age_group = await age_group_cache.get(session, enrollment_in.age_group_id)
     if not age_group:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -36,10 +64,24 @@ async def create_enrollment(
             detail=f"Idade deve estar entre {age_group.min_age} e {age_group.max_age}",
         )
 
-    new_enrollment = Enrollment(**enrollment_in.model_dump())
-    session.add(new_enrollment)
-    await session.commit()
-    await session.refresh(new_enrollment)
+    # INSERT ... RETURNING em vez de flush + refresh: a linha (com defaults do
+    # servidor) volta na mesma ida ao banco.
+    try:
+        result = await session.exec(
+            insert(Enrollment)
+            .values(id=uuid4(), status=EnrollmentStatus.pending, **enrollment_in.model_dump())
+            .returning(*ENROLLMENT_RETURNING)
+        )
+        new_enrollment = result.one()
+        await apply_stats_deltas(session, {(new_enrollment.age_group_id, new_enrollment.status): 1})
+        await add_to_outbox(session, [{"enrollment_id": str(new_enrollment.id)}])
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=DUPLICATE_ENROLLMENT_DETAIL,
+        )
     return EnrollmentRead.model_validate(new_enrollment)
 
 
@@ -60,4 +102,256 @@ async def get_enrollment(
     enrollment = await session.get(Enrollment, enrollment_id)
     if not enrollment:
         return None
-    return EnrollmentRead.model_validate(enrollment)
\ No newline at end of file
+    return EnrollmentRead.model_validate(enrollment)
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    """Resume os erros de validação do Pydantic em uma única linha."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'body'}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+async def create_enrollments_bulk(
+    items: list[Any],
+    session: AsyncSession,
+) -> list[BulkEnrollmentItemResult]:
+    """
+    Cria várias inscrições em uma única transação, validando cada item isoladamente.
+    
+    As faixas etárias ausentes do cache são carregadas com uma única consulta e as
+    inscrições válidas são gravadas com um único INSERT multi-linha com
+    RETURNING. Itens inválidos ou duplicados (mesmo email e faixa etária) são
+    reportados sem rejeitar o lote. Os jobs das inscrições gravadas vão para o
+    outbox na mesma transação, na lane bulk da fila particionada pela faixa
+    etária, para não atrasar as inscrições individuais.
+    
+    Args:
+        items: Itens brutos (dicts) recebidos na requisição
+        session: Sessão do banco de dados
+        
+    Returns:
+        list[BulkEnrollmentItemResult]: Resultado de cada item, na ordem recebida
+    """
+    results: list[BulkEnrollmentItemResult | None] = [None] * len(items)
+    valid: list[tuple[int, EnrollmentCreate]] = []
+    for index, raw in enumerate(items):
+        try:
+            valid.append((index, EnrollmentCreate.model_validate(raw)))
+        except ValidationError as e:
+            results[index] = BulkEnrollmentItemResult(
+                index=index, success=False, error=_format_validation_error(e)
+            )
+
+    age_groups: dict[UUID, AgeGroupRead] = await age_group_cache.get_many(
+        session, {enrollment_in.age_group_id for _, enrollment_in in valid}
+    )
+
+    rows: list[dict[str, Any]] = []
+    row_indexes: list[int] = []
+    for index, enrollment_in in valid:
+        age_group = age_groups.get(enrollment_in.age_group_id)
+        if not age_group:
+            error = "AgeGroup não encontrado"
+        elif not (age_group.min_age <= enrollment_in.age <= age_group.max_age):
+            error = f"Idade deve estar entre {age_group.min_age} e {age_group.max_age}"
+        else:
+            rows.append({
+                "id": uuid4(),
+                "status": EnrollmentStatus.pending,
+                **enrollment_in.model_dump(),
+            })
+            row_indexes.append(index)
+            continue
+        results[index] = BulkEnrollmentItemResult(index=index, success=False, error=error)
+
+    if rows:
+        stmt = (
+            dialect_insert(session, Enrollment)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["email", "age_group_id"])
+            .returning(Enrollment.id)
+        )
+        result = await session.exec(stmt)
+        inserted = set(result.scalars().all())
+        await apply_stats_deltas(session, Counter(
+            (row["age_group_id"], row["status"]) for row in rows if row["id"] in inserted
+        ))
+        await add_to_outbox(session, [
+            with_lane({"enrollment_id": str(row["id"])}, LANE_BULK, row["age_group_id"])
+            for row in rows
+            if row["id"] in inserted
+        ])
+        await session.commit()
+        for index, row in zip(row_indexes, rows):
+            if row["id"] in inserted:
+                results[index] = BulkEnrollmentItemResult(index=index, success=True, id=row["id"])
+            else:
+                results[index] = BulkEnrollmentItemResult(
+                    index=index, success=False, error=DUPLICATE_ENROLLMENT_DETAIL
+                )
+
+    return results
+
+
+async def update_status_in_bulk(
+    update_in: BulkStatusUpdate,
+    session: AsyncSession,
+    chunk_size: int,
+) -> BulkStatusUpdateResponse:
+    """
+    Muda o status das inscrições selecionadas por IDs ou filtro.
+    
+    Cada lote é um único `UPDATE ... WHERE id IN (SELECT ... LIMIT n FOR
+    UPDATE SKIP LOCKED) RETURNING` mais o upsert dos contadores, com commit
+    por lote para não segurar locks durante todo o conjunto. Os lotes são
+    feitos por status anterior, que assim é conhecido sem ler as linhas
+    antes, e avançam pelo ID (keyset). Inscrições travadas por outra
+    transação (ex: o worker) são puladas.
+    
+    Args:
+        update_in: Novo status e a seleção (IDs ou filtro)
+        session: Sessão do banco de dados
+        chunk_size: Inscrições alteradas por transação
+        
+    Returns:
+        BulkStatusUpdateResponse: Totais alterados por status anterior
+    """
+    new_status = update_in.status
+    criteria = []
+    previous_statuses = [s for s in EnrollmentStatus if s != new_status]
+    if update_in.ids is not None:
+        criteria.append(Enrollment.id.in_(update_in.ids))
+    else:
+        selection = update_in.filter
+        if selection.age_group_id is not None:
+            criteria.append(Enrollment.age_group_id == selection.age_group_id)
+        if selection.min_age is not None:
+            criteria.append(Enrollment.age >= selection.min_age)
+        if selection.max_age is not None:
+            criteria.append(Enrollment.age <= selection.max_age)
+        if selection.status is not None:
+            previous_statuses = [s for s in previous_statuses if s == selection.status]
+
+    by_previous_status = {s: 0 for s in EnrollmentStatus}
+    updated_ids: set[UUID] = set()
+    for previous_status in previous_statuses:
+        last_id = None
+        while True:
+            chunk = (
+                select(Enrollment.id)
+                .where(Enrollment.status == previous_status, *criteria)
+                .order_by(Enrollment.id)
+                .limit(chunk_size)
+                .with_for_update(skip_locked=True)
+            )
+            if last_id is not None:
+                chunk = chunk.where(Enrollment.id > last_id)
+            result = await session.exec(
+                update(Enrollment)
+                .where(Enrollment.id.in_(chunk.scalar_subquery()), Enrollment.status == previous_status)
+                .values(status=new_status)
+                .returning(Enrollment.id, Enrollment.age_group_id)
+                .execution_options(synchronize_session=False)
+            )
+            rows = result.all()
+            if rows:
+                await apply_stats_deltas(session, status_change_deltas(
+                    [(row.age_group_id, previous_status, new_status) for row in rows]
+                ))
+            await session.commit()
+            by_previous_status[previous_status] += len(rows)
+            if update_in.ids is not None:
+                updated_ids.update(row.id for row in rows)
+            if len(rows) < chunk_size:
+                break
+            last_id = max(row.id for row in rows)
+
+    return BulkStatusUpdateResponse(
+        updated=sum(by_previous_status.values()),
+        by_previous_status=by_previous_status,
+        not_updated=(
+            [enrollment_id for enrollment_id in update_in.ids if enrollment_id not in updated_ids]
+            if update_in.ids is not None
+            else None
+        ),
+    )
+
+
+def like_prefix(value: str) -> str:
+    """
+    Monta o padrão LIKE de busca por prefixo, escapando `%`, `_` e o escape.
+    
+    Args:
+        value: Texto digitado pelo cliente
+        
+    Returns:
+        str: Padrão para `like(..., escape=LIKE_ESCAPE)`
+    """
+    for char in (LIKE_ESCAPE, "%", "_"):
+        value = value.replace(char, LIKE_ESCAPE + char)
+    return value.lower() + "%"
+
+
+def filter_enrollments(stmt: Any, filters: EnrollmentFilters) -> Any:
+    """
+    Aplica os filtros de busca a uma consulta de inscrições.
+    
+    Cada filtro tem índice próprio (ver `app.models.enrollment`): status,
+    faixa etária, idade e `created_at` em B-tree com o ID, status e faixa
+    etária também compostos com as chaves de `sort`, e os prefixos em
+    `lower(coluna)` com `text_pattern_ops` no PostgreSQL. O padrão LIKE vai
+    pronto como parâmetro (e não concatenado no SQL) para o planner poder
+    usar o índice de prefixo.
+    
+    Args:
+        stmt: SELECT sobre `enrollments`
+        filters: Filtros informados pelo cliente
+        
+    Returns:
+        Select: Consulta com os filtros em AND
+    """
+    conditions = []
+    if filters.status is not None:
+        conditions.append(Enrollment.status == filters.status)
+    if filters.age_group_id is not None:
+        conditions.append(Enrollment.age_group_id == filters.age_group_id)
+    if filters.min_age is not None:
+        conditions.append(Enrollment.age >= filters.min_age)
+    if filters.max_age is not None:
+        conditions.append(Enrollment.age <= filters.max_age)
+    if filters.name_prefix:
+        conditions.append(func.lower(Enrollment.name).like(like_prefix(filters.name_prefix), escape=LIKE_ESCAPE))
+    if filters.email_prefix:
+        conditions.append(func.lower(Enrollment.email).like(like_prefix(filters.email_prefix), escape=LIKE_ESCAPE))
+    if filters.created_after is not None:
+        conditions.append(Enrollment.created_at >= filters.created_after)
+    if filters.created_before is not None:
+        conditions.append(Enrollment.created_at < filters.created_before)
+    return stmt.where(*conditions)
+
+
+def order_enrollments(stmt: Any, sort: EnrollmentSort, after: Optional[tuple[Any, UUID]] = None) -> Any:
+    """
+    Ordena pela chave `sort` desempatada pelo ID e aplica o cursor keyset.
+    
+    Args:
+        stmt: SELECT sobre `enrollments`
+        sort: Ordenação pedida
+        after: (valor da chave, ID) do último item da página anterior
+        
+    Returns:
+        Select: Consulta ordenada a partir do cursor
+    """
+    if sort is EnrollmentSort.id:
+        if after is not None:
+            stmt = stmt.where(Enrollment.id > after[1])
+        return stmt.order_by(Enrollment.id)
+    column = getattr(Enrollment, sort.field)
+    if after is not None:
+        current, last = tuple_(column, Enrollment.id), tuple_(*after)
+        stmt = stmt.where(current < last if sort.descending else current > last)
+    if sort.descending:
+        return stmt.order_by(column.desc(), Enrollment.id.desc())
+    return stmt.order_by(column, Enrollment.id)
@@ -0,0 +1,31 @@
+import time
+from datetime import datetime, UTC
+from typing import Any
+
+from sqlalchemy import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.outbox import OutboxMessage
+from app.queue.redis_backend import ENQUEUED_AT_FIELD
+
+
+async def add_to_outbox(session: AsyncSession, payloads: list[dict[str, Any]]) -> None:
+    """
+    Grava tarefas no outbox com um único INSERT, sem commit.
+    
+    Deve ser chamada na mesma transação da escrita que origina as tarefas.
+    O momento atual é registrado como `enqueued_at` para que a métrica de
+    latência ponta a ponta inclua o tempo de espera no outbox.
+    
+    Args:
+        session: Sessão com a transação em andamento
+        payloads: Tarefas a enfileirar, ex: {"enrollment_id": "..."}
+    """
+    if not payloads:
+        return
+    now = time.time()
+    created_at = datetime.now(UTC)
+    await session.exec(insert(OutboxMessage).values([
+        {"payload": {**payload, ENQUEUED_AT_FIELD: now}, "created_at": created_at}
+        for payload in payloads
+    ]))
@@ -0,0 +1,191 @@
+import random
+from collections import Counter, defaultdict
+from typing import Mapping
+from uuid import UUID
+
+from sqlalchemy import String, cast, func, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.db.dialect import dialect_insert
+from app.models.age_group import AgeGroup
+from app.models.enrollment import Enrollment, EnrollmentStatus
+from app.models.enrollment_stats import EnrollmentStats
+from app.schemas.stats_schema import AgeGroupEnrollmentStats, EnrollmentStatsResponse
+
+StatsKey = tuple[UUID, EnrollmentStatus]
+
+
+async def apply_stats_deltas(
+    session: AsyncSession,
+    deltas: Mapping[StatsKey, int],
+) -> None:
+    """
+    Soma variações aos contadores com um único upsert, sem commit.
+    
+    Deve ser chamada na mesma transação da escrita em `enrollments` para que
+    os contadores nunca divirjam do que foi efetivamente gravado.
+    
+    Cada chamada grava em uma shard sorteada, então escritas concorrentes no
+    mesmo contador (ex: "pending" de uma faixa etária popular) raramente
+    esperam pela mesma linha. As linhas seguem a ordem (age_group_id, status),
+    a mesma em todas as transações, para que os locks nunca se cruzem.
+    
+    Args:
+        session: Sessão com a transação em andamento
+        deltas: Variação por (age_group_id, status); zeros são ignorados
+    """
+    shard = random.randrange(_shards())
+    rows = sorted(
+        (
+            {"age_group_id": age_group_id, "status": status, "shard": shard, "total": delta}
+            for (age_group_id, status), delta in deltas.items()
+            if delta
+        ),
+        key=lambda row: (str(row["age_group_id"]), row["status"]),
+    )
+    if not rows:
+        return
+    stmt = dialect_insert(session, EnrollmentStats).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["age_group_id", "status", "shard"],
+        set_={"total": EnrollmentStats.total + stmt.excluded.total},
+    )
+    await session.exec(stmt)
+
+
+def _shards() -> int:
+    return max(1, settings.ENROLLMENT_STATS_SHARDS)
+
+
+def status_change_deltas(
+    changes: list[tuple[UUID, EnrollmentStatus, EnrollmentStatus]],
+) -> Counter[StatsKey]:
+    """
+    Converte mudanças de status em variações dos contadores.
+    
+    Args:
+        changes: Tuplas (age_group_id, status anterior, novo status)
+        
+    Returns:
+        Counter: Variação por (age_group_id, status)
+    """
+    deltas: Counter[StatsKey] = Counter()
+    for age_group_id, old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        deltas[(age_group_id, old_status)] -= 1
+        deltas[(age_group_id, new_status)] += 1
+    return deltas
+
+
+async def get_enrollment_stats(session: AsyncSession) -> EnrollmentStatsResponse:
+    """
+    Lê os contadores agregados (somando as shards), em tempo proporcional ao
+    número de faixas etárias.
+    
+    Args:
+        session: Sessão do banco de dados
+        
+    Returns:
+        EnrollmentStatsResponse: Contagens por faixa etária e por status
+    """
+    total = func.sum(EnrollmentStats.total)
+    result = await session.exec(
+        select(EnrollmentStats.age_group_id, EnrollmentStats.status, total)
+        .group_by(EnrollmentStats.age_group_id, EnrollmentStats.status)
+        .having(total != 0)
+    )
+    by_age_group: dict[UUID, dict[EnrollmentStatus, int]] = defaultdict(dict)
+    by_status: Counter[EnrollmentStatus] = Counter({status: 0 for status in EnrollmentStatus})
+    for age_group_id, status, count in result.all():
+        by_age_group[age_group_id][status] = count
+        by_status[status] += count
+    return EnrollmentStatsResponse(
+        by_age_group=[
+            AgeGroupEnrollmentStats(age_group_id=age_group_id, counts=counts, total=sum(counts.values()))
+            for age_group_id, counts in sorted(by_age_group.items(), key=lambda item: str(item[0]))
+        ],
+        by_status=dict(by_status),
+        total=sum(by_status.values()),
+    )
+
+
+async def reconcile_enrollment_stats(session: AsyncSession) -> int:
+    """
+    Corrige os contadores a partir das contagens reais em `enrollments`, uma
+    faixa etária por vez.
+    
+    Cada faixa é reconciliada em sua própria transação (ver
+    `_reconcile_age_group`), então só as escritas daquela faixa esperam, e
+    apenas pelo tempo de uma contagem pelo índice (age_group_id, status).
+    
+    Args:
+        session: Sessão do banco de dados (uma transação confirmada por faixa)
+        
+    Returns:
+        int: Número de contadores que estavam divergentes
+    """
+    age_group_ids = set((await session.exec(select(AgeGroup.id))).all())
+    age_group_ids.update((await session.exec(select(EnrollmentStats.age_group_id).distinct())).all())
+    await session.commit()
+    drift = 0
+    for age_group_id in sorted(age_group_ids, key=str):
+        drift += await _reconcile_age_group(session, age_group_id)
+    return drift
+
+
+async def _reconcile_age_group(session: AsyncSession, age_group_id: UUID) -> int:
+    """
+    Reconcilia os contadores de uma faixa etária e confirma a transação.
+    
+    Primeiro garante que todas as shards da faixa existam, para que nenhuma
+    escrita concorrente crie uma linha fora do lock; depois bloqueia as
+    linhas com SELECT ... FOR UPDATE, na mesma ordem usada por
+    `apply_stats_deltas`. Escritas que já gravaram em `enrollments` mas ainda
+    não nos contadores esperam o commit e aplicam seus deltas sobre o valor
+    corrigido. A diferença de cada contador divergente vai para a shard 0.
+    """
+    await session.exec(
+        dialect_insert(session, EnrollmentStats)
+        .values([
+            {"age_group_id": age_group_id, "status": status, "shard": shard, "total": 0}
+            for status in EnrollmentStatus
+            for shard in range(_shards())
+        ])
+        .on_conflict_do_nothing(index_elements=["age_group_id", "status", "shard"])
+    )
+    locked = await session.exec(
+        select(EnrollmentStats.status, EnrollmentStats.total)
+        .where(EnrollmentStats.age_group_id == age_group_id)
+        .order_by(cast(EnrollmentStats.status, String), EnrollmentStats.shard)
+        .with_for_update()
+    )
+    stored: Counter[EnrollmentStatus] = Counter()
+    for status, total in locked.all():
+        stored[status] += total
+    counted = await session.exec(
+        select(Enrollment.status, func.count())
+        .where(Enrollment.age_group_id == age_group_id)
+        .group_by(Enrollment.status)
+    )
+    actual: Counter[EnrollmentStatus] = Counter(dict(counted.all()))
+
+    drift = 0
+    for status in EnrollmentStatus:
+        diff = actual[status] - stored[status]
+        if not diff:
+            continue
+        drift += 1
+        await session.exec(
+            update(EnrollmentStats)
+            .where(
+                EnrollmentStats.age_group_id == age_group_id,
+                EnrollmentStats.status == status,
+                EnrollmentStats.shard == 0,
+            )
+            .values(total=EnrollmentStats.total + diff)
+        )
+    await session.commit()
+    return drift
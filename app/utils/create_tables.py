@@ -4,6 +4,8 @@ from app.db.session import engine
 from sqlmodel import SQLModel
 import app.models.age_group
 import app.models.enrollment
+import app.models.enrollment_stats
+import app.models.outbox
 
 
 async def init_db():
@@ -0,0 +1,214 @@
+"""
+Comprova o uso dos índices das consultas frequentes com EXPLAIN.
+
+Popula o banco configurado em DATABASE_URL com faixas etárias e inscrições
+sintéticas, executa `EXPLAIN (ANALYZE, BUFFERS)` (PostgreSQL) ou
+`EXPLAIN QUERY PLAN` (SQLite) nas consultas da API e do worker (filtros,
+ordenações e suas combinações) e verifica se cada plano usa o índice
+esperado. Os dados sintéticos são removidos ao final,
+a menos que `--keep` seja usado.
+
+Uso:
+    python -m app.utils.explain_indexes [--rows 100000] [--keep]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, insert, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import SQLModel
+
+from app.db.session import engine
+from app.models.age_group import AgeGroup
+from app.models.enrollment import Enrollment, EnrollmentStatus
+
+SEED_PREFIX = "explain-indexes"
+AGE_GROUPS = 50
+SEED_CHUNK = 5000
+# Inscrições criadas ao longo de um ano.
+CREATED_AT_SPREAD = 365 * 24 * 3600
+# Proporção típica: poucas inscrições aguardando o worker.
+STATUS_WEIGHTS = {
+    EnrollmentStatus.pending: 0.05,
+    EnrollmentStatus.approved: 0.75,
+    EnrollmentStatus.rejected: 0.20,
+}
+
+QUERIES = [
+    (
+        "Inscrições pendentes (worker / status_filter=pending)",
+        "SELECT id FROM enrollments WHERE status = 'pending' ORDER BY id LIMIT 100",
+        ("ix_enrollments_pending", "ix_enrollments_status_id"),
+    ),
+    (
+        "Listagem filtrada por status com cursor",
+        "SELECT * FROM enrollments WHERE status = 'approved' AND id > :after ORDER BY id LIMIT 100",
+        ("ix_enrollments_status_id",),
+    ),
+    (
+        "Inscrições de uma faixa etária",
+        "SELECT * FROM enrollments WHERE age_group_id = :age_group_id",
+        # Sem ordenação, qualquer índice começando por age_group_id serve.
+        (
+            "ix_enrollments_age_group_id_id",
+            "ix_enrollments_age_group_status",
+            "ix_enrollments_age_group_id_created_at_id",
+            "ix_enrollments_age_group_id_age_id",
+        ),
+    ),
+    (
+        "Deduplicação por email e faixa etária",
+        "SELECT id FROM enrollments WHERE email = :email AND age_group_id = :age_group_id",
+        ("uq_enrollments_email_age_group", "sqlite_autoindex_enrollments"),
+    ),
+    (
+        "Ordenação sort=created_at",
+        "SELECT * FROM enrollments ORDER BY created_at, id LIMIT 100",
+        ("ix_enrollments_created_at_id",),
+    ),
+    (
+        "Ordenação sort=-age",
+        "SELECT * FROM enrollments ORDER BY age DESC, id DESC LIMIT 100",
+        ("ix_enrollments_age_id",),
+    ),
+    (
+        "Filtro por status com sort=created_at e cursor",
+        "SELECT * FROM enrollments WHERE status = 'approved' AND (created_at, id) > (:created_at, :after) "
+        "ORDER BY created_at, id LIMIT 100",
+        ("ix_enrollments_status_created_at_id",),
+    ),
+    (
+        "Filtro por status com sort=-age",
+        "SELECT * FROM enrollments WHERE status = 'approved' ORDER BY age DESC, id DESC LIMIT 100",
+        ("ix_enrollments_status_age_id",),
+    ),
+    (
+        "Filtro por faixa etária com sort=-created_at",
+        "SELECT * FROM enrollments WHERE age_group_id = :age_group_id ORDER BY created_at DESC, id DESC LIMIT 100",
+        ("ix_enrollments_age_group_id_created_at_id",),
+    ),
+    (
+        "Filtro por faixa etária com sort=-age",
+        "SELECT * FROM enrollments WHERE age_group_id = :age_group_id ORDER BY age DESC, id DESC LIMIT 100",
+        ("ix_enrollments_age_group_id_age_id",),
+    ),
+]
+
+# O LIKE do SQLite não usa índices de expressão: só verificadas no PostgreSQL.
+POSTGRESQL_QUERIES = [
+    (
+        "Filtro name_prefix",
+        "SELECT * FROM enrollments WHERE lower(name) LIKE :name_prefix ESCAPE '\\' LIMIT 100",
+        ("ix_enrollments_name_prefix",),
+    ),
+    (
+        "Filtro email_prefix",
+        "SELECT * FROM enrollments WHERE lower(email) LIKE :email_prefix ESCAPE '\\' LIMIT 100",
+        ("ix_enrollments_email_prefix",),
+    ),
+]
+
+
+async def seed(conn: AsyncConnection, rows: int) -> dict:
+    """Insere os dados sintéticos e retorna parâmetros reais para as consultas."""
+    age_group_ids = [uuid4() for _ in range(AGE_GROUPS)]
+    await conn.execute(insert(AgeGroup), [
+        {"id": age_group_id, "name": f"{SEED_PREFIX}-{i}", "min_age": 0, "max_age": 120}
+        for i, age_group_id in enumerate(age_group_ids)
+    ])
+    statuses = list(STATUS_WEIGHTS)
+    now = datetime.now(timezone.utc)
+    weights = list(STATUS_WEIGHTS.values())
+    for start in range(0, rows, SEED_CHUNK):
+        await conn.execute(insert(Enrollment), [
+            {
+                "id": uuid4(),
+                "name": f"Pessoa {i}",
+                "email": f"{SEED_PREFIX}-{i}@example.com",
+                "age": random.randint(0, 120),
+                "age_group_id": age_group_ids[i % AGE_GROUPS],
+                "status": random.choices(statuses, weights)[0],
+                "created_at": now - timedelta(seconds=random.randint(0, CREATED_AT_SPREAD)),
+            }
+            for i in range(start, min(start + SEED_CHUNK, rows))
+        ])
+    if conn.dialect.name == "postgresql":
+        await conn.execute(text("ANALYZE enrollments"))
+        await conn.execute(text("ANALYZE age_groups"))
+    else:
+        await conn.execute(text("ANALYZE"))
+    return {
+        "after": "00000000-0000-0000-0000-000000000000",
+        "age_group_id": age_group_ids[0],
+        "email": f"{SEED_PREFIX}-0@example.com",
+        "created_at": now - timedelta(seconds=CREATED_AT_SPREAD // 2),
+        "name_prefix": "pessoa 4242%",
+        "email_prefix": f"{SEED_PREFIX}-4242@%",
+    }
+
+
+async def cleanup(conn: AsyncConnection) -> None:
+    """Remove os dados sintéticos."""
+    seeded_groups = AgeGroup.__table__.select().where(AgeGroup.name.like(f"{SEED_PREFIX}-%"))
+    group_ids = [row.id for row in await conn.execute(seeded_groups)]
+    await conn.execute(delete(Enrollment).where(Enrollment.age_group_id.in_(group_ids)))
+    await conn.execute(delete(AgeGroup).where(AgeGroup.id.in_(group_ids)))
+
+
+async def explain(conn: AsyncConnection, sql: str, params: dict) -> str:
+    """Executa o EXPLAIN adequado ao dialeto e retorna o plano como texto."""
+    if conn.dialect.name == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) "
+    else:
+        prefix = "EXPLAIN QUERY PLAN "
+        # O SQLite guarda UUIDs como hex sem hífens.
+        params = {key: value.hex if isinstance(value, UUID) else value for key, value in params.items()}
+    result = await conn.execute(text(prefix + sql), params)
+    return "\n".join(" ".join(str(col) for col in row) for row in result)
+
+
+async def run(rows: int, keep: bool) -> bool:
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        params = await seed(conn, rows)
+
+    all_ok = True
+    try:
+        async with engine.connect() as conn:
+            queries = QUERIES
+            if conn.dialect.name == "postgresql":
+                queries = QUERIES + POSTGRESQL_QUERIES
+            else:
+                print(f"(SQLite: {len(POSTGRESQL_QUERIES)} consultas de prefixo verificadas só no PostgreSQL)\n")
+            for title, sql, expected in queries:
+                plan = await explain(conn, sql, params)
+                used = next((index for index in expected if index in plan), None)
+                all_ok &= used is not None
+                print(f"== {title}")
+                print(sql)
+                print(plan)
+                print(f"-> índice: {used or 'NÃO USADO (esperado: ' + ', '.join(expected) + ')'}\n")
+    finally:
+        if not keep:
+            async with engine.begin() as conn:
+                await cleanup(conn)
+        await engine.dispose()
+    return all_ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="Inscrições sintéticas a inserir")
+    parser.add_argument("--keep", action="store_true", help="Mantém os dados sintéticos no banco")
+    args = parser.parse_args()
+    ok = asyncio.run(run(args.rows, args.keep))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+def make_etag(body: bytes) -> str:
+    """
+    Gera um ETag forte a partir do conteúdo serializado.
+
+    Args:
+        body: Corpo da resposta
+
+    Returns:
+        str: ETag entre aspas, pronto para o header
+    """
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Verifica se o `If-None-Match` da requisição corresponde ao ETag atual.
+
+    Usa a comparação fraca exigida para `If-None-Match` (RFC 9110 13.1.2).
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == current
+        for candidate in header.split(",")
+    )
+
+
+def conditional_response(
+    request: Request,
+    body: bytes,
+    cache_control: str,
+    etag: str | None = None,
+    media_type: str = "application/json",
+) -> Response:
+    """
+    Monta a resposta com ETag e Cache-Control, retornando 304 se o cliente já tiver a versão.
+
+    Args:
+        request: Requisição atual
+        body: Corpo JSON já serializado
+        cache_control: Valor do header Cache-Control
+        etag: ETag pré-calculado (gerado a partir do corpo se omitido)
+        media_type: Content-Type da resposta completa
+
+    Returns:
+        Response: 304 sem corpo ou 200 com o corpo
+    """
+    etag = etag or make_etag(body)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,187 @@
+import os
+import time
+from typing import Any
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por rota",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requisições HTTP em andamento",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Duração das instruções SQL por tipo",
+    ["statement"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Conexões do pool em uso",
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections",
+    "Conexões de overflow abertas (negativo indica vagas livres no pool)",
+    multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Espera por uma conexão livre do pool em cada checkout",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REDIS_ENQUEUE_DURATION = Histogram(
+    "redis_enqueue_duration_seconds",
+    "Latência do enfileiramento no Redis",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+WORKER_BATCH_SIZE = Histogram(
+    "enrollment_worker_batch_size",
+    "Tarefas por lote retirado da fila",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+WORKER_BATCH_DURATION = Histogram(
+    "enrollment_worker_batch_duration_seconds",
+    "Tempo de processamento de um lote (banco e ack)",
+)
+WORKER_JOBS = Counter(
+    "enrollment_worker_jobs_total",
+    "Tarefas tratadas pelo worker por resultado (use rate() para jobs/s)",
+    ["result"],
+)
+WORKER_QUEUE_DEPTH = Gauge(
+    "enrollment_queue_depth",
+    "Tarefas aguardando na fila",
+    multiprocess_mode="max",
+)
+WORKER_QUEUE_LANE_DEPTH = Gauge(
+    "enrollment_queue_lane_depth",
+    "Tarefas aguardando por lane de prioridade",
+    ["lane"],
+    multiprocess_mode="max",
+)
+WORKER_DEAD_LETTER_DEPTH = Gauge(
+    "enrollment_dead_letter_depth",
+    "Tarefas na dead-letter queue após esgotar as retentativas",
+    multiprocess_mode="max",
+)
+WORKER_END_TO_END_LAG = Histogram(
+    "enrollment_end_to_end_lag_seconds",
+    "Tempo entre o enfileiramento e o processamento da inscrição",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900),
+)
+OUTBOX_RELAYED = Counter(
+    "enrollment_outbox_relayed_total",
+    "Mensagens movidas do outbox para a fila Redis",
+)
+
+
+def statement_type(statement: str) -> str:
+    """Extrai o tipo da instrução SQL (SELECT, INSERT, ...) para uso como label."""
+    parts = statement.lstrip().split(None, 1)
+    return parts[0].upper() if parts else "UNKNOWN"
+
+
+def instrument_engine(db_engine: AsyncEngine) -> None:
+    """
+    Registra hooks do SQLAlchemy que medem a duração de cada instrução SQL.
+
+    Args:
+        db_engine: Engine a instrumentar (chamadas repetidas são ignoradas)
+    """
+    sync_engine = db_engine.sync_engine
+    if getattr(sync_engine, "_prometheus_instrumented", False):
+        return
+    sync_engine._prometheus_instrumented = True
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started_at = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started_at = getattr(context, "_query_started_at", None)
+        if started_at is not None:
+            DB_QUERY_DURATION.labels(statement_type(statement)).observe(time.perf_counter() - started_at)
+
+
+def update_pool_gauges(status: dict[str, Any]) -> None:
+    """Atualiza os gauges do pool a partir de `pool_status`."""
+    if "checkedout" in status:
+        DB_POOL_CHECKED_OUT.set(status["checkedout"])
+    if "overflow" in status:
+        DB_POOL_OVERFLOW.set(status["overflow"])
+
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    Retorna o registry a expor.
+
+    Com `PROMETHEUS_MULTIPROC_DIR` definido (vários processos uvicorn ou o
+    supervisor do worker) agrega as métricas de todos os processos.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Serializa as métricas no formato texto do Prometheus."""
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
+
+
+class PrometheusMiddleware:
+    """Middleware ASGI que mede latência por rota e requisições em andamento."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started_at = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            # Usa o template da rota (ex: /enrollments/{enrollment_id}) para
+            # manter a cardinalidade baixa; rotas inexistentes viram "unmatched".
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            HTTP_REQUEST_DURATION.labels(method, route_path, str(status_code)).observe(
+                time.perf_counter() - started_at
+            )
@@ -0,0 +1,48 @@
+import base64
+import json
+from typing import Any
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(values: dict[str, Any]) -> str:
+    """
+    Codifica a posição de uma página em um cursor opaco (base64 url-safe).
+
+    Args:
+        values: Valores da chave de ordenação do último item da página
+
+    Returns:
+        str: Cursor opaco para ser enviado ao cliente
+    """
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    """
+    Decodifica um cursor gerado por `encode_cursor`.
+
+    Args:
+        cursor: Cursor opaco recebido do cliente
+
+    Returns:
+        dict: Valores da chave de ordenação
+
+    Raises:
+        HTTPException: Se o cursor estiver malformado
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido",
+        )
+    if not isinstance(values, dict):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido",
+        )
+    return values
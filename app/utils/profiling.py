@@ -0,0 +1,300 @@
+"""
+Profiling por requisição (opt-in via `PROFILING_ENABLED`).
+
+Cada requisição acumula spans por fase em um `ContextVar`: resolução de
+dependências, autenticação, endpoint, serialização, cada instrução SQL
+(hooks do SQLAlchemy), commit da sessão e cada comando Redis. Requisições
+acima de `PROFILING_SLOW_MS` são registradas no `logger` com o detalhamento.
+Com `PROFILING_SAMPLE_RATE=N`, 1 em cada N requisições roda sob cProfile e,
+se for lenta, o perfil é gravado em `PROFILING_DIR` (abra com `snakeviz` ou
+`python -m pstats`).
+
+Nada disso é instalado com o profiling desligado: `span` apenas retorna um
+context manager vazio quando não há requisição sendo medida.
+"""
+
+import cProfile
+import itertools
+import os
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.logger import logger
+from app.utils.metrics import statement_type
+
+
+@dataclass
+class RequestProfile:
+    """Tempo acumulado e número de ocorrências de cada fase da requisição."""
+    totals: dict[str, float] = field(default_factory=dict)
+    counts: dict[str, int] = field(default_factory=dict)
+
+    def record(self, name: str, seconds: float) -> None:
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def breakdown(self) -> dict[str, dict[str, float]]:
+        """Fases em ordem decrescente de tempo, em milissegundos."""
+        return {
+            name: {"ms": round(seconds * 1000, 2), "count": self.counts[name]}
+            for name, seconds in sorted(self.totals.items(), key=lambda item: -item[1])
+        }
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("request_profile", default=None)
+
+
+class _Span:
+    __slots__ = ("profile", "name", "started_at")
+
+    def __init__(self, profile: RequestProfile, name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.profile.record(self.name, time.perf_counter() - self.started_at)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str) -> Any:
+    """
+    Mede um trecho de código como uma fase da requisição atual.
+
+    Uso:
+        with span("auth"):
+            ...
+
+    Args:
+        name: Nome da fase no detalhamento (repetições são somadas)
+    """
+    profile = _current.get()
+    return _NOOP_SPAN if profile is None else _Span(profile, name)
+
+
+def record(name: str, seconds: float) -> None:
+    """Soma `seconds` à fase `name` da requisição atual, se houver."""
+    profile = _current.get()
+    if profile is not None:
+        profile.record(name, seconds)
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI que mede as fases de cada requisição e amostra perfis.
+
+    O cProfile mede a thread inteira, então o perfil amostrado inclui outras
+    corrotinas que rodaram no mesmo loop durante a requisição; apenas uma
+    requisição é amostrada por vez.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        slow_ms: float,
+        sample_rate: int = 0,
+        profile_dir: str = "profiles",
+    ):
+        self.app = app
+        self.slow_seconds = slow_ms / 1000
+        self.sample_rate = max(0, sample_rate)
+        self.profile_dir = profile_dir
+        self._requests = itertools.count(1)
+        self._sampling = False
+
+    def _start_sampling(self) -> Optional[cProfile.Profile]:
+        if not self.sample_rate or self._sampling or next(self._requests) % self.sample_rate:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # outro profiler já ativo no processo
+            return None
+        self._sampling = True
+        return profiler
+
+    def _dump(self, profiler: cProfile.Profile, method: str, route_path: str, elapsed: float) -> str:
+        os.makedirs(self.profile_dir, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route_path).strip("_") or "root"
+        path = os.path.join(
+            self.profile_dir, f"{time.strftime('%Y%m%dT%H%M%S')}-{method}-{slug}-{elapsed * 1000:.0f}ms.prof"
+        )
+        profiler.dump_stats(path)
+        return path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        profiler = self._start_sampling()
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            if profiler is not None:
+                profiler.disable()
+                self._sampling = False
+            _current.reset(token)
+            if elapsed >= self.slow_seconds:
+                method = scope["method"]
+                route_path = getattr(scope.get("route"), "path", "unmatched")
+                profile_path = None
+                if profiler is not None:
+                    try:
+                        profile_path = self._dump(profiler, method, route_path, elapsed)
+                    except OSError as e:
+                        logger.error("Profile dump failed", error=str(e))
+                logger.warning(
+                    "Slow request",
+                    method=method,
+                    path=scope["path"],
+                    route=route_path,
+                    status=status_code,
+                    total_ms=round(elapsed * 1000, 2),
+                    spans=profile.breakdown(),
+                    profile=profile_path,
+                )
+
+
+def _instrument_sql(db_engine: AsyncEngine) -> None:
+    """Registra cada instrução SQL e cada commit de sessão como spans."""
+    sync_engine = db_engine.sync_engine
+    if getattr(sync_engine, "_profiling_instrumented", False):
+        return
+    sync_engine._profiling_instrumented = True
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._profile_started_at = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started_at = getattr(context, "_profile_started_at", None)
+        if started_at is not None:
+            record(f"sql.{statement_type(statement)}", time.perf_counter() - started_at)
+
+    if event.contains(Session, "before_commit", _before_commit):
+        return
+    event.listen(Session, "before_commit", _before_commit)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+
+
+def _before_commit(session: Session) -> None:
+    session.info["_profile_commit_started_at"] = time.perf_counter()
+
+
+def _after_commit(session: Session) -> None:
+    started_at = session.info.pop("_profile_commit_started_at", None)
+    if started_at is not None:
+        # Inclui o flush: os INSERT/UPDATE dele também aparecem em sql.*.
+        record("db.commit", time.perf_counter() - started_at)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop("_profile_commit_started_at", None)
+
+
+def _instrument_redis() -> None:
+    """Mede cada comando Redis (e cada pipeline) do cliente asyncio."""
+    from redis.asyncio.client import Pipeline, Redis
+
+    if getattr(Redis.execute_command, "_profiled", False):
+        return
+    execute_command = Redis.execute_command
+    execute_pipeline = Pipeline.execute
+
+    async def profiled_execute_command(self, *args: Any, **options: Any) -> Any:
+        with span(f"redis.{str(args[0]).upper()}" if args else "redis"):
+            return await execute_command(self, *args, **options)
+
+    async def profiled_execute_pipeline(self, raise_on_error: bool = True) -> Any:
+        with span("redis.pipeline"):
+            return await execute_pipeline(self, raise_on_error)
+
+    profiled_execute_command._profiled = True
+    Redis.execute_command = profiled_execute_command
+    Pipeline.execute = profiled_execute_pipeline
+
+
+def _instrument_fastapi() -> None:
+    """Mede a resolução de dependências, o endpoint e a serialização da resposta."""
+    from fastapi import routing
+
+    if getattr(routing.solve_dependencies, "_profiled", False):
+        return
+
+    def wrap(fn: Any, name: str) -> Any:
+        async def profiled(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return await fn(*args, **kwargs)
+        profiled._profiled = True
+        return profiled
+
+    routing.solve_dependencies = wrap(routing.solve_dependencies, "dependencies")
+    routing.run_endpoint_function = wrap(routing.run_endpoint_function, "endpoint")
+    routing.serialize_response = wrap(routing.serialize_response, "serialization")
+
+
+def install_profiling(
+    app: FastAPI,
+    db_engine: AsyncEngine,
+    slow_ms: float,
+    sample_rate: int = 0,
+    profile_dir: str = "profiles",
+) -> None:
+    """
+    Instala o middleware e os hooks de profiling.
+
+    Args:
+        app: Aplicação FastAPI
+        db_engine: Engine cujas instruções SQL serão medidas
+        slow_ms: Requisições a partir deste tempo são registradas no log
+        sample_rate: Amostra 1 em cada N requisições com cProfile (0 desliga)
+        profile_dir: Diretório dos perfis das requisições lentas amostradas
+    """
+    _instrument_sql(db_engine)
+    _instrument_redis()
+    _instrument_fastapi()
+    app.add_middleware(
+        ProfilingMiddleware,
+        slow_ms=slow_ms,
+        sample_rate=sample_rate,
+        profile_dir=profile_dir,
+    )
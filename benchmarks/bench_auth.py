@@ -0,0 +1,79 @@
+"""
+Microbenchmark do custo de autenticação por requisição.
+
+Compara a verificação completa do JWT (python-jose e, se instalado, PyJWT)
+com o caminho em cache de `get_current_user`, e o Basic Auth com e sem cache.
+
+Uso:
+    python -m benchmarks.bench_auth [--iterations 20000] [--output auth.json]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Awaitable, Callable
+
+from fastapi.security import HTTPBasicCredentials
+
+from app.api import deps
+from app.core import security
+from app.core.config import settings
+
+
+async def _measure(fn: Callable[[], Awaitable[object]], iterations: int) -> float:
+    """Retorna o custo médio de uma chamada em microssegundos."""
+    for _ in range(min(iterations, 1000)):
+        await fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    return round((time.perf_counter() - start) / iterations * 1e6, 2)
+
+
+async def run(iterations: int) -> dict[str, float]:
+    token = security.create_access_token({"sub": settings.API_USERNAME})
+    basic = HTTPBasicCredentials(username=settings.API_USERNAME, password=settings.API_PASSWORD)
+    results: dict[str, float] = {}
+
+    async def jwt_uncached():
+        security.token_cache.clear()
+        return await security.get_current_user(token)
+
+    original_backend = settings.JWT_BACKEND
+    settings.JWT_BACKEND = "jose"
+    results["jwt_jose_uncached_us"] = await _measure(jwt_uncached, iterations)
+    if security.pyjwt is not None:
+        settings.JWT_BACKEND = "pyjwt"
+        results["jwt_pyjwt_uncached_us"] = await _measure(jwt_uncached, iterations)
+    settings.JWT_BACKEND = original_backend
+
+    security.token_cache.clear()
+    results["jwt_cached_us"] = await _measure(lambda: security.get_current_user(token), iterations)
+
+    async def basic_uncached():
+        security.credentials_cache.clear()
+        return await deps.get_current_user(basic, None)
+
+    results["basic_uncached_us"] = await _measure(basic_uncached, iterations)
+    security.credentials_cache.clear()
+    results["basic_cached_us"] = await _measure(lambda: deps.get_current_user(basic, None), iterations)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    results = {"benchmark": "auth", "iterations": args.iterations, **asyncio.run(run(args.iterations))}
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
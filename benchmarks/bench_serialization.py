@@ -0,0 +1,145 @@
+"""
+Benchmark da serialização da listagem de inscrições.
+
+Compara o caminho padrão (entidades ORM validadas em `EnrollmentPage` e
+codificadas pelo FastAPI) com o caminho rápido de `FAST_JSON_RESPONSES`
+(tuplas de colunas serializadas por um `TypeAdapter`), medindo a leitura
+do banco e a serialização separadamente. Usa SQLite em memória.
+
+Uso:
+    python -m benchmarks.bench_serialization [--rows 1000 100000] [--repeat 5] [--output serialization.json]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.routers.enrollments import ENROLLMENT_READ_COLUMNS, _enrollment_row_page_adapter
+from app.models.age_group import AgeGroup
+from app.models.enrollment import Enrollment, EnrollmentStatus
+from app.schemas.enrollment_schema import EnrollmentPage
+
+DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+SEED_CHUNK = 5000
+
+_page_field = create_model_field("Response_list_enrollments", EnrollmentPage, mode="serialization")
+
+
+async def _seed(session: AsyncSession, rows: int) -> None:
+    """Cria uma faixa etária e `rows` inscrições."""
+    age_group_id = uuid4()
+    await session.exec(insert(AgeGroup).values(id=age_group_id, name="Bench", min_age=0, max_age=120))
+    for start in range(0, rows, SEED_CHUNK):
+        values = [
+            {
+                "id": uuid4(),
+                "name": f"Pessoa {i}",
+                "email": f"pessoa{i}@bench.com",
+                "age": i % 120,
+                "age_group_id": age_group_id,
+                "status": EnrollmentStatus.pending,
+            }
+            for i in range(start, min(start + SEED_CHUNK, rows))
+        ]
+        await session.exec(insert(Enrollment).values(values))
+    await session.commit()
+
+
+async def _default_path(session: AsyncSession) -> tuple[float, float, int]:
+    """Entidades ORM + response_model + JSONResponse, como o endpoint padrão."""
+    start = time.perf_counter()
+    items = (await session.exec(select(Enrollment).order_by(Enrollment.id))).all()
+    fetched = time.perf_counter()
+    content = await serialize_response(
+        field=_page_field,
+        response_content=EnrollmentPage(items=items, next_cursor=None),
+    )
+    body = JSONResponse(content).body
+    done = time.perf_counter()
+    session.expunge_all()
+    return fetched - start, done - fetched, len(body)
+
+
+async def _fast_path(session: AsyncSession) -> tuple[float, float, int]:
+    """Tuplas de colunas + TypeAdapter, como com FAST_JSON_RESPONSES."""
+    start = time.perf_counter()
+    result = await session.exec(select(*ENROLLMENT_READ_COLUMNS).order_by(Enrollment.id))
+    rows = [row._asdict() for row in result]
+    fetched = time.perf_counter()
+    body = _enrollment_row_page_adapter.dump_json({"items": rows, "next_cursor": None})
+    done = time.perf_counter()
+    return fetched - start, done - fetched, len(body)
+
+
+async def _measure(
+    path: Callable[[AsyncSession], Awaitable[tuple[float, float, int]]],
+    session: AsyncSession,
+    repeat: int,
+) -> dict[str, Any]:
+    """Executa o caminho `repeat` vezes e retorna as medianas em milissegundos."""
+    await path(session)
+    samples = [await path(session) for _ in range(repeat)]
+    fetch = sorted(sample[0] for sample in samples)[len(samples) // 2]
+    serialize = sorted(sample[1] for sample in samples)[len(samples) // 2]
+    return {
+        "fetch_ms": round(fetch * 1000, 2),
+        "serialize_ms": round(serialize * 1000, 2),
+        "total_ms": round((fetch + serialize) * 1000, 2),
+        "bytes": samples[0][2],
+    }
+
+
+async def run(row_counts: list[int], repeat: int) -> list[dict[str, Any]]:
+    results = []
+    for rows in row_counts:
+        engine = create_async_engine(DATABASE_URL)
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        session_maker = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_maker() as session:
+            await _seed(session, rows)
+            default = await _measure(_default_path, session, repeat)
+            fast = await _measure(_fast_path, session, repeat)
+        await engine.dispose()
+        results.append({
+            "rows": rows,
+            "default": default,
+            "fast": fast,
+            "speedup": round(default["total_ms"] / fast["total_ms"], 2) if fast["total_ms"] else None,
+        })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    results = {
+        "benchmark": "serialization",
+        "repeat": args.repeat,
+        "results": asyncio.run(run(args.rows, args.repeat)),
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Benchmark da vazão do worker de inscrições.
+
+Para cada tamanho de lote em `--batch`, cria `--jobs` inscrições pendentes,
+pré-enche a fila com uma tarefa por inscrição e mede quanto tempo o `Worker`
+leva para processar todas (drain rate em jobs/s), com a concorrência e o
+prefetch informados.
+
+Por padrão usa SQLite em arquivo temporário e uma fila em memória; com
+`--real` usa o DATABASE_URL e o Redis configurados (a fila `enrollment_queue`
+deve estar vazia) e remove as inscrições sintéticas ao final.
+
+Uso:
+    python -m benchmarks.bench_worker [--jobs 5000] [--batch 1 20 100] [--concurrency 1]
+        [--prefetch 1] [--real] [--output worker.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, func, insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models.age_group import AgeGroup
+from app.models.enrollment import Enrollment, EnrollmentStatus
+from app.services.stats_services import reconcile_enrollment_stats
+
+SEED_PREFIX = "bench-worker"
+SEED_CHUNK = 5000
+ENQUEUE_CHUNK = 1000
+POLL_INTERVAL = 0.02
+
+
+async def _seed(engine: AsyncEngine, jobs: int) -> tuple[UUID, list[str]]:
+    """Cria uma faixa etária e `jobs` inscrições pendentes; retorna os IDs."""
+    age_group_id = uuid4()
+    ids = [uuid4() for _ in range(jobs)]
+    async with engine.begin() as conn:
+        await conn.execute(insert(AgeGroup).values(
+            id=age_group_id, name=f"{SEED_PREFIX}-{age_group_id.hex[:8]}", min_age=0, max_age=120
+        ))
+        for start in range(0, jobs, SEED_CHUNK):
+            await conn.execute(insert(Enrollment), [
+                {
+                    "id": enrollment_id,
+                    "name": f"Pessoa {start + i}",
+                    "email": f"{SEED_PREFIX}-{enrollment_id.hex}@example.com",
+                    "age": 30,
+                    "age_group_id": age_group_id,
+                    "status": EnrollmentStatus.pending,
+                }
+                for i, enrollment_id in enumerate(ids[start:start + SEED_CHUNK])
+            ])
+    return age_group_id, [str(enrollment_id) for enrollment_id in ids]
+
+
+async def _pending(engine: AsyncEngine, age_group_id: UUID) -> int:
+    async with AsyncSession(engine) as session:
+        result = await session.exec(
+            select(func.count()).select_from(Enrollment).where(
+                Enrollment.age_group_id == age_group_id,
+                Enrollment.status == EnrollmentStatus.pending,
+            )
+        )
+        return result.one()
+
+
+async def _cleanup(engine: AsyncEngine, age_group_id: UUID) -> None:
+    """Remove as inscrições sintéticas e reconstrói os contadores."""
+    async with engine.begin() as conn:
+        await conn.execute(delete(Enrollment).where(Enrollment.age_group_id == age_group_id))
+        await conn.execute(delete(AgeGroup).where(AgeGroup.id == age_group_id))
+    async with AsyncSession(engine) as session:
+        await reconcile_enrollment_stats(session)
+
+
+async def drain(engine: AsyncEngine, queue: Any, jobs: int, batch: int, concurrency: int, prefetch: int) -> dict[str, Any]:
+    """Pré-enche a fila, roda o worker até processar tudo e mede o tempo."""
+    from worker import processor
+
+    age_group_id, ids = await _seed(engine, jobs)
+    try:
+        for start in range(0, jobs, ENQUEUE_CHUNK):
+            await queue.enqueue_many([{"enrollment_id": enrollment_id} for enrollment_id in ids[start:start + ENQUEUE_CHUNK]])
+
+        processor.BATCH_SIZE = batch
+        worker = processor.Worker(concurrency=concurrency, prefetch=prefetch, outbox_relay=False)
+        started_at = time.perf_counter()
+        task = asyncio.create_task(worker.run())
+        while await _pending(engine, age_group_id):
+            if task.done():
+                task.result()
+                raise RuntimeError("Worker parou antes de drenar a fila")
+            await asyncio.sleep(POLL_INTERVAL)
+        elapsed = time.perf_counter() - started_at
+        worker.request_shutdown()
+        await task
+    finally:
+        await _cleanup(engine, age_group_id)
+    return {
+        "batch": batch,
+        "jobs": jobs,
+        "seconds": round(elapsed, 3),
+        "jobs_per_second": round(jobs / elapsed, 1),
+    }
+
+
+async def run(jobs: int, batches: list[int], concurrency: int, prefetch: int, real: bool) -> list[dict[str, Any]]:
+    from worker import processor
+
+    if real:
+        from app.queue.redis_backend import redis_queue
+        try:
+            return [
+                await drain(processor.engine, redis_queue, jobs, batch, concurrency, prefetch)
+                for batch in batches
+            ]
+        finally:
+            await redis_queue.close()
+            await processor.engine.dispose()
+
+    from benchmarks.standins import InMemoryQueue, create_schema, sqlite_engine
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = sqlite_engine(os.path.join(tmp, "worker.db"))
+        await create_schema(engine)
+
+        @asynccontextmanager
+        async def sqlite_session():
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                yield session
+
+        queue = InMemoryQueue()
+        processor.get_session = sqlite_session
+        processor.redis_queue = queue
+        try:
+            return [await drain(engine, queue, jobs, batch, concurrency, prefetch) for batch in batches]
+        finally:
+            await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=5000, help="Tarefas pré-enfileiradas por rodada")
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 20, 100], help="Valores de ENROLLMENT_WORKER_BATCH")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--prefetch", type=int, default=1)
+    parser.add_argument("--real", action="store_true", help="Usa DATABASE_URL e REDIS_URL em vez de SQLite e fila em memória")
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+    # Os logs por lote do worker distorceriam a medição.
+    settings.LOG_LEVEL = "WARNING"
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = {
+        "benchmark": "worker",
+        "backend": "real" if args.real else "in-process",
+        "concurrency": args.concurrency,
+        "prefetch": args.prefetch,
+        "results": asyncio.run(run(args.jobs, args.batch, args.concurrency, args.prefetch, args.real)),
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
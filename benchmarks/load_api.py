@@ -0,0 +1,241 @@
+"""
+Teste de carga da API em taxa fixa (open loop).
+
+Dispara requisições em `POST /token`, `POST /enrollments/` e
+`GET /enrollments/` a `--rps` requisições por segundo durante `--duration`
+segundos por endpoint, sem esperar as respostas anteriores, e reporta a
+vazão obtida, erros e latência p50/p95/p99. A latência é medida a partir do
+instante agendado para o envio, então fila no cliente ou no servidor aparece
+no resultado em vez de reduzir a taxa (coordinated omission).
+
+Por padrão roda a aplicação no próprio processo (transporte ASGI) com SQLite
+em um arquivo temporário; com `--url` mede um servidor real (ex: uvicorn com
+PostgreSQL e Redis locais).
+
+Uso:
+    python -m benchmarks.load_api [--url http://localhost:8000] [--rps 200] [--duration 10]
+        [--endpoints token create list] [--output load.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Optional
+from uuid import uuid4
+
+import httpx
+
+from app.core.config import settings
+
+ENDPOINTS = ("token", "create", "list")
+MAX_IN_FLIGHT = 1000
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Percentil pelo método nearest-rank sobre valores já ordenados."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(name: str, rps: float, latencies: list[float], errors: Counter, dropped: int, elapsed: float) -> dict[str, Any]:
+    """Monta o resultado de um endpoint, com latências em milissegundos."""
+    latencies = sorted(latencies)
+    requests = len(latencies)
+    failed = sum(errors.values())
+    return {
+        "endpoint": name,
+        "target_rps": rps,
+        "achieved_rps": round((requests - failed) / elapsed, 1) if elapsed else 0.0,
+        "requests": requests,
+        "errors": dict(errors),
+        "error_rate": round(failed / requests, 4) if requests else 0.0,
+        "dropped": dropped,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            "mean": round(sum(latencies) / requests * 1000, 2) if requests else 0.0,
+        },
+    }
+
+
+async def run_fixed_rate(
+    name: str,
+    send: Callable[[int], Awaitable[httpx.Response]],
+    rps: float,
+    duration: float,
+) -> dict[str, Any]:
+    """
+    Envia `rps * duration` requisições em intervalos fixos.
+
+    Args:
+        name: Nome do endpoint no resultado
+        send: Corrotina que envia a requisição de índice i
+        rps: Requisições por segundo
+        duration: Segundos de carga
+
+    Returns:
+        dict: Resultado com vazão, erros e percentis de latência
+    """
+    loop = asyncio.get_running_loop()
+    latencies: list[float] = []
+    errors: Counter = Counter()
+    in_flight = 0
+    dropped = 0
+
+    async def one(i: int, scheduled: float):
+        nonlocal in_flight
+        try:
+            response = await send(i)
+            if response.status_code >= 400:
+                errors[str(response.status_code)] += 1
+        except Exception as e:
+            errors[type(e).__name__] += 1
+        finally:
+            in_flight -= 1
+            latencies.append(loop.time() - scheduled)
+
+    tasks = []
+    start = loop.time()
+    for i in range(int(rps * duration)):
+        scheduled = start + i / rps
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if in_flight >= MAX_IN_FLIGHT:
+            dropped += 1
+            continue
+        in_flight += 1
+        tasks.append(asyncio.create_task(one(i, scheduled)))
+    await asyncio.gather(*tasks)
+    return summarize(name, rps, latencies, errors, dropped, loop.time() - start)
+
+
+async def _prepare(client: httpx.AsyncClient, run_id: str) -> tuple[dict[str, str], str]:
+    """Obtém um token e cria a faixa etária usada nas inscrições."""
+    response = await client.post("/token", data={"username": settings.API_USERNAME, "password": settings.API_PASSWORD})
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    response = await client.post(
+        "/age-groups/", json={"name": f"load-{run_id}", "min_age": 0, "max_age": 120}, headers=headers
+    )
+    response.raise_for_status()
+    return headers, response.json()["id"]
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    endpoints: list[str],
+    rps: float,
+    duration: float,
+    warmup: float,
+) -> list[dict[str, Any]]:
+    run_id = uuid4().hex[:8]
+    headers, age_group_id = await _prepare(client, run_id)
+    credentials = {"username": settings.API_USERNAME, "password": settings.API_PASSWORD}
+    created = 0
+
+    async def token(i: int) -> httpx.Response:
+        return await client.post("/token", data=credentials)
+
+    async def create(i: int) -> httpx.Response:
+        nonlocal created
+        created += 1
+        return await client.post("/enrollments/", headers=headers, json={
+            "name": f"Carga {created}",
+            "email": f"load-{run_id}-{created}@example.com",
+            "age": 30,
+            "age_group_id": age_group_id,
+        })
+
+    async def list_page(i: int) -> httpx.Response:
+        return await client.get("/enrollments/", params={"limit": 100})
+
+    senders = {"token": token, "create": create, "list": list_page}
+    results = []
+    for name in endpoints:
+        if warmup > 0:
+            await run_fixed_rate(name, senders[name], rps, warmup)
+        results.append(await run_fixed_rate(name, senders[name], rps, duration))
+    return results
+
+
+async def run_in_process(endpoints: list[str], rps: float, duration: float, warmup: float) -> list[dict[str, Any]]:
+    """Roda a carga contra a aplicação no próprio processo com SQLite."""
+    from sqlalchemy.orm import sessionmaker
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from app.cache.age_group_cache import age_group_cache
+    from app.db.session import get_session
+    from app.main import app
+    from benchmarks.standins import create_schema, sqlite_engine
+
+    async def no_publish(message: str) -> None:
+        return None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = sqlite_engine(os.path.join(tmp, "load.db"))
+        await create_schema(engine)
+        session_maker = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def sqlite_session():
+            async with session_maker() as session:
+                yield session
+
+        app.dependency_overrides[get_session] = sqlite_session
+        age_group_cache._publish = no_publish
+        try:
+            async with httpx.AsyncClient(app=app, base_url="http://load") as client:
+                return await run_load(client, endpoints, rps, duration, warmup)
+        finally:
+            app.dependency_overrides.clear()
+            del age_group_cache._publish
+            await engine.dispose()
+
+
+async def run(url: Optional[str], endpoints: list[str], rps: float, duration: float, warmup: float) -> list[dict[str, Any]]:
+    if url is None:
+        return await run_in_process(endpoints, rps, duration, warmup)
+    limits = httpx.Limits(max_connections=MAX_IN_FLIGHT, max_keepalive_connections=100)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        return await run_load(client, endpoints, rps, duration, warmup)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="URL da API (padrão: aplicação no próprio processo com SQLite)")
+    parser.add_argument("--rps", type=float, default=100, help="Requisições por segundo")
+    parser.add_argument("--duration", type=float, default=10, help="Segundos de carga por endpoint")
+    parser.add_argument("--warmup", type=float, default=1, help="Segundos de aquecimento não medidos")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+    # Uma linha de log por requisição distorceria a medição.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    started_at = time.time()
+    results = {
+        "benchmark": "load_api",
+        "target": args.url or "in-process",
+        "rps": args.rps,
+        "duration": args.duration,
+        "started_at": started_at,
+        "results": asyncio.run(run(args.url, args.endpoints, args.rps, args.duration, args.warmup)),
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
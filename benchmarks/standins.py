@@ -0,0 +1,93 @@
+"""
+Substitutos locais para rodar os benchmarks sem PostgreSQL e Redis.
+
+Os mesmos usados em `tests/conftest.py`: SQLite (aqui em arquivo, para que
+várias sessões concorrentes vejam os mesmos dados) e uma fila em memória com
+a interface de `RedisQueue`.
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import SQLModel
+
+from app.queue.redis_backend import LANE_BULK, LANE_INTERACTIVE, with_lane
+
+
+def sqlite_engine(path: str) -> AsyncEngine:
+    """Cria um engine SQLite em arquivo, esperando em vez de falhar em locks de escrita."""
+    return create_async_engine(f"sqlite+aiosqlite:///{path}", connect_args={"timeout": 30})
+
+
+async def create_schema(engine: AsyncEngine) -> None:
+    """Cria as tabelas de todos os models."""
+    from app.models import age_group, enrollment, enrollment_stats, outbox  # noqa: F401
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+
+class InMemoryQueue:
+    """Fila FIFO em memória com a interface usada pelo worker."""
+
+    reliable = False
+    consumer = "benchmark"
+
+    def __init__(self):
+        self.items: deque[dict[str, Any]] = deque()
+        self.failed: list[tuple[dict[str, Any], str]] = []
+
+    async def connect(self):
+        return None
+
+    async def close(self):
+        return None
+
+    async def enqueue(self, payload: dict[str, Any], lane: Optional[str] = None, partition: Optional[Any] = None):
+        self.items.append(with_lane(payload, lane, partition))
+
+    async def enqueue_many(
+        self,
+        payloads: list[dict[str, Any]],
+        lane: Optional[str] = None,
+        partition: Optional[Any] = None,
+    ):
+        self.items.extend(with_lane(payload, lane, partition) for payload in payloads)
+
+    async def dequeue_batch(self, max_items: int, timeout: float = 0) -> list[dict[str, Any]]:
+        batch = [self.items.popleft() for _ in range(min(max_items, len(self.items)))]
+        if not batch and timeout > 0:
+            await asyncio.sleep(min(timeout, 0.01))
+        return batch
+
+    async def ack(self, jobs: list[dict[str, Any]]):
+        return None
+
+    async def nack(self, jobs: list[dict[str, Any]]):
+        self.items.extendleft(reversed(jobs))
+
+    async def retry(self, failures: list[tuple[dict[str, Any], str]]) -> tuple[int, int]:
+        self.failed.extend(failures)
+        return 0, len(failures)
+
+    async def promote_delayed(self, limit: int = 0) -> int:
+        return 0
+
+    async def heartbeat(self):
+        return None
+
+    async def requeue_orphans(self) -> int:
+        return 0
+
+    async def lane_sizes(self) -> dict[str, int]:
+        bulk = sum(1 for job in self.items if job.get("lane") == LANE_BULK)
+        return {LANE_INTERACTIVE: len(self.items) - bulk, LANE_BULK: bulk}
+
+    async def size(self, lane: Optional[str] = None) -> int:
+        if lane is None:
+            return len(self.items)
+        return (await self.lane_sizes())[lane]
+
+    async def dead_size(self) -> int:
+        return len(self.failed)
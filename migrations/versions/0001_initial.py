@@ -0,0 +1,126 @@
+"""Esquema inicial com índices das consultas frequentes
+
+Também adota bancos criados por `create_all` antes das migrações: as tabelas
+existentes são mantidas e completadas (coluna, constraint e índices).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+enrollment_status = sa.Enum("pending", "approved", "rejected", name="enrollmentstatus")
+
+
+def _existing_tables() -> set[str]:
+    """Tabelas já presentes, ex: banco criado por `create_all` antes das migrações."""
+    if op.get_context().as_sql:
+        return set()
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _adopt_enrollments() -> None:
+    """
+    Completa uma tabela `enrollments` criada por `create_all` sem migrações.
+    
+    Adiciona `processed_at` e a constraint única de (email, age_group_id)
+    quando faltam. Antes da constraint, inscrições duplicadas são removidas,
+    mantendo a de menor ID de cada par.
+    """
+    inspector = sa.inspect(op.get_bind())
+    if "processed_at" not in {column["name"] for column in inspector.get_columns("enrollments")}:
+        op.add_column("enrollments", sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True))
+    if "uq_enrollments_email_age_group" in {
+        constraint["name"] for constraint in inspector.get_unique_constraints("enrollments")
+    }:
+        return
+    op.execute(
+        "DELETE FROM enrollments WHERE EXISTS ("
+        "SELECT 1 FROM enrollments AS kept "
+        "WHERE kept.email = enrollments.email "
+        "AND kept.age_group_id = enrollments.age_group_id "
+        "AND kept.id < enrollments.id)"
+    )
+    with op.batch_alter_table("enrollments") as batch_op:
+        batch_op.create_unique_constraint("uq_enrollments_email_age_group", ["email", "age_group_id"])
+
+
+def upgrade() -> None:
+    existing = _existing_tables()
+    if "age_groups" not in existing:
+        _create_age_groups()
+    if "enrollments" in existing:
+        _adopt_enrollments()
+    else:
+        _create_enrollments()
+    # CREATE INDEX CONCURRENTLY não roda em transação: os índices são criados
+    # em autocommit, sem bloquear escritas em `enrollments` (ignorado no SQLite).
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_enrollments_status_id",
+            "enrollments",
+            ["status", "id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_enrollments_age_group_id",
+            "enrollments",
+            ["age_group_id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_enrollments_pending",
+            "enrollments",
+            ["id"],
+            postgresql_where=sa.text("status = 'pending'"),
+            sqlite_where=sa.text("status = 'pending'"),
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def _create_age_groups() -> None:
+    op.create_table(
+        "age_groups",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("min_age", sa.Integer(), nullable=False),
+        sa.Column("max_age", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def _create_enrollments() -> None:
+    op.create_table(
+        "enrollments",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("email", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("age", sa.Integer(), nullable=False),
+        sa.Column("age_group_id", sa.Uuid(), nullable=False),
+        sa.Column("status", enrollment_status, nullable=False),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["age_group_id"], ["age_groups.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("email", "age_group_id", name="uq_enrollments_email_age_group"),
+    )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name in ("ix_enrollments_pending", "ix_enrollments_age_group_id", "ix_enrollments_status_id"):
+            op.drop_index(index_name, table_name="enrollments", postgresql_concurrently=True)
+    op.drop_table("enrollments")
+    op.drop_table("age_groups")
+    enrollment_status.drop(op.get_bind(), checkfirst=True)
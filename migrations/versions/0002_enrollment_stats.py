@@ -0,0 +1,39 @@
+"""Tabela de contadores de inscrições por faixa etária e status
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# O tipo enrollmentstatus já foi criado em 0001.
+enrollment_status = sa.Enum("pending", "approved", "rejected", name="enrollmentstatus").with_variant(
+    postgresql.ENUM(name="enrollmentstatus", create_type=False), "postgresql"
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "enrollment_stats",
+        sa.Column("age_group_id", sa.Uuid(), nullable=False),
+        sa.Column("status", enrollment_status, nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("age_group_id", "status"),
+    )
+    op.execute(
+        "INSERT INTO enrollment_stats (age_group_id, status, total) "
+        "SELECT age_group_id, status, COUNT(*) FROM enrollments GROUP BY age_group_id, status"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("enrollment_stats")
@@ -0,0 +1,84 @@
+"""Coluna created_at e índices da busca de inscrições
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Filtro por igualdade combinado com sort=created_at/age.
+COMPOSITE_SORT_INDEXES = {
+    "ix_enrollments_status_created_at_id": ["status", "created_at", "id"],
+    "ix_enrollments_status_age_id": ["status", "age", "id"],
+    "ix_enrollments_age_group_id_created_at_id": ["age_group_id", "created_at", "id"],
+    "ix_enrollments_age_group_id_age_id": ["age_group_id", "age", "id"],
+}
+
+
+def upgrade() -> None:
+    # Inscrições existentes recebem o momento da migração. Em batch porque o
+    # SQLite não aceita ADD COLUMN com default não constante em tabela com
+    # linhas (a tabela é recriada); no PostgreSQL é um ALTER TABLE comum.
+    with op.batch_alter_table("enrollments") as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "created_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.text("CURRENT_TIMESTAMP"),
+                nullable=False,
+            )
+        )
+    # CREATE/DROP INDEX CONCURRENTLY não rodam em transação: os índices são
+    # trocados em autocommit, sem bloquear escritas em `enrollments` (ignorado
+    # no SQLite). O índice composto da faixa etária é criado antes de remover
+    # o antigo, para as consultas nunca ficarem sem índice.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_enrollments_age_group_id_id",
+            "enrollments",
+            ["age_group_id", "id"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_enrollments_age_group_id", table_name="enrollments", if_exists=True, postgresql_concurrently=True
+        )
+        op.create_index(
+            "ix_enrollments_created_at_id", "enrollments", ["created_at", "id"], postgresql_concurrently=True
+        )
+        op.create_index("ix_enrollments_age_id", "enrollments", ["age", "id"], postgresql_concurrently=True)
+        for index_name, columns in COMPOSITE_SORT_INDEXES.items():
+            op.create_index(index_name, "enrollments", columns, postgresql_concurrently=True)
+        for column in ("name", "email"):
+            op.create_index(
+                f"ix_enrollments_{column}_prefix",
+                "enrollments",
+                [sa.func.lower(sa.column(column)).label(f"{column}_lower")],
+                postgresql_ops={f"{column}_lower": "text_pattern_ops"},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_enrollments_age_group_id", "enrollments", ["age_group_id"], postgresql_concurrently=True
+        )
+        for index_name in (
+            *COMPOSITE_SORT_INDEXES,
+            "ix_enrollments_email_prefix",
+            "ix_enrollments_name_prefix",
+            "ix_enrollments_age_id",
+            "ix_enrollments_created_at_id",
+            "ix_enrollments_age_group_id_id",
+        ):
+            op.drop_index(index_name, table_name="enrollments", if_exists=True, postgresql_concurrently=True)
+    with op.batch_alter_table("enrollments") as batch_op:
+        batch_op.drop_column("created_at")
@@ -0,0 +1,48 @@
+"""Contadores de enrollment_stats divididos em shards
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Os contadores existentes viram a shard 0. A tabela tem uma linha por
+    # faixa etária e status, então a troca da chave primária é rápida.
+    with op.batch_alter_table("enrollment_stats") as batch_op:
+        batch_op.add_column(sa.Column("shard", sa.Integer(), server_default="0", nullable=False))
+        if op.get_context().dialect.name == "postgresql":
+            batch_op.drop_constraint("enrollment_stats_pkey", type_="primary")
+        batch_op.create_primary_key("enrollment_stats_pkey", ["age_group_id", "status", "shard"])
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_enrollments_age_group_status",
+            "enrollments",
+            ["age_group_id", "status"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_enrollments_age_group_status", table_name="enrollments", postgresql_concurrently=True)
+    # Soma as shards de cada contador em uma única linha antes de remover a coluna.
+    op.execute(
+        "INSERT INTO enrollment_stats (age_group_id, status, shard, total) "
+        "SELECT age_group_id, status, -1, SUM(total) FROM enrollment_stats GROUP BY age_group_id, status"
+    )
+    op.execute("DELETE FROM enrollment_stats WHERE shard <> -1")
+    with op.batch_alter_table("enrollment_stats") as batch_op:
+        if op.get_context().dialect.name == "postgresql":
+            batch_op.drop_constraint("enrollment_stats_pkey", type_="primary")
+        batch_op.drop_column("shard")
+        batch_op.create_primary_key("enrollment_stats_pkey", ["age_group_id", "status"])
@@ -1,9 +1,11 @@
 import asyncio
+import os
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -27,11 +29,45 @@ async def engine():
     async with engine.begin() as conn:
         from app.models import age_group
         from app.models import enrollment
+        from app.models import enrollment_stats
+        from app.models import outbox
         await conn.run_sync(SQLModel.metadata.create_all)
     yield engine
     await engine.dispose()
 
 
+@pytest_asyncio.fixture
+async def postgres_engine(engine):
+    """
+    Engine do PostgreSQL de `POSTGRES_TEST_URL`, para testes que dependem de
+    locks de linha (o SQLite ignora FOR UPDATE). As tabelas são recriadas;
+    pula o teste sem a variável.
+    """
+    url = os.getenv("POSTGRES_TEST_URL")
+    if not url:
+        pytest.skip("POSTGRES_TEST_URL não configurada")
+    pg_engine = create_async_engine(url, echo=False)
+    async with pg_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+        await conn.run_sync(SQLModel.metadata.create_all)
+    yield pg_engine
+    async with pg_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+    await pg_engine.dispose()
+
+
+@pytest.fixture
+def sql_statements(engine):
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
 @pytest_asyncio.fixture
 async def session(engine):
     async_session_maker = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
@@ -56,14 +92,115 @@ def mock_redis_queue(monkeypatch):
     async def fake_enqueue(payload: dict):
         calls.append(payload)
 
-    async def fake_dequeue_batch(max_items: int):
+    async def fake_enqueue_many(payloads: list[dict]):
+        calls.extend(payloads)
+
+    async def fake_dequeue_batch(max_items: int, timeout: float = 0):
         batch = calls[:max_items]
         del calls[:max_items]
+        if not batch and timeout:
+            await asyncio.sleep(0.01)
         return batch
 
+    async def fake_ack(jobs: list[dict]):
+        pass
+
+    async def fake_nack(jobs: list[dict]):
+        calls[:0] = jobs
+
     monkeypatch.setattr(redis_backend.redis_queue, "enqueue", fake_enqueue)
+    monkeypatch.setattr(redis_backend.redis_queue, "enqueue_many", fake_enqueue_many)
     monkeypatch.setattr(redis_backend.redis_queue, "dequeue_batch", fake_dequeue_batch)
-    yield
+    monkeypatch.setattr(redis_backend.redis_queue, "ack", fake_ack)
+    monkeypatch.setattr(redis_backend.redis_queue, "nack", fake_nack)
+    yield calls
+
+
+@pytest_asyncio.fixture
+async def live_redis(monkeypatch):
+    """
+    Redis que executa os scripts Lua de verdade: o servidor de `REDIS_TEST_URL`
+    (o banco é limpo com FLUSHDB) ou fakeredis com Lua. Pula o teste se nenhum
+    dos dois estiver disponível. Retorna a URL a passar para as filas.
+    """
+    from app.queue import redis_client
+    url = os.getenv("REDIS_TEST_URL")
+    if url:
+        client = redis_client.create_redis_client(url)
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        url = "redis://fakeredis-test:6379/0"
+        client = fakeredis.FakeAsyncRedis(decode_responses=True, server=fakeredis.FakeServer(version=7))
+    await client.flushdb()
+    monkeypatch.setitem(redis_client._clients, url, client)
+    yield url
+    await client.flushdb()
+    await client.aclose()
+
+
+@pytest.fixture(autouse=True)
+def queue_retries(monkeypatch):
+    from app.queue import redis_backend
+    failures: list[tuple[dict, str]] = []
+
+    async def fake_retry(failed: list[tuple[dict, str]]):
+        failures.extend(failed)
+        return len(failed), 0
+
+    async def fake_promote_delayed(limit: int = redis_backend.PROMOTE_BATCH):
+        return 0
+
+    monkeypatch.setattr(redis_backend.redis_queue, "retry", fake_retry)
+    monkeypatch.setattr(redis_backend.redis_queue, "promote_delayed", fake_promote_delayed)
+    yield failures
+
+
+@pytest.fixture(autouse=True)
+def isolated_age_group_cache(monkeypatch):
+    from app.cache.age_group_cache import age_group_cache
+    published: list[str] = []
+
+    async def fake_publish(message: str):
+        published.append(message)
+
+    monkeypatch.setattr(age_group_cache, "_publish", fake_publish)
+    age_group_cache.invalidate_local()
+    yield published
+    age_group_cache.invalidate_local()
+
+
+@pytest.fixture(autouse=True)
+def idempotency_backend(monkeypatch):
+    from app.cache.idempotency import idempotency_store
+    responses: dict = {}
+    locks: dict[str, str] = {}
+
+    async def fake_load(key):
+        return responses.get(key)
+
+    async def fake_save(key, stored):
+        responses[key] = stored
+
+    async def fake_try_lock(key, token):
+        if key in locks:
+            return False
+        locks[key] = token
+        return True
+
+    async def fake_unlock(key, token):
+        if locks.get(key) == token:
+            del locks[key]
+
+    async def fake_extend_lock(key, token):
+        return locks.get(key) == token
+
+    monkeypatch.setattr(idempotency_store, "_load", fake_load)
+    monkeypatch.setattr(idempotency_store, "_save", fake_save)
+    monkeypatch.setattr(idempotency_store, "_try_lock", fake_try_lock)
+    monkeypatch.setattr(idempotency_store, "_unlock", fake_unlock)
+    monkeypatch.setattr(idempotency_store, "_extend_lock", fake_extend_lock)
+    yield responses
 
 
 @pytest_asyncio.fixture
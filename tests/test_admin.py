@@ -0,0 +1,54 @@
+import pytest
+from httpx import AsyncClient
+
+from app.queue.redis_backend import redis_queue
+
+
+@pytest.fixture
+def dead_letter_queue(monkeypatch):
+    dead = [{"enrollment_id": str(i), "attempts": 8, "last_error": "boom"} for i in range(3)]
+    replayed: list[dict] = []
+
+    async def fake_dead_letters(offset=0, limit=100):
+        return len(dead), dead[offset:offset + limit]
+
+    async def fake_replay_dead(limit):
+        batch = dead[-limit:]
+        del dead[-limit:]
+        replayed.extend(batch)
+        return len(batch)
+
+    async def fake_dead_size():
+        return len(dead)
+
+    async def fake_delayed_size():
+        return 5
+
+    monkeypatch.setattr(redis_queue, "dead_letters", fake_dead_letters)
+    monkeypatch.setattr(redis_queue, "replay_dead", fake_replay_dead)
+    monkeypatch.setattr(redis_queue, "dead_size", fake_dead_size)
+    monkeypatch.setattr(redis_queue, "delayed_size", fake_delayed_size)
+    yield replayed
+
+
+@pytest.mark.asyncio
+async def test_dead_letter_admin_requires_auth(client: AsyncClient):
+    assert (await client.get("/admin/dlq")).status_code == 401
+    assert (await client.post("/admin/dlq/replay")).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_list_and_replay_dead_letters(client: AsyncClient, auth_token: str, dead_letter_queue):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r_list = await client.get("/admin/dlq", params={"offset": 1, "limit": 1}, headers=headers)
+    assert r_list.status_code == 200
+    assert r_list.json() == {
+        "total": 3,
+        "delayed": 5,
+        "items": [{"enrollment_id": "1", "attempts": 8, "last_error": "boom"}],
+    }
+
+    r_replay = await client.post("/admin/dlq/replay", params={"limit": 2}, headers=headers)
+    assert r_replay.status_code == 200
+    assert r_replay.json() == {"replayed": 2, "remaining": 1}
+    assert [job["enrollment_id"] for job in dead_letter_queue] == ["1", "2"]
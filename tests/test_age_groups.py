@@ -43,3 +43,49 @@ async def test_delete_age_group(client: AsyncClient, auth_token: str):
     assert r_del.status_code == 204
     r_get = await client.get(f"/age-groups/{ag_id}")
     assert r_get.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_age_group_cache_invalidated_on_update(client: AsyncClient, auth_token: str, isolated_age_group_cache: list[str]):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r = await client.post("/age-groups/", json={"name": "Cache", "min_age": 40, "max_age": 50}, headers=headers)
+    assert r.status_code == 201
+    ag_id = r.json()["id"]
+
+    enrollment = {"name": "Carlos", "email": "carlos@test.com", "age": 55, "age_group_id": ag_id}
+    r_enr = await client.post("/enrollments/", json=enrollment, headers=headers)
+    assert r_enr.status_code == 400
+
+    r_upd = await client.put(f"/age-groups/{ag_id}", json={"max_age": 60}, headers=headers)
+    assert r_upd.status_code == 200
+    assert ag_id in isolated_age_group_cache
+
+    r_get = await client.get(f"/age-groups/{ag_id}")
+    assert r_get.json()["max_age"] == 60
+    r_enr = await client.post("/enrollments/", json=enrollment, headers=headers)
+    assert r_enr.status_code == 201, r_enr.text
+
+
+@pytest.mark.asyncio
+async def test_age_group_list_etag(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r = await client.post("/age-groups/", json={"name": "ETag", "min_age": 1, "max_age": 3}, headers=headers)
+    assert r.status_code == 201
+    ag_id = r.json()["id"]
+
+    r_list = await client.get("/age-groups/")
+    etag = r_list.headers["etag"]
+    assert r_list.headers["cache-control"].startswith("public")
+
+    r_cached = await client.get("/age-groups/", headers={"If-None-Match": etag})
+    assert r_cached.status_code == 304
+    assert r_cached.content == b""
+
+    r_get = await client.get(f"/age-groups/{ag_id}")
+    r_get_cached = await client.get(f"/age-groups/{ag_id}", headers={"If-None-Match": r_get.headers["etag"]})
+    assert r_get_cached.status_code == 304
+
+    await client.put(f"/age-groups/{ag_id}", json={"max_age": 4}, headers=headers)
+    r_changed = await client.get("/age-groups/", headers={"If-None-Match": etag})
+    assert r_changed.status_code == 200
+    assert r_changed.headers["etag"] != etag
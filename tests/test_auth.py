@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import security
+from app.core.config import settings
+
+
+@pytest.mark.asyncio
+async def test_verified_token_is_served_from_cache(monkeypatch):
+    token = security.create_access_token({"sub": settings.API_USERNAME})
+    decode_calls = 0
+    real_decode = security.decode_token
+
+    def counting_decode(value):
+        nonlocal decode_calls
+        decode_calls += 1
+        return real_decode(value)
+
+    monkeypatch.setattr(security, "decode_token", counting_decode)
+    security.token_cache.clear()
+    assert await security.get_current_user(token) == settings.API_USERNAME
+    assert await security.get_current_user(token) == settings.API_USERNAME
+    assert decode_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_token_is_rejected():
+    token = security.create_access_token({"sub": settings.API_USERNAME}, expires_delta=timedelta(seconds=-1))
+    with pytest.raises(HTTPException):
+        await security.get_current_user(token)
+
+
+def test_cache_entry_honors_expiration():
+    cache = security.VerifiedCache(max_entries=2, ttl=60)
+    key = cache.key_for("token")
+    cache.put(key, "admin", expires_at=0)
+    assert cache.get(key) is None
+    for value in ("a", "b", "c"):
+        cache.put(cache.key_for(value), value)
+    assert cache.get(cache.key_for("a")) is None
+    assert cache.get(cache.key_for("c")) == "c"
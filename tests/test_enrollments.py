@@ -1,3 +1,6 @@
+import json
+from uuid import uuid4
+
 import pytest
 from httpx import AsyncClient
 
@@ -33,7 +36,97 @@ async def test_create_enrollment(client: AsyncClient, auth_token: str):
 async def test_list_enrollments(client: AsyncClient, auth_token: str):
     r = await client.get("/enrollments/")
     assert r.status_code == 200
-    assert isinstance(r.json(), list)
+    assert isinstance(r.json()["items"], list)
+
+
+@pytest.mark.asyncio
+async def test_list_enrollments_cursor_pagination(client: AsyncClient, auth_token: str):
+    payload_age_group = {"name": "Paginada", "min_age": 20, "max_age": 30}
+    r_age_group = await client.post("/age-groups/", json=payload_age_group, headers={"Authorization": f"Bearer {auth_token}"})
+    assert r_age_group.status_code == 201
+    age_group_id = r_age_group.json()["id"]
+    for i in range(5):
+        payload = {"name": f"Pessoa {i}", "email": f"p{i}@test.com", "age": 25, "age_group_id": age_group_id}
+        r = await client.post("/enrollments/", json=payload, headers={"Authorization": f"Bearer {auth_token}"})
+        assert r.status_code == 201
+
+    seen: list[str] = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["after"] = cursor
+        r = await client.get("/enrollments/", params=params)
+        assert r.status_code == 200, r.text
+        page = r.json()
+        assert len(page["items"]) <= 2
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen))
+    assert seen == sorted(seen)
+
+    r_stream = await client.get("/enrollments/", params={"stream": "true"})
+    assert r_stream.status_code == 200
+    assert r_stream.headers["content-type"].startswith("application/x-ndjson")
+    lines = [line for line in r_stream.text.splitlines() if line]
+    assert len(lines) == len(seen)
+
+    r_bad = await client.get("/enrollments/", params={"after": "not-a-cursor"})
+    assert r_bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_enrollments_fast_json_matches_default(client: AsyncClient, auth_token: str, monkeypatch):
+    from app.core.config import settings
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r_age_group = await client.post("/age-groups/", json={"name": "Rápida", "min_age": 30, "max_age": 40}, headers=headers)
+    age_group_id = r_age_group.json()["id"]
+    for i in range(3):
+        payload = {"name": f"Rápida {i}", "email": f"r{i}@test.com", "age": 35, "age_group_id": age_group_id}
+        await client.post("/enrollments/", json=payload, headers=headers)
+
+    params = {"limit": 2}
+    r_default = await client.get("/enrollments/", params=params)
+    r_stream_default = await client.get("/enrollments/", params={"stream": "true"})
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    r_fast = await client.get("/enrollments/", params=params)
+    r_stream_fast = await client.get("/enrollments/", params={"stream": "true"})
+
+    assert r_fast.status_code == 200
+    assert r_fast.json() == r_default.json()
+    next_page = await client.get("/enrollments/", params={**params, "after": r_fast.json()["next_cursor"]})
+    assert next_page.status_code == 200
+    assert [json.loads(line) for line in r_stream_fast.text.splitlines()] == [
+        json.loads(line) for line in r_stream_default.text.splitlines()
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_enrollment_etag(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r_age_group = await client.post("/age-groups/", json={"name": "ETag", "min_age": 10, "max_age": 12}, headers=headers)
+    age_group_id = r_age_group.json()["id"]
+    payload = {"name": "Eva", "email": "eva@test.com", "age": 11, "age_group_id": age_group_id}
+    r = await client.post("/enrollments/", json=payload, headers=headers)
+    enrollment_id = r.json()["id"]
+
+    r_get = await client.get(f"/enrollments/{enrollment_id}")
+    assert r_get.status_code == 200
+    assert r_get.json()["email"] == "eva@test.com"
+    assert r_get.headers["cache-control"] == "private, no-cache"
+    etag = r_get.headers["etag"]
+
+    r_cached = await client.get(f"/enrollments/{enrollment_id}", headers={"If-None-Match": f'W/{etag}, "other"'})
+    assert r_cached.status_code == 304
+
+    await client.patch(f"/enrollments/{enrollment_id}/status?new_status=approved", headers=headers)
+    r_changed = await client.get(f"/enrollments/{enrollment_id}", headers={"If-None-Match": etag})
+    assert r_changed.status_code == 200
+    assert r_changed.json()["status"] == "approved"
 
 
 @pytest.mark.asyncio
@@ -106,3 +199,427 @@ async def test_delete_enrollment(client: AsyncClient, auth_token: str):
     assert r_del.status_code == 204
     r_get = await client.get(f"/enrollments/{eid}")
     assert r_get.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_enrollments(client: AsyncClient, auth_token: str):
+    payload_age_group = {"name": "Lote", "min_age": 30, "max_age": 40}
+    r_age_group = await client.post("/age-groups/", json=payload_age_group, headers={"Authorization": f"Bearer {auth_token}"})
+    assert r_age_group.status_code == 201
+    age_group_id = r_age_group.json()["id"]
+
+    items = [
+        {"name": "Bulk 1", "email": "bulk1@test.com", "age": 31, "age_group_id": age_group_id},
+        {"name": "Bulk 2", "email": "bulk2@test.com", "age": 50, "age_group_id": age_group_id},
+        {"name": "Bulk 3", "email": "bulk3@test.com", "age": 35},
+        {"name": "Bulk 4", "email": "bulk4@test.com", "age": 39, "age_group_id": age_group_id},
+    ]
+    r = await client.post("/enrollments/bulk", json=items, headers={"Authorization": f"Bearer {auth_token}"})
+    assert r.status_code == 200, r.text
+    data = r.json()
+    assert data["created"] == 2
+    assert data["failed"] == 2
+    assert [item["success"] for item in data["results"]] == [True, False, False, True]
+
+    created_id = data["results"][0]["id"]
+    r_get = await client.get(f"/enrollments/{created_id}")
+    assert r_get.status_code == 200
+    assert r_get.json()["status"] == "pending"
+
+    ndjson = "\n".join([
+        '{"name": "Bulk 5", "email": "bulk5@test.com", "age": 33, "age_group_id": "%s"}' % age_group_id,
+        "{not json",
+    ])
+    r_nd = await client.post(
+        "/enrollments/bulk",
+        content=ndjson,
+        headers={"Authorization": f"Bearer {auth_token}", "Content-Type": "application/x-ndjson"},
+    )
+    assert r_nd.status_code == 200, r_nd.text
+    assert [item["success"] for item in r_nd.json()["results"]] == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_duplicate_enrollment_rejected(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r_age_group = await client.post("/age-groups/", json={"name": "Única", "min_age": 40, "max_age": 50}, headers=headers)
+    age_group_id = r_age_group.json()["id"]
+    payload = {"name": "Ana", "email": "ana@test.com", "age": 45, "age_group_id": age_group_id}
+
+    r = await client.post("/enrollments/", json=payload, headers=headers)
+    assert r.status_code == 201, r.text
+    r_dup = await client.post("/enrollments/", json=payload, headers=headers)
+    assert r_dup.status_code == 409
+
+    items = [
+        payload,
+        {**payload, "email": "bia@test.com"},
+        {**payload, "email": "bia@test.com", "name": "Bia 2"},
+    ]
+    r_bulk = await client.post("/enrollments/bulk", json=items, headers=headers)
+    assert r_bulk.status_code == 200, r_bulk.text
+    assert [item["success"] for item in r_bulk.json()["results"]] == [False, True, False]
+
+
+@pytest.mark.asyncio
+async def test_enrollment_stats_counters_and_reconcile(client: AsyncClient, auth_token: str, session):
+    from uuid import UUID
+
+    from sqlalchemy import update
+    from sqlmodel import select
+
+    from app.core.config import settings
+    from app.models.enrollment_stats import EnrollmentStats
+    from app.services.stats_services import reconcile_enrollment_stats
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r_age_group = await client.post("/age-groups/", json={"name": "Stats", "min_age": 70, "max_age": 80}, headers=headers)
+    age_group_id = r_age_group.json()["id"]
+
+    async def group_counts():
+        r = await client.get("/enrollments/stats")
+        assert r.status_code == 200
+        return next(
+            (g["counts"] for g in r.json()["by_age_group"] if g["age_group_id"] == age_group_id), {}
+        )
+
+    ids = []
+    for i in range(3):
+        payload = {"name": f"Stats {i}", "email": f"stats{i}@test.com", "age": 75, "age_group_id": age_group_id}
+        r = await client.post("/enrollments/", json=payload, headers=headers)
+        ids.append(r.json()["id"])
+    bulk = [{"name": "Stats 3", "email": "stats3@test.com", "age": 75, "age_group_id": age_group_id}]
+    await client.post("/enrollments/bulk", json=bulk, headers=headers)
+    assert await group_counts() == {"pending": 4}
+
+    await client.patch(f"/enrollments/{ids[0]}/status?new_status=rejected", headers=headers)
+    await client.delete(f"/enrollments/{ids[1]}", headers=headers)
+    assert await group_counts() == {"pending": 2, "rejected": 1}
+
+    # Várias shards do mesmo contador são somadas na leitura; as extras ficam
+    # além das sorteadas por apply_stats_deltas para não colidir com elas.
+    extra_shard = settings.ENROLLMENT_STATS_SHARDS
+    session.add(EnrollmentStats(age_group_id=UUID(age_group_id), status="pending", shard=extra_shard, total=5))
+    session.add(EnrollmentStats(age_group_id=UUID(age_group_id), status="approved", shard=extra_shard, total=-5))
+    await session.commit()
+    assert await group_counts() == {"pending": 7, "rejected": 1, "approved": -5}
+
+    await session.exec(update(EnrollmentStats).values(total=99))
+    await session.commit()
+    rows = len((await session.exec(select(EnrollmentStats))).all())
+    assert await reconcile_enrollment_stats(session) > 0
+    assert await group_counts() == {"pending": 2, "rejected": 1}
+    assert await reconcile_enrollment_stats(session) == 0
+    # A reconciliação só corrige e completa shards; nada é apagado.
+    assert len((await session.exec(select(EnrollmentStats))).all()) >= rows
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key_replays_first_response(client: AsyncClient, auth_token: str, session, mock_redis_queue):
+    import asyncio
+
+    from worker.outbox_relay import relay_batch
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r_age_group = await client.post("/age-groups/", json={"name": "Idem", "min_age": 80, "max_age": 90}, headers=headers)
+    age_group_id = r_age_group.json()["id"]
+    payload = {"name": "Rita", "email": "rita@test.com", "age": 85, "age_group_id": age_group_id}
+    idem_headers = {**headers, "Idempotency-Key": "retry-1"}
+    while await relay_batch(session):
+        pass
+    mock_redis_queue.clear()
+
+    first, second = await asyncio.gather(
+        client.post("/enrollments/", json=payload, headers=idem_headers),
+        client.post("/enrollments/", json=payload, headers=idem_headers),
+    )
+    assert first.status_code == second.status_code == 201
+    assert first.json()["id"] == second.json()["id"]
+    await relay_batch(session)
+    assert [job["enrollment_id"] for job in mock_redis_queue] == [first.json()["id"]]
+
+    replay = await client.post("/enrollments/", json=payload, headers=idem_headers)
+    assert replay.status_code == 201
+    assert replay.headers["idempotent-replayed"] == "true"
+    assert replay.json() == first.json()
+    assert await relay_batch(session) == 0
+
+    r_mismatch = await client.post("/enrollments/", json={**payload, "age": 86}, headers=idem_headers)
+    assert r_mismatch.status_code == 422
+
+    r_other_key = await client.post("/enrollments/", json=payload, headers={**headers, "Idempotency-Key": "retry-2"})
+    assert r_other_key.status_code == 409
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "filters, sort, expected",
+    [
+        ({"status": "approved"}, "created_at", "ix_enrollments_status_created_at_id"),
+        ({"status": "approved"}, "-age", "ix_enrollments_status_age_id"),
+        ({"age_group_id": uuid4()}, "-created_at", "ix_enrollments_age_group_id_created_at_id"),
+        ({"age_group_id": uuid4()}, "-age", "ix_enrollments_age_group_id_age_id"),
+    ],
+)
+async def test_filter_and_sort_use_composite_index(session, filters, sort, expected):
+    from datetime import datetime, timezone
+
+    from sqlalchemy import text
+    from sqlmodel import select
+
+    from app.models.enrollment import Enrollment
+    from app.schemas.enrollment_schema import EnrollmentFilters, EnrollmentSort
+    from app.services.enrollment_services import filter_enrollments, order_enrollments
+
+    sort = EnrollmentSort(sort)
+    last = datetime(2026, 1, 1, tzinfo=timezone.utc) if sort.field == "created_at" else 30
+    stmt = order_enrollments(
+        filter_enrollments(select(Enrollment), EnrollmentFilters(**filters)), sort, (last, uuid4())
+    ).limit(100)
+    sql = stmt.compile(dialect=session.bind.dialect, compile_kwargs={"literal_binds": True})
+    plan = (await session.exec(text(f"EXPLAIN QUERY PLAN {sql}"))).all()
+    # Índice certo e nenhum "USE TEMP B-TREE FOR ORDER BY".
+    assert expected in str(plan) and "TEMP B-TREE" not in str(plan)
+
+
+@pytest.mark.asyncio
+async def test_idempotency_lock_is_renewed_while_handler_runs(live_redis):
+    import asyncio
+
+    from fastapi import HTTPException
+
+    from app.cache.idempotency import IdempotencyStore
+
+    store = IdempotencyStore(lock_ttl=0.1, wait_timeout=2, url=live_redis)
+    key = store.key_for("user", "POST /enrollments/", "slow")
+    calls = []
+
+    async def slow_handler():
+        calls.append(1)
+        await asyncio.sleep(0.4)
+        return 201, json.dumps({"ok": True})
+
+    first = asyncio.create_task(store.execute(key, "fp", slow_handler))
+    await asyncio.sleep(0.05)
+    # Retentativa concorrente: espera além do TTL do lock pela resposta gravada.
+    waiter = asyncio.create_task(store.execute(key, "fp", slow_handler))
+    await asyncio.sleep(0.25)
+    # Bem depois do TTL original, o lock ainda pertence à primeira requisição.
+    assert not await store._try_lock(key, "intruder")
+    response, waited = await asyncio.gather(first, waiter)
+    assert response.status_code == 201 and calls == [1]
+    assert waited.status_code == 201 and waited.headers["idempotent-replayed"] == "true"
+
+    replay = await store.execute(key, "fp", slow_handler)
+    assert replay.headers["idempotent-replayed"] == "true" and calls == [1]
+    assert not await store._redis().exists(f"{key}:lock")
+
+    # O tempo total de espera é limitado por wait_timeout.
+    impatient = IdempotencyStore(lock_ttl=0.1, wait_timeout=0.15, url=live_redis)
+    other_key = store.key_for("user", "POST /enrollments/", "slower")
+    first = asyncio.create_task(store.execute(other_key, "fp", slow_handler))
+    await asyncio.sleep(0.05)
+    with pytest.raises(HTTPException) as exc_info:
+        await impatient.execute(other_key, "fp", slow_handler)
+    assert exc_info.value.status_code == 409
+    await first
+    assert calls == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_bulk_jobs_use_bulk_lane(client: AsyncClient, auth_token: str, session, mock_redis_queue):
+    from app.queue.redis_backend import LANE_BULK, lane_of
+    from worker.outbox_relay import relay_batch
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r_age_group = await client.post("/age-groups/", json={"name": "Lanes", "min_age": 91, "max_age": 95}, headers=headers)
+    age_group_id = r_age_group.json()["id"]
+    while await relay_batch(session):
+        pass
+    mock_redis_queue.clear()
+
+    r_single = await client.post(
+        "/enrollments/",
+        json={"name": "Ivo", "email": "ivo@lanes.com", "age": 92, "age_group_id": age_group_id},
+        headers=headers,
+    )
+    assert r_single.status_code == 201
+    r_bulk = await client.post(
+        "/enrollments/bulk",
+        json=[{"name": f"Lote {i}", "email": f"lote{i}@lanes.com", "age": 93, "age_group_id": age_group_id} for i in range(3)],
+        headers=headers,
+    )
+    assert r_bulk.status_code == 200
+    while await relay_batch(session):
+        pass
+
+    lanes = {job["enrollment_id"]: lane_of(job) for job in mock_redis_queue}
+    assert lanes.pop(r_single.json()["id"]) == ("interactive", None)
+    assert set(lanes.values()) == {(LANE_BULK, age_group_id)}
+    assert len(lanes) == 3
+
+
+@pytest.mark.asyncio
+async def test_write_paths_use_returning(client: AsyncClient, auth_token: str, sql_statements):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    def statements() -> list[str]:
+        kinds = [stmt.split()[0] for stmt in sql_statements]
+        sql_statements.clear()
+        return kinds
+
+    r_age_group = await client.post("/age-groups/", json={"name": "Returning", "min_age": 20, "max_age": 30}, headers=headers)
+    assert r_age_group.status_code == 201
+    age_group_id = r_age_group.json()["id"]
+    assert statements() == ["INSERT"]
+
+    r_upd = await client.put(f"/age-groups/{age_group_id}", json={"max_age": 35}, headers=headers)
+    assert r_upd.status_code == 200
+    assert r_upd.json()["max_age"] == 35
+    assert statements() == ["UPDATE"]
+    r_missing = await client.put(f"/age-groups/{uuid4()}", json={"max_age": 35}, headers=headers)
+    assert r_missing.status_code == 404
+
+    payload = {"name": "Rita", "email": "rita@test.com", "age": 25, "age_group_id": age_group_id}
+    await client.get(f"/age-groups/{age_group_id}")  # aquece o cache da faixa etária
+    statements()
+    r_create = await client.post("/enrollments/", json=payload, headers=headers)
+    assert r_create.status_code == 201
+    assert r_create.json()["status"] == "pending"
+    eid = r_create.json()["id"]
+    # Inscrição, contadores e outbox; nenhum SELECT de refresh.
+    assert statements() == ["INSERT", "INSERT", "INSERT"]
+
+    r_put = await client.put(f"/enrollments/{eid}", json={**payload, "name": "Rita Lee"}, headers=headers)
+    assert r_put.status_code == 200
+    assert r_put.json()["name"] == "Rita Lee"
+    assert statements() == ["UPDATE"]
+
+    r_status = await client.patch(f"/enrollments/{eid}/status", params={"new_status": "approved"}, headers=headers)
+    assert r_status.status_code == 200
+    assert r_status.json()["status"] == "approved"
+    # Leitura com lock (status anterior para os contadores), contadores e UPDATE.
+    assert statements() == ["SELECT", "INSERT", "UPDATE"]
+
+    r_same = await client.patch(f"/enrollments/{eid}/status", params={"new_status": "approved"}, headers=headers)
+    assert r_same.status_code == 200
+    assert statements() == ["SELECT"]
+
+    r_del = await client.delete(f"/enrollments/{eid}", headers=headers)
+    assert r_del.status_code == 204
+    assert statements() == ["DELETE", "INSERT"]
+
+    r_stats = await client.get("/enrollments/stats")
+    assert all(g["total"] == 0 for g in r_stats.json()["by_age_group"] if g["age_group_id"] == age_group_id)
+
+
+@pytest.mark.asyncio
+async def test_bulk_status_update(client: AsyncClient, auth_token: str, sql_statements, monkeypatch):
+    from app.core.config import settings
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r_age_group = await client.post("/age-groups/", json={"name": "Moderação", "min_age": 50, "max_age": 59}, headers=headers)
+    assert r_age_group.status_code == 201
+    age_group_id = r_age_group.json()["id"]
+    items = [
+        {"name": f"Pessoa {i}", "email": f"moderacao{i}@test.com", "age": 50 + i, "age_group_id": age_group_id}
+        for i in range(7)
+    ]
+    r_bulk = await client.post("/enrollments/bulk", json=items, headers=headers)
+    assert r_bulk.json()["created"] == 7
+    ids = [result["id"] for result in r_bulk.json()["results"]]
+
+    r_ids = await client.patch("/enrollments/status", json={"status": "rejected", "ids": ids[:2] + [str(uuid4())]}, headers=headers)
+    assert r_ids.status_code == 200, r_ids.text
+    assert r_ids.json()["updated"] == 2
+    assert r_ids.json()["by_previous_status"]["pending"] == 2
+    assert len(r_ids.json()["not_updated"]) == 1
+
+    # Filtro por faixa etária, status atual e idade, em lotes de 2.
+    monkeypatch.setattr(settings, "ENROLLMENT_STATUS_CHUNK", 2)
+    sql_statements.clear()
+    r_filter = await client.patch("/enrollments/status", json={
+        "status": "approved",
+        "filter": {"age_group_id": age_group_id, "status": "pending", "min_age": 53},
+    }, headers=headers)
+    assert r_filter.status_code == 200, r_filter.text
+    assert r_filter.json() == {
+        "updated": 4,
+        "by_previous_status": {"pending": 4, "approved": 0, "rejected": 0},
+        "not_updated": None,
+    }
+    # Um UPDATE por lote, mais o upsert dos contadores nos lotes não vazios.
+    assert [stmt.split()[0] for stmt in sql_statements] == ["UPDATE", "INSERT", "UPDATE", "INSERT", "UPDATE"]
+
+    r_list = await client.get("/enrollments/", params={"limit": 100})
+    statuses = {e["id"]: e["status"] for e in r_list.json()["items"]}
+    assert [statuses[i] for i in ids] == ["rejected", "rejected", "pending", "approved", "approved", "approved", "approved"]
+
+    r_stats = await client.get("/enrollments/stats")
+    group = next(g for g in r_stats.json()["by_age_group"] if g["age_group_id"] == age_group_id)
+    assert group["counts"] == {"pending": 1, "approved": 4, "rejected": 2}
+
+    r_empty = await client.patch("/enrollments/status", json={"status": "approved", "filter": {}}, headers=headers)
+    assert r_empty.status_code == 422
+    r_both = await client.patch("/enrollments/status", json={"status": "approved", "ids": ids, "filter": {"status": "pending"}}, headers=headers)
+    assert r_both.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_list_enrollments_filters_and_sort(client: AsyncClient, auth_token: str):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r_age_group = await client.post("/age-groups/", json={"name": "Busca", "min_age": 70, "max_age": 90}, headers=headers)
+    assert r_age_group.status_code == 201
+    age_group_id = r_age_group.json()["id"]
+    people = [
+        ("Ana Clara", "ana@busca.com", 70),
+        ("ana_b", "a_b@busca.com", 75),
+        ("Anabela", "abc@busca.com", 80),
+        ("Bruno", "bruno%@busca.com", 85),
+        ("Carla", "carla@busca.com", 80),
+    ]
+    items = [{"name": n, "email": e, "age": a, "age_group_id": age_group_id} for n, e, a in people]
+    r_bulk = await client.post("/enrollments/bulk", json=items, headers=headers)
+    assert r_bulk.json()["created"] == 5
+
+    async def names(**params) -> list[str]:
+        r = await client.get("/enrollments/", params={"age_group_id": age_group_id, "limit": 100, **params})
+        assert r.status_code == 200, r.text
+        return sorted(e["name"] for e in r.json()["items"])
+
+    assert await names(name_prefix="ANA") == ["Ana Clara", "Anabela", "ana_b"]
+    # '_' e '%' são literais na busca por prefixo.
+    assert await names(name_prefix="ana_") == ["ana_b"]
+    assert await names(email_prefix="a_") == ["ana_b"]
+    assert await names(email_prefix="bruno%") == ["Bruno"]
+    assert await names(min_age=75, max_age=80) == ["Anabela", "Carla", "ana_b"]
+    assert await names(created_after="2000-01-01T00:00:00", created_before="2999-01-01T00:00:00") == sorted(n for n, _, _ in people)
+    assert await names(created_after="2999-01-01T00:00:00") == []
+
+    # Paginação keyset por idade decrescente, desempatada pelo ID.
+    seen, after = [], None
+    while True:
+        params = {"age_group_id": age_group_id, "sort": "-age", "limit": 2}
+        if after:
+            params["after"] = after
+        r = await client.get("/enrollments/", params=params)
+        assert r.status_code == 200, r.text
+        seen.extend(r.json()["items"])
+        after = r.json()["next_cursor"]
+        if after is None:
+            break
+    assert [e["age"] for e in seen] == [85, 80, 80, 75, 70]
+    assert [e["id"] for e in seen if e["age"] == 80] == sorted((e["id"] for e in seen if e["age"] == 80), reverse=True)
+
+    r_created = await client.get("/enrollments/", params={"age_group_id": age_group_id, "sort": "created_at", "limit": 3})
+    page = r_created.json()
+    r_next = await client.get("/enrollments/", params={
+        "age_group_id": age_group_id, "sort": "created_at", "limit": 3, "after": page["next_cursor"],
+    })
+    assert r_next.status_code == 200, r_next.text
+    ids = [e["id"] for e in page["items"] + r_next.json()["items"]]
+    assert sorted(ids) == sorted(result["id"] for result in r_bulk.json()["results"])
+
+    # O cursor só vale para a ordenação que o gerou.
+    r_mismatch = await client.get("/enrollments/", params={"sort": "age", "after": page["next_cursor"]})
+    assert r_mismatch.status_code == 400
@@ -0,0 +1,68 @@
+import pytest
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.session import InstrumentedAsyncPool
+
+
+@pytest.mark.asyncio
+async def test_db_pool_status(client: AsyncClient):
+    r = await client.get("/api/v1/health/db-pool")
+    assert r.status_code == 200
+    data = r.json()
+    assert "pool_class" in data
+    assert "checkedout" in data
+
+
+@pytest.mark.asyncio
+async def test_db_pool_status_tracks_checkouts_and_waits(client: AsyncClient, monkeypatch):
+    from app import main
+
+    pool_engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        poolclass=InstrumentedAsyncPool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    monkeypatch.setattr(main, "engine", pool_engine)
+
+    def waits() -> float:
+        return REGISTRY.get_sample_value("db_pool_wait_seconds_count") or 0.0
+
+    before = (await client.get("/api/v1/health/db-pool")).json()
+    assert before["pool_class"] == "InstrumentedAsyncPool"
+    assert before["checkedout"] == 0 and before["checkouts"] == 0
+    waits_before = waits()
+
+    try:
+        async with pool_engine.connect():
+            during = (await client.get("/api/v1/health/db-pool")).json()
+            assert during["checkedout"] == 1 and during["checkouts"] == 1
+            assert waits() == waits_before + 1
+
+            # Pool esgotado: o segundo checkout espera o pool_timeout e falha.
+            with pytest.raises(exc.TimeoutError):
+                async with pool_engine.connect():
+                    pass
+            exhausted = (await client.get("/api/v1/health/db-pool")).json()
+            assert exhausted["checkouts"] == 2 and exhausted["timeouts"] == 1
+            assert exhausted["max_wait_seconds"] >= 0.05
+            assert waits() == waits_before + 2
+
+        after = (await client.get("/api/v1/health/db-pool")).json()
+        assert after["checkedout"] == 0
+    finally:
+        await pool_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_route_latency(client: AsyncClient):
+    await client.get("/age-groups/")
+    r = await client.get("/metrics")
+    assert r.status_code == 200
+    assert 'http_request_duration_seconds_count{method="GET",route="/age-groups/",status="200"}' in r.text
+    assert "db_pool_checked_out_connections" in r.text
+    assert "db_pool_wait_seconds_bucket" in r.text
@@ -0,0 +1,70 @@
+import pytest
+from fastapi import routing
+from httpx import AsyncClient
+from redis.asyncio.client import Pipeline, Redis
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import get_session
+from app.main import create_app
+from app.utils import profiling
+
+
+@pytest.fixture
+def profiled_app(monkeypatch, engine, session, tmp_path):
+    # Restaura ao final as funções que install_profiling substitui.
+    for target, name in (
+        (routing, "solve_dependencies"),
+        (routing, "run_endpoint_function"),
+        (routing, "serialize_response"),
+        (Redis, "execute_command"),
+        (Pipeline, "execute"),
+    ):
+        monkeypatch.setattr(target, name, getattr(target, name))
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_SLOW_MS", 0)
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 1)
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+    logged: list[dict] = []
+    monkeypatch.setattr(profiling.logger, "warning", lambda event_name, **fields: logged.append(fields))
+
+    app = create_app()
+    profiling._instrument_sql(engine)
+
+    async def _get_session_override():
+        yield session
+    app.dependency_overrides[get_session] = _get_session_override
+    yield app, logged
+    for name, listener in (
+        ("before_commit", profiling._before_commit),
+        ("after_commit", profiling._after_commit),
+        ("after_rollback", profiling._after_rollback),
+    ):
+        event.remove(Session, name, listener)
+
+
+@pytest.mark.asyncio
+async def test_profiling_logs_phase_breakdown_and_dumps_profile(profiled_app, tmp_path):
+    app, logged = profiled_app
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        r_token = await client.post("/token", data={"username": settings.API_USERNAME, "password": settings.API_PASSWORD})
+        headers = {"Authorization": f"Bearer {r_token.json()['access_token']}"}
+        r = await client.post("/age-groups/", json={"name": "Perfil", "min_age": 96, "max_age": 99}, headers=headers)
+        assert r.status_code == 201
+
+    request_log = logged[-1]
+    assert request_log["route"] == "/age-groups/"
+    assert request_log["status"] == 201
+    spans = request_log["spans"]
+    for phase in ("dependencies", "auth", "endpoint", "serialization", "sql.INSERT", "db.commit"):
+        assert spans[phase]["count"] >= 1, phase
+    assert request_log["profile"].startswith(str(tmp_path))
+    assert len(list(tmp_path.glob("*.prof"))) == len(logged)
+
+
+def test_profiling_not_installed_when_disabled():
+    assert settings.PROFILING_ENABLED is False
+    app = create_app()
+    assert profiling.ProfilingMiddleware not in [middleware.cls for middleware in app.user_middleware]
+    assert profiling.span("auth") is profiling._NOOP_SPAN
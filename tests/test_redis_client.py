@@ -0,0 +1,76 @@
+import pytest
+import redis.asyncio as redis
+from redis.exceptions import ConnectionError, TimeoutError
+
+from app.queue import redis_client
+from app.queue.redis_backend import RedisQueue
+
+
+@pytest.mark.asyncio
+async def test_shared_redis_client_pool_settings():
+    url = "redis://redis-test:6379/1"
+    client = redis_client.get_redis(url)
+    assert redis_client.get_redis(url) is client
+
+    pool = client.connection_pool
+    assert isinstance(pool, redis.BlockingConnectionPool)
+    assert pool.max_connections == redis_client.REDIS_MAX_CONNECTIONS
+    assert pool.connection_kwargs["socket_keepalive"] is True
+    assert pool.connection_kwargs["retry"]._retries == redis_client.REDIS_RETRIES
+
+    queue = RedisQueue(url=url)
+    async with queue.pipeline() as pipe:
+        pipe.llen("a").llen("b")
+        assert len(pipe.command_stack) == 2
+    assert queue._client is client
+
+    await queue.close()
+    assert redis_client._clients == {}
+    assert redis_client.get_redis(url) is not client
+    await redis_client.close_redis()
+
+
+@pytest.fixture
+def fake_connection(monkeypatch):
+    """Conexões que não abrem socket: registram os comandos e falham na leitura com `error`."""
+    from redis.asyncio.connection import AbstractConnection
+    state = {"sent": [], "error": TimeoutError("Timeout reading from socket")}
+
+    async def connect(self):
+        return None
+
+    async def can_read_destructive(self):
+        return False
+
+    async def send_packed_command(self, command, check_health=True):
+        state["sent"].append(command)
+
+    async def read_response(self, *args, **kwargs):
+        raise state["error"]
+
+    async def disconnect(self, nowait=False):
+        return None
+
+    monkeypatch.setattr(AbstractConnection, "connect", connect)
+    monkeypatch.setattr(AbstractConnection, "can_read_destructive", can_read_destructive)
+    monkeypatch.setattr(AbstractConnection, "send_packed_command", send_packed_command)
+    monkeypatch.setattr(AbstractConnection, "read_response", read_response)
+    monkeypatch.setattr(AbstractConnection, "disconnect", disconnect)
+    yield state
+
+
+@pytest.mark.asyncio
+async def test_timed_out_pop_is_not_retried(fake_connection, monkeypatch):
+    monkeypatch.setattr(redis_client, "REDIS_RETRY_BACKOFF_BASE", 0)
+    queue = RedisQueue(url="redis://redis-test:6379/3")
+    with pytest.raises(TimeoutError):
+        await queue.dequeue_batch(10)
+    # O script de pop pode ter rodado no servidor: repetir perderia as tarefas.
+    assert len(fake_connection["sent"]) == 1
+
+    fake_connection["sent"].clear()
+    fake_connection["error"] = ConnectionError("Connection closed by server.")
+    with pytest.raises(ConnectionError):
+        await queue.size()
+    assert len(fake_connection["sent"]) == redis_client.REDIS_RETRIES + 1
+    await queue.close()
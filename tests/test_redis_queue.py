@@ -0,0 +1,286 @@
+import asyncio
+import json
+
+import pytest
+from redis.asyncio.client import Pipeline
+
+from app.queue import redis_backend
+from app.queue.redis_backend import (
+    BULK_PARTITIONS_KEY,
+    BULK_RING_KEY,
+    DEAD_KEY,
+    DELAYED_KEY,
+    LANE_BULK,
+    LANE_INTERACTIVE,
+    QUEUE_KEY,
+    RECEIPT_FIELD,
+    RedisQueue,
+    RedisStreamQueue,
+    with_lane,
+)
+
+
+@pytest.fixture
+def sent_commands(monkeypatch):
+    commands: list[tuple] = []
+
+    async def fake_execute(self, raise_on_error=True):
+        commands.extend(args for args, _ in self.command_stack)
+        return []
+
+    monkeypatch.setattr(Pipeline, "execute", fake_execute)
+    yield commands
+
+
+@pytest.mark.asyncio
+async def test_enqueue_many_groups_jobs_by_lane_and_partition(sent_commands):
+    queue = RedisQueue(url="redis://redis-test:6379/2")
+    await queue.enqueue_many([
+        {"enrollment_id": "1"},
+        with_lane({"enrollment_id": "2"}, LANE_BULK, "g1"),
+        with_lane({"enrollment_id": "3"}, LANE_BULK, "g2"),
+        {"enrollment_id": "4"},
+        with_lane({"enrollment_id": "5"}, LANE_BULK, "g1"),
+    ])
+
+    lpush, bulk_g1, bulk_g2 = sent_commands
+    assert lpush[:2] == ("LPUSH", QUEUE_KEY)
+    assert [json.loads(item)["enrollment_id"] for item in lpush[2:]] == ["1", "4"]
+    for command, partition, ids in ((bulk_g1, "g1", ["2", "5"]), (bulk_g2, "g2", ["3"])):
+        assert command[0] == "EVALSHA"
+        assert command[2:7] == (3, queue.partition_key(partition), BULK_RING_KEY, BULK_PARTITIONS_KEY, partition)
+        assert [json.loads(item)["enrollment_id"] for item in command[7:]] == ids
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_enqueue_lane_argument_overrides_payload(sent_commands):
+    queue = RedisQueue(url="redis://redis-test:6379/2")
+    await queue.enqueue({"enrollment_id": "1"}, lane=LANE_BULK)
+    (command,) = sent_commands
+    assert command[3] == queue.partition_key("default")
+    assert json.loads(command[-1])["lane"] == LANE_BULK
+
+    with pytest.raises(ValueError):
+        await queue.enqueue({"enrollment_id": "2"}, lane="urgent")
+    await queue.close()
+
+
+def test_stream_interactive_share():
+    queue = RedisStreamQueue(url="redis://redis-test:6379/2", interactive_weight=4, bulk_weight=1)
+    assert queue.interactive_share(20) == 16
+    assert queue.interactive_share(1) == 1
+    assert queue.streams[LANE_BULK] == f"{queue.stream}:bulk"
+
+
+@pytest.mark.asyncio
+async def test_retry_schedules_backoff_and_dead_letters(sent_commands):
+    queue = RedisQueue(url="redis://redis-test:6379/2", reliable=True, consumer="w1")
+    queue.max_attempts = 3
+    first = {"enrollment_id": "1", RECEIPT_FIELD: '{"enrollment_id": "1"}'}
+    last = {"enrollment_id": "2", "attempts": 2, RECEIPT_FIELD: '{"enrollment_id": "2", "attempts": 2}'}
+
+    assert await queue.retry([(first, "boom"), (last, "boom")]) == (1, 1)
+
+    zadd, lpush, *lrems = sent_commands
+    assert zadd[:2] == ("ZADD", DELAYED_KEY)
+    delayed = json.loads(zadd[3])
+    assert delayed == {"enrollment_id": "1", "attempts": 1, "last_error": "boom"}
+    assert lpush[:2] == ("LPUSH", DEAD_KEY)
+    dead = json.loads(lpush[2])
+    assert dead["attempts"] == 3 and "failed_at" in dead
+    assert lrems == [
+        ("LREM", queue.processing_key, 1, first[RECEIPT_FIELD]),
+        ("LREM", queue.processing_key, 1, last[RECEIPT_FIELD]),
+    ]
+    await queue.close()
+
+
+def _ids(jobs):
+    return [job["enrollment_id"] for job in jobs]
+
+
+@pytest.mark.asyncio
+async def test_weighted_pop_interleaves_lanes(live_redis):
+    queue = RedisQueue(url=live_redis, interactive_weight=2, bulk_weight=1)
+    await queue.enqueue_many([{"enrollment_id": f"i{n}"} for n in range(4)])
+    await queue.enqueue_many([{"enrollment_id": f"b{n}"} for n in range(4)], lane=LANE_BULK, partition="g1")
+
+    assert _ids(await queue.dequeue_batch(6)) == ["i0", "i1", "b0", "i2", "i3", "b1"]
+    # Com a lane interativa vazia, a bulk ocupa o lote inteiro.
+    assert _ids(await queue.dequeue_batch(6)) == ["b2", "b3"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_partitions_round_robin(live_redis):
+    queue = RedisQueue(url=live_redis)
+    await queue.enqueue_many(
+        [with_lane({"enrollment_id": f"g1-{n}"}, LANE_BULK, "g1") for n in range(3)]
+        + [with_lane({"enrollment_id": f"g2-{n}"}, LANE_BULK, "g2") for n in range(2)]
+    )
+    assert await queue.partition_sizes() == {"g1": 3, "g2": 2}
+
+    assert _ids(await queue.dequeue_batch(10)) == ["g1-0", "g2-0", "g1-1", "g2-1", "g1-2"]
+    # Partições esvaziadas saem do anel.
+    assert await queue.partition_sizes() == {}
+
+
+@pytest.mark.asyncio
+async def test_reliable_blocking_pop_ack_and_nack(live_redis, monkeypatch):
+    queue = RedisQueue(url=live_redis, reliable=True, consumer="w1")
+    client = redis_backend.get_redis(live_redis)
+    await queue.enqueue_many([{"enrollment_id": "1"}, {"enrollment_id": "2"}])
+
+    # A tarefa chega depois do pop não bloqueante: o BLMOVE a leva para a
+    # lista de processamento e o restante do lote sai pelo script.
+    real_pop = queue._pop
+    pops: list[int] = []
+
+    async def first_pop_empty(max_items):
+        pops.append(max_items)
+        return [] if len(pops) == 1 else await real_pop(max_items)
+
+    monkeypatch.setattr(queue, "_pop", first_pop_empty)
+    jobs = await queue.dequeue_batch(5, timeout=1)
+    assert _ids(jobs) == ["1", "2"]
+    assert pops == [5, 4]
+    assert sorted(await client.lrange(queue.processing_key, 0, -1)) == sorted(job[RECEIPT_FIELD] for job in jobs)
+
+    await queue.ack(jobs)
+    assert await client.llen(queue.processing_key) == 0
+
+    await queue.enqueue_many([{"enrollment_id": "3"}, with_lane({"enrollment_id": "4"}, LANE_BULK, "g1")])
+    jobs = await queue.dequeue_batch(5)
+    assert _ids(jobs) == ["3", "4"]
+    await queue.nack(jobs)
+    assert await client.llen(queue.processing_key) == 0
+    assert await client.llen(QUEUE_KEY) == 1
+    assert await queue.partition_sizes() == {"g1": 1}
+
+
+@pytest.mark.asyncio
+async def test_retry_promotes_due_jobs_and_replays_dead_letters(live_redis, monkeypatch):
+    queue = RedisQueue(url=live_redis, reliable=True, consumer="w1")
+    await queue.enqueue_many([
+        {"enrollment_id": "due"},
+        {"enrollment_id": "later"},
+        with_lane({"enrollment_id": "dead"}, LANE_BULK, "g1"),
+    ])
+    due, later, dead = await queue.dequeue_batch(3)
+    dead["attempts"] = queue.max_attempts - 1
+    delays = iter([-1.0, 3600.0])
+    monkeypatch.setattr(redis_backend, "retry_delay", lambda attempts: next(delays))
+
+    assert await queue.retry([(due, "boom"), (later, "boom"), (dead, "fatal")]) == (2, 1)
+    assert await redis_backend.get_redis(live_redis).llen(queue.processing_key) == 0
+
+    assert await queue.promote_delayed() == 1
+    assert await queue.delayed_size() == 1
+    (promoted,) = await queue.dequeue_batch(5)
+    assert promoted["enrollment_id"] == "due"
+    assert promoted["attempts"] == 1 and promoted["last_error"] == "boom"
+
+    total, letters = await queue.dead_letters()
+    assert total == 1 and letters[0]["last_error"] == "fatal"
+    assert await queue.replay_dead(10) == 1
+    assert await queue.dead_size() == 0
+    # A tarefa volta à partição bulk de origem, com as tentativas zeradas.
+    assert await queue.partition_sizes() == {"g1": 1}
+    (replayed,) = await queue.dequeue_batch(5)
+    assert replayed["enrollment_id"] == "dead" and "attempts" not in replayed
+
+
+@pytest.mark.asyncio
+async def test_requeue_orphans_skips_live_consumers(live_redis):
+    client = redis_backend.get_redis(live_redis)
+    dead = RedisQueue(url=live_redis, reliable=True, consumer="dead")
+    alive = RedisQueue(url=live_redis, reliable=True, consumer="alive")
+    for queue in (dead, alive):
+        await queue.heartbeat()
+    await dead.enqueue_many([{"enrollment_id": "1"}, with_lane({"enrollment_id": "2"}, LANE_BULK, "g1")])
+    assert len(await dead.dequeue_batch(5)) == 2
+    await alive.enqueue({"enrollment_id": "3"})
+    assert len(await alive.dequeue_batch(5)) == 1
+
+    # Com os dois heartbeats vivos nada é devolvido.
+    assert await dead.requeue_orphans() == 0
+    assert await alive.requeue_orphans() == 0
+
+    await client.delete(dead._heartbeat_key("dead"))
+    assert await alive.requeue_orphans() == 2
+    assert await client.llen(dead.processing_key) == 0
+    assert await client.llen(alive.processing_key) == 1
+    assert await client.smembers(f"{QUEUE_KEY}:consumers") == {"alive"}
+    assert sorted(_ids(await alive.dequeue_batch(5))) == ["1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_stream_reads_lanes_and_acks(live_redis):
+    queue = RedisStreamQueue(url=live_redis, consumer="w1", interactive_weight=2, bulk_weight=1)
+    client = redis_backend.get_redis(live_redis)
+    await queue.enqueue_many([{"enrollment_id": f"i{n}"} for n in range(4)])
+    await queue.enqueue_many([{"enrollment_id": f"b{n}"} for n in range(4)], lane=LANE_BULK, partition="g1")
+
+    jobs = await queue.dequeue_batch(6)
+    assert _ids(jobs) == ["i0", "i1", "i2", "i3", "b0", "b1"]
+    pending = await client.xpending(queue.stream, queue.group)
+    assert pending["pending"] == 4
+
+    await queue.ack(jobs)
+    assert await client.xpending(queue.stream, queue.group) == {
+        "pending": 0, "min": None, "max": None, "consumers": [],
+    }
+    assert await queue.lane_sizes() == {LANE_INTERACTIVE: 0, LANE_BULK: 2}
+
+    # nack republica no stream da lane e confirma a mensagem original.
+    (job,) = await queue.dequeue_batch(1)
+    await queue.nack([job])
+    assert await queue.lane_sizes() == {LANE_INTERACTIVE: 0, LANE_BULK: 2}
+    assert _ids(await queue.dequeue_batch(5)) == ["b3", "b2"]
+
+
+@pytest.mark.asyncio
+async def test_stream_claims_stalled_messages_into_the_batch(live_redis):
+    dead = RedisStreamQueue(url=live_redis, consumer="dead")
+    alive = RedisStreamQueue(url=live_redis, consumer="alive", claim_idle_ms=50)
+    await dead.enqueue_many([{"enrollment_id": "1"}, with_lane({"enrollment_id": "2"}, LANE_BULK, "g1")])
+    assert len(await dead.dequeue_batch(5)) == 2
+    await alive.enqueue({"enrollment_id": "3"})
+    await asyncio.sleep(0.1)
+
+    assert await alive.requeue_orphans() == 0
+    # As mensagens reassumidas vêm no próprio lote, antes das novas.
+    jobs = await alive.dequeue_batch(1)
+    assert _ids(jobs) == ["1"]
+    jobs += await alive.dequeue_batch(5)
+    assert _ids(jobs) == ["1", "2", "3"]
+    assert alive._claim_due is False
+
+    await alive.ack(jobs)
+    assert await alive.size() == 0
+    assert await alive.dequeue_batch(5) == []
+
+
+@pytest.mark.asyncio
+async def test_stream_dead_letters_and_replay(live_redis, monkeypatch):
+    queue = RedisStreamQueue(url=live_redis, consumer="w1")
+    queue.max_attempts = 2
+    monkeypatch.setattr(redis_backend, "retry_delay", lambda attempts: -1.0)
+    await queue.enqueue(with_lane({"enrollment_id": "1"}, LANE_BULK, "g1"))
+
+    (job,) = await queue.dequeue_batch(5)
+    assert await queue.retry([(job, "boom")]) == (1, 0)
+    assert await queue.size() == 0
+    assert await queue.promote_delayed() == 1
+    (job,) = await queue.dequeue_batch(5)
+    assert job["attempts"] == 1 and job["lane"] == LANE_BULK
+
+    assert await queue.retry([(job, "fatal")]) == (0, 1)
+    total, letters = await queue.dead_letters()
+    assert total == 1 and letters[0]["attempts"] == 2 and letters[0]["last_error"] == "fatal"
+    assert await queue.size() == 0
+
+    assert await queue.replay_dead(10) == 1
+    assert await queue.lane_sizes() == {LANE_INTERACTIVE: 0, LANE_BULK: 1}
+    (job,) = await queue.dequeue_batch(5)
+    assert job["enrollment_id"] == "1" and "attempts" not in job
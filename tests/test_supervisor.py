@@ -0,0 +1,159 @@
+import signal
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from worker import supervisor
+
+
+class FakeProcess:
+    """Processo filho falso: termina quando recebe SIGTERM ou `kill`."""
+
+    def __init__(self, pids, target=None, name=None):
+        self.pid = next(pids)
+        self.name = name
+        self.alive = False
+        self.exitcode = None
+        self.signals: list[int] = []
+        self.joins: list = []
+        self.exit_on_sigterm = True
+
+    def start(self):
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def exit(self, code):
+        self.alive = False
+        self.exitcode = code
+
+    def join(self, timeout=None):
+        self.joins.append(timeout)
+
+    def kill(self):
+        self.exit(-signal.SIGKILL)
+
+
+class FakeContext:
+    def __init__(self):
+        self.processes: list[FakeProcess] = []
+        self._pids = iter(range(1000, 2000))
+
+    def Process(self, target, name):
+        process = FakeProcess(self._pids, target, name)
+        self.processes.append(process)
+        return process
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_children(monkeypatch):
+    context = FakeContext()
+    clock = FakeTime()
+
+    def fake_kill(pid, signum):
+        process = next(p for p in context.processes if p.pid == pid)
+        process.signals.append(signum)
+        if process.exit_on_sigterm:
+            process.exit(0)
+
+    monkeypatch.setattr(supervisor, "time", clock)
+    monkeypatch.setattr(supervisor.os, "kill", fake_kill)
+    monkeypatch.setattr(supervisor, "configure_logging", lambda: None)
+    monkeypatch.setenv("ENROLLMENT_WORKER_SUPERVISED", "0")
+
+    def build(processes: int) -> supervisor.Supervisor:
+        sup = supervisor.Supervisor(processes=processes)
+        sup._context = context
+        return sup
+
+    yield build, context, clock
+
+
+def test_dead_child_restarts_with_exponential_backoff(fake_children, monkeypatch):
+    build, context, clock = fake_children
+    monkeypatch.setattr(supervisor, "RESTART_BACKOFF_MAX", 4)
+    sup = build(1)
+    (slot,) = sup._slots
+
+    sup._check(slot)
+    delays = []
+    for _ in range(4):
+        context.processes[-1].exit(1)
+        sup._check(slot)
+        assert slot.process is None
+        delays.append(slot.restart_at - clock.now)
+        clock.now = slot.restart_at - 0.1
+        sup._check(slot)
+        assert slot.process is None
+        clock.now = slot.restart_at
+        sup._check(slot)
+        assert slot.process is context.processes[-1] and slot.process.is_alive()
+    assert delays == [1, 2, 4, 4]
+    assert len(context.processes) == 5
+
+    # Um filho estável por mais de STABLE_AFTER zera o backoff.
+    clock.now += supervisor.STABLE_AFTER + 1
+    sup._check(slot)
+    assert slot.failures == 0
+    context.processes[-1].exit(1)
+    sup._check(slot)
+    assert slot.restart_at - clock.now == 1
+
+
+def test_shutdown_forwards_sigterm_and_stops_restarts(fake_children):
+    build, context, clock = fake_children
+    sup = build(3)
+    for slot in sup._slots:
+        sup._check(slot)
+    context.processes[0].exit(1)
+    sup._check(sup._slots[0])
+
+    sup.request_shutdown(signal.SIGTERM)
+    sup.request_shutdown(signal.SIGTERM)
+    assert [process.signals for process in context.processes] == [[], [signal.SIGTERM], [signal.SIGTERM]]
+
+    clock.now += supervisor.RESTART_BACKOFF_MAX
+    for slot in sup._slots:
+        sup._check(slot)
+    assert len(context.processes) == 3
+
+
+def test_run_drains_children_and_kills_after_timeout(fake_children, monkeypatch):
+    build, context, clock = fake_children
+    monkeypatch.setattr(supervisor, "SHUTDOWN_TIMEOUT", 5)
+    monkeypatch.setattr(supervisor.signal, "signal", lambda signum, handler: None)
+    sup = build(2)
+
+    def sleep(seconds):
+        # Primeira volta do loop: um filho ignora o SIGTERM e o supervisor é parado.
+        context.processes[1].exit_on_sigterm = False
+        clock.now += 1
+        sup.request_shutdown(signal.SIGTERM)
+
+    clock.sleep = sleep
+    sup.run()
+
+    graceful, stuck = context.processes
+    assert graceful.signals == [signal.SIGTERM] and graceful.exitcode == 0
+    assert stuck.signals == [signal.SIGTERM] and stuck.exitcode == -signal.SIGKILL
+    assert graceful.joins == [5] and stuck.joins[0] == 5 and len(stuck.joins) == 2
+
+
+def test_rules_module_has_no_import_side_effects():
+    code = (
+        "import sys, worker.rules; "
+        "loaded = [m for m in ('worker.processor', 'app.queue.redis_backend', 'app.db.session') if m in sys.modules]; "
+        "assert not loaded, loaded"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=Path(__file__).resolve().parent.parent)
@@ -0,0 +1,180 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.age_group import AgeGroup
+from app.models.enrollment import Enrollment
+from app.queue.redis_backend import redis_queue
+from worker.outbox_relay import relay_batch
+from worker.processor import process_batch
+
+
+@pytest.mark.asyncio
+async def test_process_batch_approves_pending_enrollments(client: AsyncClient, auth_token: str, session, mock_redis_queue, sql_statements):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    r_age_group = await client.post("/age-groups/", json={"name": "Worker", "min_age": 60, "max_age": 70}, headers=headers)
+    assert r_age_group.status_code == 201
+    age_group_id = r_age_group.json()["id"]
+    while await relay_batch(session):
+        pass
+    mock_redis_queue.clear()
+
+    ids = []
+    for i in range(3):
+        payload = {"name": f"Worker {i}", "email": f"worker{i}@test.com", "age": 65, "age_group_id": age_group_id}
+        r = await client.post("/enrollments/", json=payload, headers=headers)
+        assert r.status_code == 201
+        ids.append(r.json()["id"])
+
+    assert mock_redis_queue == []
+    assert await relay_batch(session) == 3
+    assert await relay_batch(session) == 0
+    jobs = await redis_queue.dequeue_batch(10)
+    assert [job["enrollment_id"] for job in jobs] == ids
+    sql_statements.clear()
+    processed, locked = await process_batch(session, jobs)
+    assert processed == 3 and locked == []
+    # SELECT dos pendentes, UPDATE em executemany e upsert dos contadores.
+    assert [stmt.split()[0] for stmt in sql_statements] == ["SELECT", "UPDATE", "INSERT"]
+
+    r_stats = await client.get("/enrollments/stats")
+    group = next(g for g in r_stats.json()["by_age_group"] if g["age_group_id"] == age_group_id)
+    assert group["counts"] == {"approved": 3}
+
+    for eid in ids:
+        r_get = await client.get(f"/enrollments/{eid}")
+        assert r_get.json()["status"] == "approved"
+        assert r_get.json()["processed_at"] is not None
+
+    assert await process_batch(session, jobs) == (0, [])
+
+
+@pytest.mark.asyncio
+async def test_worker_drains_prefetched_batches_on_shutdown(monkeypatch, mock_redis_queue):
+    from contextlib import asynccontextmanager
+    import asyncio
+    from worker import processor
+
+    handled: list[list[dict]] = []
+    in_flight = 0
+    max_in_flight = 0
+
+    @asynccontextmanager
+    async def fake_session():
+        yield None
+
+    async def fake_process_batch(session, jobs, executor=None):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        handled.append(jobs)
+        return len(jobs), []
+
+    monkeypatch.setattr(processor, "get_session", fake_session)
+    monkeypatch.setattr(processor, "process_batch", fake_process_batch)
+    monkeypatch.setattr(processor, "BATCH_SIZE", 2)
+    monkeypatch.setattr(processor, "configure_logging", lambda: None)
+
+    mock_redis_queue.extend({"enrollment_id": str(i)} for i in range(10))
+    worker = processor.Worker(concurrency=3, prefetch=2, outbox_relay=False)
+    task = asyncio.create_task(worker.run())
+    await asyncio.sleep(0.01)
+    worker.request_shutdown()
+    await asyncio.wait_for(task, timeout=5)
+
+    assert sum(len(jobs) for jobs in handled) + len(mock_redis_queue) == 10
+    assert max_in_flight > 1
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_isolates_poison_job(monkeypatch, queue_retries):
+    from contextlib import asynccontextmanager
+    from worker import processor
+
+    acked: list[dict] = []
+
+    @asynccontextmanager
+    async def fake_session():
+        yield None
+
+    async def fake_process_batch(session, jobs, executor=None):
+        if any(job.get("poison") for job in jobs):
+            raise RuntimeError("deadlock detected")
+        return len(jobs), []
+
+    async def fake_ack(jobs):
+        acked.extend(jobs)
+
+    monkeypatch.setattr(processor, "get_session", fake_session)
+    monkeypatch.setattr(processor, "process_batch", fake_process_batch)
+    monkeypatch.setattr(redis_queue, "ack", fake_ack)
+
+    jobs = [{"enrollment_id": "1"}, {"enrollment_id": "2", "poison": True}, {"enrollment_id": "3"}]
+    worker = processor.Worker(outbox_relay=False)
+    await asyncio.wait_for(worker._handle_batch(jobs), timeout=1)
+
+    assert [job["enrollment_id"] for job in acked] == ["1", "3"]
+    assert [(job["enrollment_id"], error) for job, error in queue_retries] == [("2", "RuntimeError: deadlock detected")]
+
+
+@pytest.mark.asyncio
+async def test_process_batch_returns_jobs_locked_by_another_transaction(postgres_engine):
+    maker = sessionmaker(bind=postgres_engine, class_=AsyncSession, expire_on_commit=False)
+    async with maker() as worker_session, maker() as other_session:
+        age_group = AgeGroup(name="Lock", min_age=0, max_age=99)
+        worker_session.add(age_group)
+        await worker_session.commit()
+        enrollments = [
+            Enrollment(name=f"Lock {i}", email=f"lock{i}@test.com", age=30, age_group_id=age_group.id)
+            for i in range(2)
+        ]
+        worker_session.add_all(enrollments)
+        await worker_session.commit()
+        jobs = [{"enrollment_id": str(enrollment.id)} for enrollment in enrollments]
+
+        # Outra transação (ex: o PATCH de status) segura o lock da primeira inscrição.
+        await other_session.exec(
+            select(Enrollment).where(Enrollment.id == enrollments[0].id).with_for_update()
+        )
+        assert await process_batch(worker_session, jobs) == (1, [jobs[0]])
+
+        await other_session.rollback()
+        assert await process_batch(worker_session, jobs) == (1, [])
+
+
+@pytest.mark.asyncio
+async def test_locked_jobs_are_requeued_instead_of_acked(monkeypatch, mock_redis_queue):
+    from contextlib import asynccontextmanager
+    from worker import processor
+
+    acked: list[dict] = []
+    jobs = [{"enrollment_id": "1"}, {"enrollment_id": "2"}, {"enrollment_id": "3"}]
+
+    @asynccontextmanager
+    async def fake_session():
+        yield None
+
+    async def fake_process_batch(session, batch, executor=None):
+        return 2, [job for job in batch if job["enrollment_id"] == "2"]
+
+    async def fake_ack(batch):
+        acked.extend(batch)
+
+    monkeypatch.setattr(processor, "get_session", fake_session)
+    monkeypatch.setattr(processor, "process_batch", fake_process_batch)
+    monkeypatch.setattr(redis_queue, "ack", fake_ack)
+    worker = processor.Worker(outbox_relay=False)
+
+    for reliable in (True, False):
+        monkeypatch.setattr(redis_queue, "reliable", reliable)
+        acked.clear()
+        mock_redis_queue.clear()
+        await asyncio.wait_for(worker._handle_batch(jobs), timeout=1)
+        assert [job["enrollment_id"] for job in acked] == ["1", "3"]
+        assert [job["enrollment_id"] for job in mock_redis_queue] == ["2"]
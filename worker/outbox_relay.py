@@ -0,0 +1,130 @@
+"""
+Relay do transactional outbox para a fila Redis.
+
+Move as mensagens da tabela `outbox` para o Redis em lotes (um único pipeline
+por lote, respeitando a lane de cada tarefa) e as remove na mesma transação em que
+foram bloqueadas. Vários relays podem rodar em paralelo: o SELECT usa
+`FOR UPDATE SKIP LOCKED`. A entrega é at-least-once; jobs repetidos são
+ignorados pelo worker porque a inscrição já não estará pendente.
+
+Roda dentro do worker (`ENROLLMENT_OUTBOX_RELAY=1`, padrão) ou isolado:
+    python -m worker.outbox_relay
+"""
+
+import asyncio
+import os
+import signal
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.session import build_engine
+from app.models.outbox import OutboxMessage
+from app.queue.redis_backend import redis_queue
+from app.utils.logger import configure_logging, logger
+from app.utils.metrics import OUTBOX_RELAYED
+
+
+RELAY_BATCH = int(os.getenv("ENROLLMENT_OUTBOX_BATCH", "500"))
+RELAY_INTERVAL = float(os.getenv("ENROLLMENT_OUTBOX_INTERVAL", "0.5"))
+ERROR_BACKOFF = 2
+
+
+async def relay_batch(session: AsyncSession, limit: int = RELAY_BATCH) -> int:
+    """
+    Envia um lote do outbox para o Redis e remove as mensagens enviadas.
+    
+    Args:
+        session: Sessão do banco de dados (a transação é confirmada)
+        limit: Número máximo de mensagens no lote
+        
+    Returns:
+        int: Número de mensagens enviadas
+    """
+    result = await session.exec(
+        select(OutboxMessage.id, OutboxMessage.payload)
+        .order_by(OutboxMessage.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    rows = result.all()
+    if not rows:
+        await session.rollback()
+        return 0
+
+    await redis_queue.enqueue_many([payload for _, payload in rows])
+    await session.exec(delete(OutboxMessage).where(OutboxMessage.id.in_([message_id for message_id, _ in rows])))
+    await session.commit()
+    OUTBOX_RELAYED.inc(len(rows))
+    return len(rows)
+
+
+class OutboxRelay:
+    """Drena o outbox continuamente até a parada ser solicitada."""
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        batch_size: int = RELAY_BATCH,
+        interval: float = RELAY_INTERVAL,
+    ):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.interval = interval
+        self._stop = asyncio.Event()
+
+    def request_shutdown(self) -> None:
+        """Solicita parada do relay após o lote em andamento."""
+        self._stop.set()
+
+    async def _wait(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self) -> None:
+        """
+        Loop do relay.
+        
+        Lotes cheios são seguidos imediatamente pelo próximo; com o outbox
+        vazio ou parcial, aguarda `interval` segundos antes de consultar de novo.
+        """
+        logger.info("Outbox relay started", batch_size=self.batch_size, interval=self.interval)
+        while not self._stop.is_set():
+            try:
+                async with AsyncSession(self.engine, expire_on_commit=False) as session:
+                    relayed = await relay_batch(session, self.batch_size)
+                if relayed:
+                    logger.debug("Relayed outbox messages", count=relayed)
+            except Exception as e:
+                logger.error("Outbox relay error", error=str(e))
+                await self._wait(ERROR_BACKOFF)
+                continue
+            if relayed < self.batch_size:
+                await self._wait(self.interval)
+        logger.info("Outbox relay stopped")
+
+
+async def main() -> None:
+    """Executa o relay isolado, com engine próprio."""
+    configure_logging()
+    engine = build_engine("worker")
+    relay = OutboxRelay(engine)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, relay.request_shutdown)
+    try:
+        await relay.run()
+    finally:
+        await redis_queue.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
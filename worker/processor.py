@@ -8,20 +8,54 @@ aplicando regras de negócio e atualizando status no banco de dados.
 import asyncio
 import os
 import signal
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+import multiprocessing
 from datetime import datetime, UTC
+from uuid import UUID
 from contextlib import asynccontextmanager
 from collections.abc import AsyncGenerator
 
+from sqlalchemy import bindparam, update
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.queue.redis_backend import redis_queue
-from app.db.session import engine
+from prometheus_client import start_http_server
+
+from app.queue.redis_backend import redis_queue, HEARTBEAT_TTL, ENQUEUED_AT_FIELD
+from app.db.session import build_engine, pool_status
+from app.models.age_group import AgeGroup  # noqa: F401 - registra o mapper do relacionamento
 from app.models.enrollment import Enrollment, EnrollmentStatus
+from app.services.stats_services import apply_stats_deltas, status_change_deltas
+from worker.outbox_relay import OutboxRelay
+from worker.rules import apply_business_rules_batch
 from app.utils.logger import configure_logging, logger
+from app.utils.metrics import (
+    WORKER_BATCH_DURATION,
+    WORKER_BATCH_SIZE,
+    WORKER_END_TO_END_LAG,
+    WORKER_JOBS,
+    WORKER_QUEUE_DEPTH,
+    WORKER_QUEUE_LANE_DEPTH,
+    WORKER_DEAD_LETTER_DEPTH,
+    instrument_engine,
+    update_pool_gauges,
+)
 
 
 BATCH_SIZE = int(os.getenv("ENROLLMENT_WORKER_BATCH", "20"))
 IDLE_BACKOFF = float(os.getenv("ENROLLMENT_WORKER_IDLE_BACKOFF", "2"))
+CONCURRENCY = int(os.getenv("ENROLLMENT_WORKER_CONCURRENCY", "1"))
+PREFETCH = int(os.getenv("ENROLLMENT_WORKER_PREFETCH", "1"))
+RULES_PROCESSES = int(os.getenv("ENROLLMENT_WORKER_RULES_PROCESSES", "0"))
+METRICS_PORT = int(os.getenv("ENROLLMENT_WORKER_METRICS_PORT", "0"))
+OUTBOX_RELAY = os.getenv("ENROLLMENT_OUTBOX_RELAY", "1").lower() in ("1", "true", "yes")
+ERROR_BACKOFF = 2
+MAINTENANCE_INTERVAL = max(HEARTBEAT_TTL / 3, 1)
+RETRY_POLL_INTERVAL = float(os.getenv("ENROLLMENT_RETRY_POLL_INTERVAL", "1"))
+
+engine = build_engine("worker")
+instrument_engine(engine)
 
 
 @asynccontextmanager
@@ -34,109 +68,378 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         await async_session.close()
 
 
-def apply_business_rules(enrollment: Enrollment) -> EnrollmentStatus:
+_enrollments = Enrollment.__table__
+_STATUS_UPDATE = (
+    update(_enrollments)
+    .where(_enrollments.c.id == bindparam("b_id"))
+    .values(status=bindparam("b_status"), processed_at=bindparam("b_processed_at"))
+)
+
+
+async def evaluate_batch(
+    enrollments: list[Enrollment],
+    executor: Executor | None = None,
+) -> list[EnrollmentStatus]:
     """
-    Aplica regras de negócio para determinar o status da inscrição.
+    Calcula os novos status do lote, opcionalmente em outro processo.
     
     Args:
-        enrollment: Inscrição a ser avaliada
+        enrollments: Inscrições carregadas na sessão
+        executor: Pool de processos para regras CPU-bound (None executa inline)
         
     Returns:
-        EnrollmentStatus: Novo status da inscrição
-        
-    Note:
-        Implementação atual sempre aprova. Expanda conforme necessário.
+        list[EnrollmentStatus]: Status na mesma ordem das inscrições
     """
-    return EnrollmentStatus.approved
+    if executor is None:
+        return apply_business_rules_batch(enrollments)
+    # Cópias desanexadas da sessão para serialização entre processos.
+    snapshots = [Enrollment(**enrollment.model_dump()) for enrollment in enrollments]
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, apply_business_rules_batch, snapshots)
 
 
-async def process_batch(session: AsyncSession) -> int:
+async def process_batch(
+    session: AsyncSession,
+    jobs: list[dict],
+    executor: Executor | None = None,
+) -> tuple[int, list[dict]]:
     """
-    Processa um lote de inscrições da fila Redis.
+    Processa um lote de inscrições retirado da fila Redis.
+    
+    Carrega todas as inscrições pendentes do lote com um único SELECT
+    `FOR UPDATE SKIP LOCKED` e grava os novos status com um único UPDATE
+    em executemany. Linhas bloqueadas por outra transação (outro worker, o
+    PATCH de status ou a atualização em massa) são puladas, o que torna
+    seguro processar lotes sobrepostos em paralelo; as que continuam
+    pendentes são devolvidas para o chamador reenfileirar em vez de confirmar.
     
     Args:
         session: Sessão do banco de dados
+        jobs: Tarefas retornadas por `redis_queue.dequeue_batch`
+        executor: Pool de processos opcional para `apply_business_rules`
         
     Returns:
-        int: Número de inscrições processadas
+        tuple[int, list[dict]]: Inscrições processadas e tarefas cujas
+        inscrições ainda pendentes estavam bloqueadas
     """
-    jobs = await redis_queue.dequeue_batch(BATCH_SIZE)
-    if not jobs:
-        return 0
-        
-    processed = 0
+    ids: set[UUID] = set()
     for job in jobs:
         enrollment_id = job.get("enrollment_id") if isinstance(job, dict) else None
         if not enrollment_id:
             continue
-            
-        enrollment = await session.get(Enrollment, enrollment_id)
-        if not enrollment:
-            logger.warning("Enrollment not found for job", enrollment_id=enrollment_id)
-            continue
-            
-        if enrollment.status != EnrollmentStatus.pending:
-            continue
-            
-        new_status = apply_business_rules(enrollment)
-        enrollment.status = new_status
-        enrollment.processed_at = datetime.now(UTC)
-        session.add(enrollment)
-        processed += 1
-        
-    if processed:
-        await session.commit()
-    return processed
+        try:
+            ids.add(UUID(enrollment_id))
+        except ValueError:
+            logger.warning("Invalid enrollment id in job", enrollment_id=enrollment_id)
+    if not ids:
+        return 0, []
+
+    result = await session.exec(
+        select(Enrollment)
+        .where(Enrollment.id.in_(ids), Enrollment.status == EnrollmentStatus.pending)
+        .with_for_update(skip_locked=True)
+    )
+    enrollments = result.all()
+    locked: set[UUID] = set()
+    skipped = ids - {enrollment.id for enrollment in enrollments}
+    if skipped:
+        # Leitura sem lock: o que ainda aparece pendente foi pulado pelo SKIP LOCKED.
+        locked = set((await session.exec(
+            select(Enrollment.id)
+            .where(Enrollment.id.in_(skipped), Enrollment.status == EnrollmentStatus.pending)
+        )).all())
+        logger.debug("Skipped enrollments not pending or locked", count=len(skipped), locked=len(locked))
+    locked_jobs = [job for job in jobs if _job_enrollment_id(job) in locked]
+    if not enrollments:
+        await session.rollback()
+        return 0, locked_jobs
+
+    statuses = await evaluate_batch(enrollments, executor)
+    processed_at = datetime.now(UTC)
+    await session.exec(
+        _STATUS_UPDATE,
+        params=[
+            {"b_id": enrollment.id, "b_status": new_status, "b_processed_at": processed_at}
+            for enrollment, new_status in zip(enrollments, statuses)
+        ],
+    )
+    await apply_stats_deltas(session, status_change_deltas([
+        (enrollment.age_group_id, enrollment.status, new_status)
+        for enrollment, new_status in zip(enrollments, statuses)
+    ]))
+    await session.commit()
+    return len(enrollments), locked_jobs
+
+
+def _job_enrollment_id(job: dict) -> UUID | None:
+    enrollment_id = job.get("enrollment_id") if isinstance(job, dict) else None
+    try:
+        return UUID(enrollment_id) if enrollment_id else None
+    except ValueError:
+        return None
+
+
+def _observe_lag(jobs: list[dict]) -> None:
+    """Registra o tempo entre o enfileiramento e o fim do processamento."""
+    now = time.time()
+    for job in jobs:
+        enqueued_at = job.get(ENQUEUED_AT_FIELD) if isinstance(job, dict) else None
+        if isinstance(enqueued_at, (int, float)):
+            WORKER_END_TO_END_LAG.observe(max(0.0, now - enqueued_at))
 
 
 class Worker:
-    """Worker assíncrono para processar filas de inscrições."""
+    """
+    Worker assíncrono para processar filas de inscrições.
     
-    def __init__(self):
+    Um prefetcher mantém até `prefetch` lotes já retirados do Redis enquanto
+    `concurrency` consumidores processam lotes em paralelo, cada um com sua
+    própria sessão, sobrepondo as idas ao Redis e ao banco.
+    """
+    
+    def __init__(
+        self,
+        concurrency: int = CONCURRENCY,
+        prefetch: int = PREFETCH,
+        rules_processes: int = RULES_PROCESSES,
+        outbox_relay: bool = OUTBOX_RELAY,
+    ):
         self._stop = asyncio.Event()
+        self.concurrency = max(1, concurrency)
+        self.prefetch = max(1, prefetch)
+        self.rules_processes = max(0, rules_processes)
+        self._batches: asyncio.Queue[list[dict] | None] = asyncio.Queue(maxsize=self.prefetch)
+        self._rules_pool: ProcessPoolExecutor | None = None
+        self._outbox_relay = OutboxRelay(engine) if outbox_relay else None
 
     def request_shutdown(self):
         """Solicita parada graceful do worker."""
         logger.info("Shutdown signal received")
         self._stop.set()
+        if self._outbox_relay is not None:
+            self._outbox_relay.request_shutdown()
 
-    async def run(self):
+    async def _maintain_queue(self):
+        """Renova o heartbeat do consumidor e devolve tarefas de workers mortos."""
+        while not self._stop.is_set():
+            try:
+                await redis_queue.heartbeat()
+                requeued = await redis_queue.requeue_orphans()
+                if requeued:
+                    logger.warning("Requeued orphaned jobs", count=requeued)
+                status = pool_status(engine)
+                update_pool_gauges(status)
+                logger.debug("Database pool status", **status)
+                lane_sizes = await redis_queue.lane_sizes()
+                for lane, depth in lane_sizes.items():
+                    WORKER_QUEUE_LANE_DEPTH.labels(lane).set(depth)
+                WORKER_QUEUE_DEPTH.set(sum(lane_sizes.values()))
+                WORKER_DEAD_LETTER_DEPTH.set(await redis_queue.dead_size())
+            except Exception as e:
+                logger.error("Queue maintenance error", error=str(e))
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=MAINTENANCE_INTERVAL)
+            except asyncio.TimeoutError:
+                continue
+
+    async def _prefetch_batches(self):
         """
-        Loop principal do worker.
+        Retira lotes do Redis até a parada ser solicitada.
         
-        Processa lotes de inscrições continuamente até receber
-        sinal de parada.
+        A fila interna limitada aplica backpressure; ao parar, envia um
+        sentinela por consumidor depois dos lotes já retirados, que são
+        processados antes do encerramento.
         """
-        configure_logging()
-        logger.info("Enrollment worker started", batch_size=BATCH_SIZE)
-        
         while not self._stop.is_set():
             try:
-                async with get_session() as session:
-                    processed = await process_batch(session)
-                    
-                if processed:
-                    logger.info("Processed enrollments", count=processed)
-                    await asyncio.sleep(0)
-                else:
-                    await asyncio.wait_for(self._stop.wait(), timeout=IDLE_BACKOFF)
-                    
+                jobs = await redis_queue.dequeue_batch(BATCH_SIZE, timeout=IDLE_BACKOFF)
+            except Exception as e:
+                logger.error("Worker dequeue error", error=str(e))
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=ERROR_BACKOFF)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            if jobs:
+                await self._batches.put(jobs)
+        for _ in range(self.concurrency):
+            await self._batches.put(None)
+
+    async def _promote_delayed(self):
+        """Devolve à fila as tarefas cujo backoff de retentativa já venceu."""
+        while not self._stop.is_set():
+            try:
+                while await redis_queue.promote_delayed() > 0:
+                    pass
+            except Exception as e:
+                logger.error("Delayed jobs promotion error", error=str(e))
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=RETRY_POLL_INTERVAL)
             except asyncio.TimeoutError:
                 continue
+
+    async def _handle_batch(self, jobs: list[dict]):
+        """Processa um lote em sessão própria, confirmando as tarefas após o commit."""
+        WORKER_BATCH_SIZE.observe(len(jobs))
+        started_at = time.perf_counter()
+        try:
+            async with get_session() as session:
+                processed, locked = await process_batch(session, jobs, self._rules_pool)
+        except Exception as e:
+            logger.warning("Batch failed, processing jobs individually", error=str(e), count=len(jobs))
+            await self._handle_jobs_individually(jobs)
+            return
+        done = await self._settle(jobs, locked)
+        WORKER_BATCH_DURATION.observe(time.perf_counter() - started_at)
+        WORKER_JOBS.labels("processed").inc(processed)
+        WORKER_JOBS.labels("skipped").inc(len(done) - processed)
+        _observe_lag(done)
+        if processed:
+            logger.info("Processed enrollments", count=processed)
+
+    async def _handle_jobs_individually(self, jobs: list[dict]):
+        """
+        Reprocessa um lote que falhou tarefa a tarefa.
+
+        Isola a tarefa problemática: as demais são confirmadas normalmente e
+        as que falharem de novo são reagendadas com backoff (ou enviadas à
+        dead-letter queue), sem pausar o worker.
+        """
+        succeeded: list[dict] = []
+        locked: list[dict] = []
+        failures: list[tuple[dict, str]] = []
+        processed = 0
+        for job in jobs:
+            try:
+                async with get_session() as session:
+                    job_processed, job_locked = await process_batch(session, [job], self._rules_pool)
+                processed += job_processed
+                locked.extend(job_locked)
+                succeeded.append(job)
             except Exception as e:
-                logger.error("Worker iteration error", error=str(e))
-                await asyncio.sleep(2)
+                failures.append((job, f"{type(e).__name__}: {e}"))
+
+        if succeeded:
+            done = await self._settle(succeeded, locked)
+            WORKER_JOBS.labels("processed").inc(processed)
+            WORKER_JOBS.labels("skipped").inc(len(done) - processed)
+            _observe_lag(done)
+        if not failures:
+            return
+        try:
+            retried, dead = await redis_queue.retry(failures)
+        except Exception as e:
+            WORKER_JOBS.labels("failed").inc(len(failures))
+            logger.error("Failed to reschedule jobs", error=str(e), count=len(failures))
+            return
+        WORKER_JOBS.labels("retried").inc(retried)
+        WORKER_JOBS.labels("dead").inc(dead)
+        logger.warning("Jobs failed", retried=retried, dead_lettered=dead, error=failures[0][1])
+
+    async def _settle(self, jobs: list[dict], locked: list[dict]) -> list[dict]:
+        """
+        Confirma as tarefas concluídas e devolve à fila as bloqueadas.
+
+        Tarefas cujas inscrições estavam bloqueadas por outra transação ainda
+        pendentes não podem ser confirmadas, senão nunca seriam processadas.
+
+        Returns:
+            list[dict]: Tarefas confirmadas
+        """
+        if not locked:
+            await self._ack(jobs)
+            return jobs
+        locked_ids = {id(job) for job in locked}
+        done = [job for job in jobs if id(job) not in locked_ids]
+        if done:
+            await self._ack(done)
+        try:
+            if redis_queue.reliable:
+                await redis_queue.nack(locked)
+            else:
+                # Sem recibo não há o que devolver: a tarefa é enfileirada de novo.
+                await redis_queue.enqueue_many(locked)
+        except Exception as e:
+            logger.error("Failed to requeue locked jobs", error=str(e), count=len(locked))
+        WORKER_JOBS.labels("locked").inc(len(locked))
+        logger.info("Requeued jobs with locked enrollments", count=len(locked))
+        return done
+
+    async def _ack(self, jobs: list[dict]):
+        """Confirma tarefas já gravadas; se falhar, a reentrega é inofensiva."""
+        try:
+            await redis_queue.ack(jobs)
+        except Exception as e:
+            logger.error("Failed to ack jobs", error=str(e), count=len(jobs))
+
+    async def _consume_batches(self):
+        """Consome lotes da fila interna até receber o sentinela de parada."""
+        while True:
+            jobs = await self._batches.get()
+            if jobs is None:
+                return
+            await self._handle_batch(jobs)
+
+    async def run(self):
+        """
+        Loop principal do worker.
+        
+        Processa lotes de inscrições continuamente até receber
+        sinal de parada. A leitura da fila bloqueia por até `IDLE_BACKOFF`
+        segundos, então tarefas novas são atendidas imediatamente. Na parada,
+        os lotes em andamento e os já pré-carregados são concluídos.
+        """
+        configure_logging()
+        logger.info(
+            "Enrollment worker started",
+            batch_size=BATCH_SIZE,
+            concurrency=self.concurrency,
+            prefetch=self.prefetch,
+            rules_processes=self.rules_processes,
+            reliable=redis_queue.reliable,
+            consumer=redis_queue.consumer,
+            outbox_relay=self._outbox_relay is not None,
+        )
+        if self.rules_processes:
+            self._rules_pool = ProcessPoolExecutor(
+                max_workers=self.rules_processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        maintenance = asyncio.create_task(self._maintain_queue())
+        promoter = asyncio.create_task(self._promote_delayed())
+        relay = asyncio.create_task(self._outbox_relay.run()) if self._outbox_relay else None
+        consumers = [asyncio.create_task(self._consume_batches()) for _ in range(self.concurrency)]
+        
+        await self._prefetch_batches()
+        await asyncio.gather(*consumers)
+        if relay is not None:
+            await relay
                 
+        if self._rules_pool is not None:
+            self._rules_pool.shutdown(wait=True)
+            self._rules_pool = None
+        for task in (maintenance, promoter):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
         logger.info("Enrollment worker stopping")
 
 
 async def main():
     """Função principal que configura e executa o worker."""
+    if METRICS_PORT and not os.getenv("ENROLLMENT_WORKER_SUPERVISED"):
+        start_http_server(METRICS_PORT)
     worker = Worker()
     loop = asyncio.get_running_loop()
     for sig in (signal.SIGINT, signal.SIGTERM):
         loop.add_signal_handler(sig, worker.request_shutdown)
-    await worker.run()
+    try:
+        await worker.run()
+    finally:
+        await redis_queue.close()
+        await engine.dispose()
 
 
 if __name__ == "__main__":
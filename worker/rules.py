@@ -0,0 +1,35 @@
+"""
+Regras de negócio das inscrições.
+
+Módulo sem efeitos colaterais na importação (sem engine, Redis ou outbox):
+é o que os processos do `ProcessPoolExecutor` do worker importam para
+avaliar os lotes.
+"""
+
+from app.models.age_group import AgeGroup  # noqa: F401 - registra o mapper do relacionamento
+from app.models.enrollment import Enrollment, EnrollmentStatus
+
+
+def apply_business_rules(enrollment: Enrollment) -> EnrollmentStatus:
+    """
+    Aplica regras de negócio para determinar o status da inscrição.
+    
+    Args:
+        enrollment: Inscrição a ser avaliada
+        
+    Returns:
+        EnrollmentStatus: Novo status da inscrição
+        
+    Note:
+        Implementação atual sempre aprova. Expanda conforme necessário.
+    """
+    return EnrollmentStatus.approved
+
+
+def apply_business_rules_batch(enrollments: list[Enrollment]) -> list[EnrollmentStatus]:
+    """
+    Aplica as regras de negócio a um lote inteiro.
+    
+    Função de módulo (serializável) para poder rodar em um ProcessPoolExecutor.
+    """
+    return [apply_business_rules(enrollment) for enrollment in enrollments]
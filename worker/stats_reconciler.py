@@ -0,0 +1,70 @@
+"""
+Reconciliação periódica dos contadores de `enrollment_stats`.
+
+Os contadores são mantidos incrementalmente pela API e pelo worker; este job
+os corrige, uma faixa etária por vez, a partir da contagem real em
+`enrollments` (escritas manuais no banco, restaurações de backup, etc.).
+
+Uso:
+    python -m worker.stats_reconciler          # a cada ENROLLMENT_STATS_RECONCILE_INTERVAL segundos
+    python -m worker.stats_reconciler --once   # uma única vez (ex: cron)
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db.session import build_engine
+from app.models.age_group import AgeGroup  # noqa: F401 - registra o mapper do relacionamento
+from app.services.stats_services import reconcile_enrollment_stats
+from app.utils.logger import configure_logging, logger
+
+
+RECONCILE_INTERVAL = float(os.getenv("ENROLLMENT_STATS_RECONCILE_INTERVAL", "3600"))
+
+
+async def reconcile_once(engine: AsyncEngine) -> int:
+    """Executa uma reconciliação e retorna o número de contadores corrigidos."""
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        drift = await reconcile_enrollment_stats(session)
+    if drift:
+        logger.warning("Enrollment stats drift corrected", counters=drift)
+    else:
+        logger.info("Enrollment stats reconciled", counters=0)
+    return drift
+
+
+async def main(once: bool = False) -> None:
+    """Roda a reconciliação uma vez ou em loop até receber sinal de parada."""
+    configure_logging()
+    engine = build_engine("worker")
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        while not stop.is_set():
+            try:
+                await reconcile_once(engine)
+            except Exception as e:
+                logger.error("Enrollment stats reconcile error", error=str(e))
+            if once:
+                break
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=RECONCILE_INTERVAL)
+            except asyncio.TimeoutError:
+                continue
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="Reconcilia uma vez e sai")
+    args = parser.parse_args()
+    asyncio.run(main(args.once))
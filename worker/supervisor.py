@@ -0,0 +1,167 @@
+"""
+Supervisor multi-processo para o worker de inscrições.
+
+Inicia K processos de worker (padrão: número de CPUs), cada um com seu
+próprio loop asyncio, engine de banco e conexão Redis, repassa SIGTERM/SIGINT
+para que cada filho faça o shutdown graceful e reinicia filhos que morrerem,
+com backoff exponencial.
+
+Uso:
+    python -m worker.supervisor
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import tempfile
+import time
+from dataclasses import dataclass
+from multiprocessing.process import BaseProcess
+from typing import Optional
+
+from app.utils.logger import configure_logging, logger
+
+
+WORKER_PROCESSES = int(os.getenv("ENROLLMENT_WORKER_PROCESSES", "0")) or os.cpu_count() or 1
+RESTART_BACKOFF_MAX = float(os.getenv("ENROLLMENT_WORKER_RESTART_BACKOFF_MAX", "30"))
+SHUTDOWN_TIMEOUT = float(os.getenv("ENROLLMENT_WORKER_SHUTDOWN_TIMEOUT", "30"))
+METRICS_PORT = int(os.getenv("ENROLLMENT_WORKER_METRICS_PORT", "0"))
+STABLE_AFTER = 60.0
+POLL_INTERVAL = 0.5
+
+
+def run_worker_process() -> None:
+    """Ponto de entrada de cada processo filho."""
+    # Importado no filho para que engine e cliente Redis sejam criados por processo.
+    from worker.processor import main
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+@dataclass
+class _Slot:
+    """Estado de um processo filho supervisionado."""
+    index: int
+    process: Optional[BaseProcess] = None
+    started_at: float = 0.0
+    failures: int = 0
+    restart_at: float = 0.0
+
+
+class Supervisor:
+    """Mantém K processos de worker vivos até receber sinal de parada."""
+
+    def __init__(self, processes: int = WORKER_PROCESSES):
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = [_Slot(index=i) for i in range(max(1, processes))]
+        self._stopping = False
+
+    def _start(self, slot: _Slot) -> None:
+        """Inicia o processo de um slot."""
+        process = self._context.Process(
+            target=run_worker_process,
+            name=f"enrollment-worker-{slot.index}",
+        )
+        process.start()
+        slot.process = process
+        slot.started_at = time.monotonic()
+        logger.info("Worker process started", slot=slot.index, pid=process.pid)
+
+    def request_shutdown(self, signum: int, frame=None) -> None:
+        """Repassa o sinal de parada para todos os filhos vivos."""
+        if self._stopping:
+            return
+        logger.info("Supervisor shutdown signal received", signal=signum)
+        self._stopping = True
+        for slot in self._slots:
+            if slot.process is not None and slot.process.is_alive():
+                os.kill(slot.process.pid, signal.SIGTERM)
+
+    def _check(self, slot: _Slot) -> None:
+        """Agenda o reinício de um filho que terminou inesperadamente."""
+        now = time.monotonic()
+        process = slot.process
+        if process is None:
+            if now >= slot.restart_at and not self._stopping:
+                self._start(slot)
+            return
+        if process.is_alive():
+            if slot.failures and now - slot.started_at > STABLE_AFTER:
+                slot.failures = 0
+            return
+
+        process.join()
+        self._mark_dead(process)
+        slot.process = None
+        slot.failures += 1
+        delay = min(2 ** (slot.failures - 1), RESTART_BACKOFF_MAX)
+        slot.restart_at = now + delay
+        logger.error(
+            "Worker process exited",
+            slot=slot.index,
+            pid=process.pid,
+            exitcode=process.exitcode,
+            restart_in=delay,
+        )
+
+    def _mark_dead(self, process: BaseProcess) -> None:
+        """Descarta as métricas "live" de um filho encerrado."""
+        if METRICS_PORT:
+            from prometheus_client import multiprocess
+
+            multiprocess.mark_process_dead(process.pid)
+
+    def _serve_metrics(self) -> None:
+        """
+        Expõe as métricas agregadas de todos os filhos em `METRICS_PORT`.
+
+        Os filhos gravam em `PROMETHEUS_MULTIPROC_DIR`, que precisa estar
+        definido antes de o prometheus_client ser importado em cada processo.
+        """
+        if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="enrollment-worker-metrics-")
+        from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(METRICS_PORT, registry=registry)
+
+    def _join_all(self) -> None:
+        """Aguarda os filhos concluírem o shutdown, forçando após o timeout."""
+        deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+        for slot in self._slots:
+            if slot.process is None:
+                continue
+            slot.process.join(max(0.0, deadline - time.monotonic()))
+            if slot.process.is_alive():
+                logger.warning("Killing worker process after timeout", pid=slot.process.pid)
+                slot.process.kill()
+                slot.process.join()
+
+    def run(self) -> None:
+        """Loop de supervisão."""
+        configure_logging()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self.request_shutdown)
+        logger.info("Worker supervisor started", processes=len(self._slots))
+        os.environ["ENROLLMENT_WORKER_SUPERVISED"] = "1"
+        if METRICS_PORT:
+            self._serve_metrics()
+
+        for slot in self._slots:
+            self._start(slot)
+        while not self._stopping:
+            for slot in self._slots:
+                self._check(slot)
+            time.sleep(POLL_INTERVAL)
+
+        self._join_all()
+        logger.info("Worker supervisor stopped")
+
+
+if __name__ == "__main__":
+    Supervisor().run()